@@ -6,18 +6,76 @@ from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, System
 from langchain_ollama import ChatOllama
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
-# 配置本地LLM
+from tools.records import EmploymentSummary
+
+# 配置本地LLM（设置 LLM_SEED 后采样结果可复现，生成结果才会进入 LLM 缓存）
+LLM_SEED = os.getenv("LLM_SEED", "")
 llm = ChatOllama(
     model="qwen2.5:r78b",
     base_url="http://localhost:11434",
-    temperature=0.7
+    temperature=0.7,
+    seed=int(LLM_SEED) if LLM_SEED else None
 )
 
+# LLM调用配置
+LLM_STREAM = os.getenv("LLM_STREAM", "1") == "1"  # 流式生成，边生成边写入临时文件并显示进度
+LLM_PARTIAL_DIR = os.getenv("LLM_PARTIAL_DIR", ".cache/partial")  # 生成中的报告临时文件目录
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"  # 只缓存设置了 seed 或 temperature 为 0 的调用
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", ".cache/llm_cache.sqlite")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "50"))
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS", "0") == "1"  # 不读取缓存，重新生成并覆盖
+LLM_SECTION_MODE = os.getenv("LLM_SECTION_MODE", "1") == "1"  # 按 ## 章节拆分并发优化报告，0 为整篇一次生成
+LLM_SECTION_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "4"))  # 章节并发数，与 Ollama 服务端并行槽位一致
+LLM_SECTION_RETRIES = int(os.getenv("LLM_SECTION_RETRIES", "2"))  # 单个章节失败后的重试次数
+
+# 多候选生成：报告撰写时一次生成多个版本（不同 seed/temperature），审核打分后保留得分最高的
+REPORT_CANDIDATES = int(os.getenv("REPORT_CANDIDATES", "3"))  # 候选数，1 为只生成一个版本
+REPORT_CANDIDATE_TEMPERATURE_STEP = float(os.getenv("REPORT_CANDIDATE_TEMPERATURE_STEP", "0.2"))  # 候选间 temperature 的间隔
+REPORT_SCORE_WORKERS = int(os.getenv("REPORT_SCORE_WORKERS", "0"))  # 打分进程数，0 为在生成线程内直接打分
+
+# 审核-改写循环预算（0 表示不限；用完后保存得分最高的版本）
+MAX_REWRITE_ATTEMPTS = int(os.getenv("MAX_REWRITE_ATTEMPTS", "3"))
+REWRITE_TIME_BUDGET_SEC = float(os.getenv("REWRITE_TIME_BUDGET_SEC", "900"))  # 改写累计耗时
+REWRITE_TOKEN_BUDGET = int(os.getenv("REWRITE_TOKEN_BUDGET", "30000"))  # 改写累计生成的 token
+REWRITE_PATIENCE = int(os.getenv("REWRITE_PATIENCE", "2"))  # 最高分连续几轮没有提高即视为收敛
+
+# 抓取配置
+SCRAPER_MAX_WORKERS = int(os.getenv("SCRAPER_MAX_WORKERS", "1"))  # 大于1时启用并发抓取
+SCRAPER_DELAY = float(os.getenv("SCRAPER_DELAY", "2"))  # 同一主机请求间隔（秒）
+SCRAPER_PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", "0"))  # 解析进程数，大于0时下载与解析分离
+SCRAPER_PAGE_BUDGET = int(os.getenv("SCRAPER_PAGE_BUDGET", "150"))  # 整次运行最多抓取的页面数
+SCRAPER_MAX_PAGE_KB = int(os.getenv("SCRAPER_MAX_PAGE_KB", "2048"))  # 单个内容页最多下载的大小
+SCRAPER_RELEVANCE_WINDOW_KB = int(os.getenv("SCRAPER_RELEVANCE_WINDOW_KB", "64"))  # 前N KB无就业关键词则提前终止，0为关闭
+SCRAPER_DEDUP_THRESHOLD = float(os.getenv("SCRAPER_DEDUP_THRESHOLD", "0.7"))  # 正文相似度达到该值视为转载副本，0为关闭
+
+# HTTP响应缓存配置
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", ".cache/http_cache.sqlite")
+HTTP_CACHE_MAX_MB = int(os.getenv("HTTP_CACHE_MAX_MB", "200"))
+HTTP_CACHE_SEARCH_TTL_HOURS = float(os.getenv("HTTP_CACHE_SEARCH_TTL_HOURS", "6"))  # 搜索结果页
+HTTP_CACHE_CONTENT_TTL_DAYS = float(os.getenv("HTTP_CACHE_CONTENT_TTL_DAYS", "30"))  # 内容页
+
+# 抓取状态配置（断点续抓、增量刷新）
+CRAWL_STATE_ENABLED = os.getenv("CRAWL_STATE_ENABLED", "1") == "1"
+CRAWL_STATE_PATH = os.getenv("CRAWL_STATE_PATH", ".cache/crawl_state.sqlite")
+CRAWL_STATE_MAX_AGE_HOURS = float(os.getenv("CRAWL_STATE_MAX_AGE_HOURS", "24"))  # 多久内抓取过的页面不再下载
+CRAWL_RESUME = os.getenv("CRAWL_RESUME", "1") == "1"  # 自动恢复上次中断的运行
+
+# 工作流检查点配置（每个节点完成后保存 ReportState，可从中断处恢复）
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", ".cache/checkpoints.sqlite")
+
+# HTTP录制/回放配置（二者均为档案路径，留空表示关闭；启用时不使用响应缓存）
+HTTP_RECORD_ARCHIVE = os.getenv("HTTP_RECORD_ARCHIVE", "")  # 录制真实请求到档案
+HTTP_REPLAY_ARCHIVE = os.getenv("HTTP_REPLAY_ARCHIVE", "")  # 从档案回放，不访问外网
+
 class ReportState(TypedDict):
     """报告状态管理"""
     messages: Sequence[BaseMessage]
-    raw_data: Dict[str, Any]  # 抓取的原始数据
+    raw_data: EmploymentSummary  # 抓取的原始数据（汇总记录，持久化时才序列化）
     analysis_data: Dict[str, Any]  # 分析后的数据
     report_content: str  # 报告内容
     review_comments: List[str]  # 审核意见
+    review_findings: List[Dict[str, Any]]  # 审核意见及其涉及的章节，用于定向修改
+    rewrite_progress: Dict[str, Any]  # 改写循环的次数、耗时、token、各轮分数、最高分版本和结束原因
     is_approved: bool  # 是否审核通过
+    generation_stats: List[Dict[str, Any]]  # 每次LLM调用的首字延迟、tokens/s、总耗时
@@ -1,20 +1,52 @@
-from typing import Annotated, Sequence, TypedDict
+from typing import Annotated, Sequence, TypedDict, List
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import ToolNode
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.types import StreamWriter
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_ollama import ChatOllama
 import json
 import sys
 import os
+import time
+import uuid
+import sqlite3
+import argparse
 
 # 添加项目路径
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import ReportState, llm
-from tools.scraper import DataScraperTool
+from config import (
+    ReportState, llm, SCRAPER_MAX_WORKERS, SCRAPER_DELAY, SCRAPER_PARSE_WORKERS, SCRAPER_PAGE_BUDGET,
+    SCRAPER_MAX_PAGE_KB, SCRAPER_RELEVANCE_WINDOW_KB, SCRAPER_DEDUP_THRESHOLD,
+    HTTP_CACHE_ENABLED, HTTP_CACHE_PATH, HTTP_CACHE_MAX_MB,
+    HTTP_CACHE_SEARCH_TTL_HOURS, HTTP_CACHE_CONTENT_TTL_DAYS, HTTP_RECORD_ARCHIVE, HTTP_REPLAY_ARCHIVE,
+    CRAWL_STATE_ENABLED, CRAWL_STATE_PATH, CRAWL_STATE_MAX_AGE_HOURS, CRAWL_RESUME, CHECKPOINT_PATH,
+    LLM_STREAM, LLM_PARTIAL_DIR, LLM_CACHE_ENABLED, LLM_CACHE_PATH, LLM_CACHE_MAX_MB, LLM_CACHE_BYPASS,
+    LLM_SECTION_MODE, LLM_SECTION_PARALLEL, LLM_SECTION_RETRIES,
+    REPORT_CANDIDATES, REPORT_CANDIDATE_TEMPERATURE_STEP, REPORT_SCORE_WORKERS,
+    MAX_REWRITE_ATTEMPTS, REWRITE_TIME_BUDGET_SEC, REWRITE_TOKEN_BUDGET, REWRITE_PATIENCE
+)
+from tools.scraper import WebScraper, DataScraperTool
+from tools.http_cache import ResponseCache, CachePolicy
+from tools.stream_fetch import StreamPolicy
+from tools.replay import HttpArchive, ReplayServer
+from tools.crawl_state import CrawlState
+from tools.records import EmploymentSummary
 from tools.analyzer import EmploymentDataAnalyzer
 from tools.report_writer import ReportWriter
 from tools.reviewer import ReportReviewer
+from tools.llm_client import StreamingLLM
+from tools.llm_cache import LLMCache
+from tools.sections import SectionOptimizer
+from tools.candidates import CandidateGenerator
+from tools.rewrite_budget import RewriteBudget, STOP_REASONS
+
+# 流式生成：部分结果实时写入临时文件，进度通过 LangGraph 的 custom 流输出到命令行
+llm_client = StreamingLLM(llm, stream=LLM_STREAM, partial_dir=LLM_PARTIAL_DIR)
+# 审核-改写循环的次数、耗时、token 预算与收敛判断
+rewrite_budget = RewriteBudget(max_attempts=MAX_REWRITE_ATTEMPTS, max_seconds=REWRITE_TIME_BUDGET_SEC,
+                               max_tokens=REWRITE_TOKEN_BUDGET, patience=REWRITE_PATIENCE)
 
 # Agent节点定义
 def data_collection_node(state: ReportState):
@@ -23,18 +55,55 @@ def data_collection_node(state: ReportState):
     print("【数据抓取Agent】开始工作...")
     print("="*50)
     
-    scraper = DataScraperTool()
-    raw_data_str = scraper.scrape_employment_data()
-    raw_data = json.loads(raw_data_str)
+    archive = HttpArchive(HTTP_RECORD_ARCHIVE) if HTTP_RECORD_ARCHIVE else None
+    replay_server = None
+    if HTTP_REPLAY_ARCHIVE:
+        replay_server = ReplayServer(HttpArchive(HTTP_REPLAY_ARCHIVE)).start()
+        print(f"📼 回放模式: {HTTP_REPLAY_ARCHIVE} ({len(replay_server.archive)} 条记录)")
+    
+    cache = None
+    if HTTP_CACHE_ENABLED and not archive and not replay_server:
+        cache = ResponseCache(
+            HTTP_CACHE_PATH,
+            max_bytes=HTTP_CACHE_MAX_MB * 1024 * 1024,
+            policy=CachePolicy(
+                search_ttl=HTTP_CACHE_SEARCH_TTL_HOURS * 3600,
+                content_ttl=HTTP_CACHE_CONTENT_TTL_DAYS * 86400
+            )
+        )
+    # 录制/回放时每次都完整抓取，不复用保存的状态
+    crawl_state = CrawlState(CRAWL_STATE_PATH) if CRAWL_STATE_ENABLED and not archive and not replay_server else None
+    scraper = DataScraperTool(WebScraper(
+        max_workers=SCRAPER_MAX_WORKERS,
+        per_host_delay=SCRAPER_DELAY,
+        parse_workers=SCRAPER_PARSE_WORKERS,
+        cache=cache,
+        stream_policy=StreamPolicy(
+            max_bytes=SCRAPER_MAX_PAGE_KB * 1024,
+            relevance_window=SCRAPER_RELEVANCE_WINDOW_KB * 1024
+        ),
+        archive=archive,
+        replay_url=replay_server.url if replay_server else None,
+        dedup_threshold=SCRAPER_DEDUP_THRESHOLD,
+        state=crawl_state,
+        state_max_age=CRAWL_STATE_MAX_AGE_HOURS * 3600
+    ), page_budget=SCRAPER_PAGE_BUDGET, resume=CRAWL_RESUME)
+    try:
+        raw_data = scraper.collect()
+    finally:
+        if replay_server:
+            replay_server.stop()
+        if crawl_state:
+            crawl_state.close()
     
     print(f"\n抓取完成！")
-    print(f"- 数据源数量: {raw_data.get('total_sources', 0)}")
-    print(f"- 平均就业率: {raw_data.get('avg_employment_rate', 0)*100:.1f}%")
-    print(f"- 平均签约率: {raw_data.get('avg_signing_rate', 0)*100:.1f}%")
+    print(f"- 数据源数量: {raw_data.total_sources}")
+    print(f"- 平均就业率: {(raw_data.avg_employment_rate or 0)*100:.1f}%")
+    print(f"- 平均签约率: {(raw_data.avg_signing_rate or 0)*100:.1f}%")
     
     # 更新状态
     new_messages = state["messages"] + [
-        AIMessage(content=f"已成功抓取{raw_data.get('total_sources', 0)}个数据源的就业数据")
+        AIMessage(content=f"已成功抓取{raw_data.total_sources}个数据源的就业数据")
     ]
     
     return {
@@ -50,8 +119,7 @@ def data_analysis_node(state: ReportState):
     print("="*50)
     
     analyzer = EmploymentDataAnalyzer(state["raw_data"])
-    analysis_str = analyzer.analyze()
-    analysis_data = json.loads(analysis_str)
+    analysis_data = analyzer.run()
     
     print(f"\n分析完成！")
     print(f"- 核心指标已提取")
@@ -69,14 +137,59 @@ def data_analysis_node(state: ReportState):
         "messages": new_messages
     }
 
-def report_writing_node(state: ReportState):
+def optimize_report_prompt(report_content: str) -> str:
+    """整篇报告的语言优化提示"""
+    return f"""
+    请对以下就业分析报告进行语言优化，要求：
+    1. 保持原有数据和逻辑不变
+    2. 优化语言表达，使其更加专业流畅
+    3. 增强报告的深度和洞察力
+    4. 保持Markdown格式
+    
+    报告内容：
+    {report_content}
+    """
+
+def optimize_section_prompt(section: str) -> str:
+    """单个章节的语言优化提示"""
+    return f"""
+    以下是一份就业分析报告中的一个章节，请对其进行语言优化，要求：
+    1. 保持原有数据和逻辑不变
+    2. 优化语言表达，使其更加专业流畅
+    3. 增强该章节的深度和洞察力
+    4. 保持Markdown格式，保留原章节标题，只输出优化后的该章节
+    
+    章节内容：
+    {section}
+    """
+
+def rewrite_section_prompt(section: str, comments: List[str]) -> str:
+    """单个章节的定向修改提示"""
+    review_prompt = "\n".join([f"- {comment}" for comment in comments])
+    return f"""
+    以下是一份就业分析报告中的一个章节，请根据审核意见修改该章节：
+    
+    审核意见：
+    {review_prompt}
+    
+    章节内容：
+    {section}
+    
+    要求：
+    1. 修复所有指出的问题，吸收改进建议
+    2. 保持数据准确性
+    3. 审核意见指出缺少的章节，以 ## 二级标题补充在本章节之后
+    4. 保持Markdown格式，保留原章节标题，只输出修改后的内容
+    """
+
+def report_writing_node(state: ReportState, writer: StreamWriter):
     """报告撰写Agent"""
     print("\n" + "="*50)
     print("【报告撰写Agent】开始工作...")
     print("="*50)
     
-    writer = ReportWriter(state["analysis_data"])
-    report_content = writer.generate_report()
+    report_writer = ReportWriter(state["analysis_data"])
+    report_content = report_writer.generate_report()
     
     print(f"\n报告生成完成！")
     print(f"- 报告字数: {len(report_content)} 字")
@@ -84,18 +197,29 @@ def report_writing_node(state: ReportState):
     
     # 使用LLM优化报告
     print("\n正在使用LLM优化报告语言...")
-    prompt = f"""
-    请对以下就业分析报告进行语言优化，要求：
-    1. 保持原有数据和逻辑不变
-    2. 优化语言表达，使其更加专业流畅
-    3. 增强报告的深度和洞察力
-    4. 保持Markdown格式
-    
-    报告内容：
-    {report_content}
-    """
-    
-    optimized_report = llm.invoke(prompt).content
+    if LLM_SECTION_MODE:
+        # 按 ## 章节拆分并发优化，单个章节失败只影响该章节
+        print(f"- 按章节并发优化（并发数 {LLM_SECTION_PARALLEL}）")
+    if REPORT_CANDIDATES > 1:
+        # 一次生成多个候选版本，打分后保留最好的，尽量不进入改写循环
+        print(f"- 生成 {REPORT_CANDIDATES} 个候选版本（不同 seed/temperature），审核打分后保留得分最高的")
+    
+    def optimize(client: StreamingLLM, label: str, max_parallel: int, on_progress):
+        if LLM_SECTION_MODE:
+            began = time.perf_counter()
+            optimizer = SectionOptimizer(client, max_parallel=max_parallel, retries=LLM_SECTION_RETRIES)
+            optimized = optimizer.optimize(report_content, optimize_section_prompt, label, on_progress=on_progress)
+            return optimized, optimizer.summary(label, time.perf_counter() - began)
+        optimized, stats = client.generate_with_stats(optimize_report_prompt(report_content), label,
+                                                      on_progress=on_progress)
+        return optimized, stats.to_dict()
+    
+    start = time.perf_counter()
+    generator = CandidateGenerator(llm_client, count=REPORT_CANDIDATES, temperature_step=REPORT_CANDIDATE_TEMPERATURE_STEP,
+                                   max_parallel=LLM_SECTION_PARALLEL, score_workers=REPORT_SCORE_WORKERS)
+    optimized_report = generator.generate(optimize, "report_writing", on_progress=writer)
+    generation = generator.summary("report_writing", time.perf_counter() - start)
+    print(f"- 语言优化完成，端到端 {generation['total']:.1f}s")
     
     new_messages = state["messages"] + [
         AIMessage(content=f"报告撰写完成，已生成结构化报告并经过LLM优化")
@@ -104,6 +228,7 @@ def report_writing_node(state: ReportState):
     return {
         **state,
         "report_content": optimized_report,
+        "generation_stats": state.get("generation_stats", []) + [generation],
         "messages": new_messages
     }
 
@@ -121,8 +246,12 @@ def report_review_node(state: ReportState):
     print(f"- 发现问题: {len(review_result['issues'])} 个")
     print(f"- 改进建议: {len(review_result['suggestions'])} 条")
     print(f"- 审核结果: {'通过' if review_result['is_approved'] else '不通过'}")
+    if reviewer.memoized:
+        print("- 报告内容未变，沿用已有的审核结果")
     
     review_comments = review_result['issues'] + review_result['suggestions']
+    # 首次审核时开始记录改写循环进度（改写后的复审沿用已有进度）
+    rewrite_progress = state.get("rewrite_progress") or rewrite_budget.start(state["report_content"], review_result['score'])
     
     new_messages = state["messages"] + [
         AIMessage(content=f"审核完成，分数：{review_result['score']}，{'通过' if review_result['is_approved'] else '需要修改'}")
@@ -131,7 +260,9 @@ def report_review_node(state: ReportState):
     return {
         **state,
         "review_comments": review_comments,
+        "review_findings": review_result['findings'],
         "is_approved": review_result['is_approved'],
+        "rewrite_progress": rewrite_progress,
         "messages": new_messages
     }
 
@@ -142,17 +273,20 @@ def check_approval(state: ReportState):
         print("✅ 报告审核通过！")
         print("="*50)
         return "end"
+    reason = rewrite_budget.stop_reason(state["rewrite_progress"])
+    if reason:
+        print("\n" + "="*50)
+        print(f"⏹️ 停止改写：{STOP_REASONS[reason]}，保存得分最高的版本")
+        print("="*50)
+        return "end"
     else:
         print("\n" + "="*50)
         print("⚠️ 报告需要修改，重新生成...")
         print("="*50)
         return "rewrite"
 
-def rewrite_report_node(state: ReportState):
-    """根据审核意见重新生成报告"""
-    print("\n根据审核意见修改报告...")
-    
-    # 构建修改提示
+def rewrite_whole_report(state: ReportState, writer: StreamWriter):
+    """整篇报告连同全部审核意见一起重新生成（LLM_SECTION_MODE=0 或没有章节定位信息时）"""
     review_prompt = "\n".join([f"- {comment}" for comment in state["review_comments"]])
     
     prompt = f"""
@@ -171,7 +305,23 @@ def rewrite_report_node(state: ReportState):
     4. 保持结构完整性
     """
     
-    revised_report = llm.invoke(prompt).content
+    return llm_client.generate_with_stats(prompt, "rewrite", on_progress=writer)
+
+def rewrite_report_node(state: ReportState, writer: StreamWriter):
+    """根据审核意见重新生成报告"""
+    print("\n根据审核意见修改报告...")
+    
+    start = time.perf_counter()
+    findings = state.get("review_findings", [])
+    if LLM_SECTION_MODE and findings:
+        # 只重新生成审核意见涉及的章节，其余章节原样保留
+        optimizer = SectionOptimizer(llm_client, max_parallel=LLM_SECTION_PARALLEL, retries=LLM_SECTION_RETRIES)
+        revised_report = optimizer.rewrite(state['report_content'], ReportReviewer.section_comments(findings),
+                                           rewrite_section_prompt, "rewrite", on_progress=writer)
+        generation = optimizer.summary("rewrite", time.perf_counter() - start)
+    else:
+        revised_report, stats = rewrite_whole_report(state, writer)
+        generation = stats.to_dict()
     
     # 重新审核
     print("重新审核修改后的报告...")
@@ -182,6 +332,11 @@ def rewrite_report_node(state: ReportState):
     print(f"- 审核分数: {review_result['score']}/100")
     print(f"- 审核结果: {'通过' if review_result['is_approved'] else '仍需修改'}")
     
+    progress = rewrite_budget.record(state["rewrite_progress"], revised_report, review_result['score'],
+                                     time.perf_counter() - start, generation['tokens'])
+    print(f"- 改写预算: 第 {progress['attempts']} 次，累计 {progress['seconds']:.0f}s / {progress['tokens']} tokens，"
+          f"最高分 {progress['best_score']}（第 {progress['best_attempt']} 版）")
+    
     new_messages = state["messages"] + [
         AIMessage(content=f"报告已根据审核意见修改，新分数：{review_result['score']}")
     ]
@@ -190,7 +345,10 @@ def rewrite_report_node(state: ReportState):
         **state,
         "report_content": revised_report,
         "review_comments": review_result['issues'] + review_result['suggestions'],
+        "review_findings": review_result['findings'],
         "is_approved": review_result['is_approved'],
+        "rewrite_progress": progress,
+        "generation_stats": state.get("generation_stats", []) + [generation],
         "messages": new_messages
     }
 
@@ -206,17 +364,33 @@ def save_report_node(state: ReportState):
     
     report_path = os.path.join(reports_dir, "2024-2025高校本科生就业情况分析报告.md")
     
+    # 未通过审核时（改写预算用完或已收敛）保存得分最高的版本，并记录结束原因
+    progress = dict(state.get("rewrite_progress") or {})
+    report_content = state["report_content"]
+    if progress:
+        progress['stop_reason'] = 'approved' if state["is_approved"] else rewrite_budget.stop_reason(progress)
+        if not state["is_approved"]:
+            report_content = progress['best_report']
+        print(f"- 改写 {progress['attempts']} 次，各轮分数 {progress['scores']}，"
+              f"结束原因：{STOP_REASONS.get(progress['stop_reason'], progress['stop_reason'])}")
+        if progress['best_attempt'] != progress['attempts']:
+            print(f"- 保存第 {progress['best_attempt']} 版（分数 {progress['best_score']}），而不是最后一版")
+    
     with open(report_path, 'w', encoding='utf-8') as f:
-        f.write(state["report_content"])
+        f.write(report_content)
     
     print(f"✅ 报告已保存至: {report_path}")
-    print(f"   文件大小: {len(state['report_content'])} 字符")
+    print(f"   文件大小: {len(report_content)} 字符")
     
-    return state
+    return {
+        **state,
+        "report_content": report_content,
+        "rewrite_progress": progress
+    }
 
 # 构建工作流图
-def build_graph():
-    """构建多Agent工作流"""
+def build_graph(checkpointer=None):
+    """构建多Agent工作流（传入 checkpointer 时每个节点完成后保存状态）"""
     workflow = StateGraph(ReportState)
     
     # 添加节点
@@ -246,9 +420,111 @@ def build_graph():
     workflow.add_edge("rewrite", "report_review")
     workflow.add_edge("save_report", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
-if __name__ == "__main__":
+def open_checkpointer(path: str = CHECKPOINT_PATH) -> SqliteSaver:
+    """打开本地 SQLite 检查点存储"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return SqliteSaver(sqlite3.connect(path, check_same_thread=False))
+
+def _run_config(run_id: str, checkpoint_id: str = None):
+    configurable = {"thread_id": run_id}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+def _last_node(snapshot) -> str:
+    """检查点由哪个节点写入"""
+    writes = (snapshot.metadata or {}).get("writes") or {}
+    return ", ".join(writes) or (snapshot.metadata or {}).get("source", "-")
+
+def list_runs(app, checkpointer: SqliteSaver):
+    """列出所有运行及其最新检查点"""
+    latest = {}
+    for checkpoint in checkpointer.list(None):
+        run_id = checkpoint.config["configurable"]["thread_id"]
+        latest.setdefault(run_id, checkpoint)
+    if not latest:
+        print("暂无运行记录")
+        return
+    print(f"{'运行ID':<28}{'步骤':>6}  {'最后完成节点':<18}{'下一节点':<18}时间")
+    for run_id, checkpoint in sorted(latest.items(), key=lambda item: item[1].checkpoint["ts"], reverse=True):
+        snapshot = app.get_state(_run_config(run_id))
+        status = ", ".join(snapshot.next) if snapshot.next else "已完成"
+        print(f"{run_id:<28}{snapshot.metadata.get('step', 0):>6}  {_last_node(snapshot):<18}{status:<18}"
+              f"{checkpoint.checkpoint['ts'][:19]}")
+
+def inspect_run(app, run_id: str, checkpoint_id: str = None):
+    """查看某次运行的检查点历史；指定 checkpoint_id 时打印该检查点的状态"""
+    if checkpoint_id:
+        snapshot = app.get_state(_run_config(run_id, checkpoint_id))
+        if not snapshot.values:
+            print(f"未找到检查点: {run_id} / {checkpoint_id}")
+            return
+        print(f"运行 {run_id} 检查点 {checkpoint_id}（步骤 {snapshot.metadata.get('step')}，"
+              f"节点 {_last_node(snapshot)}，下一节点 {', '.join(snapshot.next) or '无'}）")
+        for key, value in snapshot.values.items():
+            if key == "messages":
+                value = [message.content for message in value]
+            if isinstance(value, EmploymentSummary):
+                value = value.to_dict()
+            text = json.dumps(value, ensure_ascii=False, default=str)
+            print(f"- {key}: {text[:300]}{'...' if len(text) > 300 else ''}")
+        return
+    
+    history = list(app.get_state_history(_run_config(run_id)))
+    if not history:
+        print(f"未找到运行: {run_id}")
+        return
+    print(f"运行 {run_id} 的检查点（由新到旧）:")
+    for snapshot in history:
+        print(f"  {snapshot.config['configurable']['checkpoint_id']}  步骤 {snapshot.metadata.get('step'):>3}  "
+              f"节点 {_last_node(snapshot):<16}下一节点 {', '.join(snapshot.next) or '无'}")
+
+def run_with_progress(app, graph_input, config):
+    """通过 LangGraph 的流式接口执行工作流：显示每个节点的完成耗时和 LLM 生成进度"""
+    start = last = time.perf_counter()
+    for mode, chunk in app.stream(graph_input, config=config, stream_mode=["updates", "custom"]):
+        if mode == "custom":
+            print(f"\r   ✍️ {chunk['label']}: {chunk['chars']} 字, {chunk['tokens']} tokens, "
+                  f"{chunk['tokens_per_sec']} tokens/s, 已用 {chunk['elapsed']}s", end="", flush=True)
+            continue
+        now = time.perf_counter()
+        for node in chunk:
+            print(f"\n▶️ 节点 {node} 完成，耗时 {now - last:.1f}s（累计 {now - start:.1f}s）")
+        last = now
+    return app.get_state(config).values
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="高校就业情况分析报告生成系统")
+    parser.add_argument("--resume", metavar="RUN_ID", help="从指定运行的最后一个完成节点继续")
+    parser.add_argument("--list-runs", action="store_true", help="列出所有运行")
+    parser.add_argument("--inspect", metavar="RUN_ID", help="查看指定运行的检查点")
+    parser.add_argument("--checkpoint", metavar="CHECKPOINT_ID", help="与 --inspect 一起使用，打印该检查点的状态")
+    parser.add_argument("--refresh-llm", action="store_true", help="不读取LLM缓存，重新生成（等同 LLM_CACHE_BYPASS=1）")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """命令行入口：新建运行、从检查点恢复，或查看已有运行"""
+    args = parse_args(argv)
+    checkpointer = open_checkpointer(CHECKPOINT_PATH)
+    app = build_graph(checkpointer)
+    
+    if args.list_runs:
+        list_runs(app, checkpointer)
+        return
+    if args.inspect:
+        inspect_run(app, args.inspect, args.checkpoint)
+        return
+    
+    if LLM_CACHE_ENABLED:
+        llm_client.cache = LLMCache(LLM_CACHE_PATH, LLM_CACHE_MAX_MB * 1024 * 1024,
+                                    bypass=LLM_CACHE_BYPASS or args.refresh_llm)
+        if not LLMCache.deterministic(LLMCache.params(llm)):
+            print("ℹ️ 未设置 LLM_SEED 且 temperature 不为 0，LLM 输出不可复现，不使用LLM缓存")
+    
     print("="*60)
     print("2024-2025年高校本科生就业情况分析报告生成系统")
     print("基于LangGraph多智能体架构")
@@ -257,20 +533,37 @@ if __name__ == "__main__":
     # 初始化状态
     initial_state = {
         "messages": [SystemMessage(content="你是一个专业的就业数据分析助手，负责生成高质量的高校就业分析报告。")],
-        "raw_data": {},
+        "raw_data": EmploymentSummary(),
         "analysis_data": {},
         "report_content": "",
         "review_comments": [],
-        "is_approved": False
+        "review_findings": [],
+        "is_approved": False,
+        "rewrite_progress": {},
+        "generation_stats": []
     }
     
-    # 构建并执行工作流
-    app = build_graph()
+    # 执行工作流：每个节点完成后写入检查点，中断后可用 --resume 从最后完成的节点继续
+    if args.resume:
+        run_id = args.resume
+        snapshot = app.get_state(_run_config(run_id))
+        if not snapshot.values:
+            print(f"未找到运行: {run_id}")
+            sys.exit(1)
+        if not snapshot.next:
+            print(f"运行 {run_id} 已完成，无需恢复")
+            return
+        print(f"\n恢复运行 {run_id}：最后完成节点 {_last_node(snapshot)}，从 {', '.join(snapshot.next)} 继续")
+        graph_input = None
+    else:
+        run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        graph_input = initial_state
+    print(f"运行ID: {run_id}（中断后可执行 python main.py --resume {run_id}）")
     
     print("\n开始执行多Agent协作流程...")
     print("-" * 60)
     
-    final_state = app.invoke(initial_state)
+    final_state = run_with_progress(app, graph_input, _run_config(run_id))
     
     print("\n" + "="*60)
     print("🎉 报告生成完成！")
@@ -278,4 +571,13 @@ if __name__ == "__main__":
     print(f"\n最终状态：")
     print(f"- 报告已审核通过: {'是' if final_state['is_approved'] else '否'}")
     print(f"- 总执行步骤: {len(final_state['messages'])}")
+    if llm_client.cache:
+        stats = llm_client.cache.stats
+        print(f"- LLM缓存: 命中 {stats['hits']}，未命中 {stats['misses']}，写入 {stats['stored']}，"
+              f"不可复现跳过 {stats['skipped']}")
+        llm_client.cache.close()
     print(f"\n报告保存在: reports/2024-2025高校本科生就业情况分析报告.md")
+    return final_state
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""
+工具模块测试 - 不访问网络、不调用 LLM
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+
+EMPLOYMENT_TEXT = "2024年全国高校毕业生就业率达到85.5%，签约率78.2%，毕业生人数1179万人。"
+
+
+def test_scrape_urls_waits_after_duplicate_pages(monkeypatch):
+    """顺序抓取时近似重复的页面之后也要等待 per_host_delay"""
+    import tools.scraper
+    from tools.scraper import WebScraper
+
+    scraper = WebScraper(per_host_delay=0.5)
+    page = f"<html><body><p>{EMPLOYMENT_TEXT * 20}</p></body></html>"
+    monkeypatch.setattr(scraper, "fetch_page", lambda url, content=False: page)
+    sleeps = []
+    monkeypatch.setattr(tools.scraper.time, "sleep", sleeps.append)
+
+    records = scraper.scrape_urls([("https://a.example.com/1", "就业率"), ("https://b.example.com/2", "就业率")])
+    assert len(records) == 1
+    assert records[0].duplicate_urls == ["https://b.example.com/2"]
+    assert sleeps == [0.5, 0.5]
+
+
+def test_pooled_session_leaves_global_dns_untouched():
+    """连接池会话不替换进程级的 socket.getaddrinfo（LLM 客户端等其他库不受影响）"""
+    import socket
+    from tools.http_session import PooledSession
+
+    original = socket.getaddrinfo
+    session = PooledSession(host_pool_sizes={'www.bing.com': 4})
+    assert socket.getaddrinfo is original
+    assert session.connection_stats() == {'requests': 0, 'connections_opened': 0, 'connections_reused': 0,
+                                          'reuse_rate': 0.0}
+    session.close()
+
+
+def _parse_or_fail(html: str) -> dict:
+    """ParsePipeline 测试用的解析函数（模块级，子进程可导入）"""
+    if html == 'bad':
+        raise ValueError('broken page')
+    if html == 'crash':
+        os._exit(1)
+    return {'length': len(html)}
+
+
+def test_pipeline_skips_pages_that_fail_to_parse():
+    from tools.pipeline import ParsePipeline
+
+    pipeline = ParsePipeline(lambda url: url, _parse_or_fail, parse_workers=1)
+    assert pipeline.run(['ok', 'bad', 'fine']) == [(2, {'length': 2}), (3, None), (4, {'length': 4})]
+
+
+def test_pipeline_stops_downloader_when_pool_breaks():
+    """解析进程崩溃时抛出异常而不是挂起（下载线程不会阻塞在已满的队列上）"""
+    from concurrent.futures.process import BrokenProcessPool
+    from tools.pipeline import ParsePipeline
+
+    pipeline = ParsePipeline(lambda url: url, _parse_or_fail, parse_workers=1, queue_size=1)
+    with pytest.raises(BrokenProcessPool):
+        pipeline.run(['crash'] + [f'page-{idx}' for idx in range(50)])
+
+
+def test_review_memo_is_shared_and_thread_safe():
+    """同一内容第二次审核直接取缓存；多个线程同时审核、写入缓存不出错，缓存不超过 MEMO_SIZE"""
+    from concurrent.futures import ThreadPoolExecutor
+    from tools.reviewer import ReportReviewer, MEMO_SIZE
+
+    ReportReviewer._memo.clear()
+    report = f"# 就业报告\n\n## 结论与建议\n\n{EMPLOYMENT_TEXT}\n"
+    first = ReportReviewer(report).review()
+    second = ReportReviewer(report)
+    assert second.review() == first and second.memoized
+
+    reports = [report.replace('2024', str(2000 + idx)) for idx in range(MEMO_SIZE * 4)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda text: ReportReviewer(text).review(), reports * 2))
+    assert results[:len(reports)] == results[len(reports):]
+    assert len(ReportReviewer._memo) == MEMO_SIZE
+    ReportReviewer._memo.clear()
+
+
+URLS = [
+    'https://www.moe.gov.cn/jyb_xwfb/gzdt_gzdt/s5987/202312/t20231205_1093357.html',
+    'https://m.baidu.com/from=844b/s?word=就业率',
+    'https://news.sohu.com/a/123456789_121106991',
+    'https://img.sogoucdn.com/app/a/100520020/abc.jpg',
+    'https://www.example.com/career/graduate-report-2024',
+    'https://blog.example.org/posts/2024/01/some-long-article-title',
+    'https://ads.example.com/click?id=1234567890',
+    'https://www.example.com/',
+    'http://short.cn/x',
+]
+
+
+def test_url_filter_matches_substring_rules():
+    """编译后的匹配与逐条 any(... in url) 一致（命中屏蔽规则时不再关心保留关键词）"""
+    from tools.url_filter import UrlFilter, BLOCKED_PATTERNS, KEEP_KEYWORDS, trie_regex
+    import re
+
+    assert re.fullmatch(trie_regex(['sogou.com', 'sogoucdn.com', 'sogouws.com']), 'sogouws.com')
+    url_filter = UrlFilter()
+    for url in URLS:
+        lower = url.lower()
+        blocked = any(pattern in lower for pattern in BLOCKED_PATTERNS)
+        kept = any(keyword in lower for keyword in KEEP_KEYWORDS)
+        for _ in range(2):  # 第二次走主机名缓存
+            result = url_filter.classify(lower)
+            assert result[0] == blocked and (blocked or result[1] == kept), url
+    assert url_filter.filter(URLS) == [URLS[0], URLS[4], URLS[5]]
+
+
+def test_minhash_finds_near_duplicates():
+    """签名是确定的；只改了少量文字的页面判为近重复，内容不同的页面各自收录"""
+    import numpy as np
+    from tools.dedup import DuplicateIndex, minhash, jaccard
+
+    text = EMPLOYMENT_TEXT * 10 + "其中研究生就业率为91.2%，专科生就业率为80.3%。"
+    edited = text.replace("80.3%", "80.5%")
+    other = "教育部公布2025届高校毕业生预计达到1222万人，同比增加43万人。" * 10
+    assert np.array_equal(minhash(text), minhash(text))
+    assert jaccard(minhash(text), minhash(edited)) >= 0.7
+    assert jaccard(minhash(text), minhash(other)) < 0.3
+
+    index = DuplicateIndex()
+    assert index.check(minhash(text), 'https://a.example.com') is None
+    assert index.check(minhash(edited), 'https://b.example.com') == 'https://a.example.com'
+    assert index.check(minhash(other), 'https://c.example.com') is None
+    assert index.clusters == {'https://a.example.com': ['https://b.example.com']}
+    assert index.summary() == {'pages': 3, 'duplicates': 1, 'unique': 2, 'duplicate_clusters': 1}
+
+
+def test_normalize_counts_and_rates():
+    """常见写法走批量快速路径，中文数字交给 parse_count；无法识别的、0 和超出范围的记为 NaN"""
+    import numpy as np
+    from tools.normalize import normalize_counts, normalize_rates, parse_count
+
+    counts = normalize_counts(['1179万', '１１７９万', '约1,179万人', '一千一百七十九万', '1千2百万', '3.5万',
+                               820, None, '不详', '0'])
+    np.testing.assert_allclose(counts, [11790000, 11790000, 11790000, 11790000, 12000000, 35000, 820,
+                                        np.nan, np.nan, np.nan])
+    np.testing.assert_allclose(normalize_counts([1179.0, 0.0]), [1179, np.nan])
+    assert parse_count('两千三百万') == 23000000
+    assert parse_count('三点五万') == 35000
+
+    np.testing.assert_allclose(normalize_rates([85.5, 0, 120]), [0.855, np.nan, np.nan])
+    np.testing.assert_allclose(normalize_rates([0.855, 0.9]), [0.855, 0.9])
+    np.testing.assert_allclose(normalize_rates(['85.5%', '９０％', 0.78, None]), [0.855, 0.9, 0.78, np.nan])
+    np.testing.assert_allclose(normalize_rates([0.9], unit='percent'), [0.009])
+
+
+def make_pages():
+    from tools.records import PageRecord
+
+    rows = [('北京', '985_211_universities', 90.0, {'stem_majors': 95.0}),
+            ('上海', '985_211_universities', 80.0, {}),
+            ('四川', 'vocational_colleges', 70.0, {'stem_majors': 75.0, 'arts_majors': 60.0}),
+            ('', '', 60.0, {})]
+    return [PageRecord(source_url=f"https://example.com/{idx}", search_query="就业率", employment_rate=rate,
+                       signing_rate=rate - 10, province=province, school_type=school_type, major_categories=majors)
+            for idx, (province, school_type, rate, majors) in enumerate(rows)]
+
+
+def test_cube_slices_and_incremental_add():
+    """切片查表与直接统计一致，结果都是 Python 原生类型；分两次 add 与一次 add 得到同样的立方体"""
+    from tools.cube import AggregationCube, match_dimensions
+
+    assert match_dimensions("四川某职业技术学院计算机专业就业率为75%") == {
+        'province': '四川', 'school_type': 'vocational_colleges', 'major_categories': {'stem_majors': 75.0}}
+
+    pages = make_pages()
+    cube = AggregationCube()
+    cube.add(pages)
+    overall = cube.slice()
+    assert overall['records'] == 4
+    assert overall['employment_rate']['count'] == 4
+    assert overall['employment_rate']['mean'] == 0.75
+    assert type(overall['employment_rate']['p50']) is float
+
+    east = cube.slice(region='east_coast')
+    assert east['records'] == 2 and east['employment_rate']['mean'] == 0.85
+    assert east['signing_rate']['mean'] == 0.75
+    assert cube.slice(major='stem_majors')['employment_rate']['mean'] == 0.85
+    assert cube.slice(major='stem_majors')['signing_rate']['count'] == 0
+    assert cube.slice(region='central_region') is None
+    assert set(cube.groups('province', region='east_coast')) == {'北京', '上海'}
+    assert set(cube.groups('major', school_type='vocational_colleges')) == {'stem_majors', 'arts_majors'}
+
+    incremental = AggregationCube()
+    incremental.add(pages[:2])
+    incremental.add(pages[2:])
+    assert incremental.slice() == overall
+    assert incremental.groups('region') == cube.groups('region')
+
+
+def test_rewrite_budget_keeps_best_version_and_stops():
+    """同分取较新的版本，分数没有严格提高才累计 stale_rounds；各项预算按顺序判断"""
+    from tools.rewrite_budget import RewriteBudget, STOP_REASONS
+
+    progress = RewriteBudget.start('v0', 60)
+    progress = RewriteBudget.record(progress, 'v1', 75, seconds=10.0, tokens=500)
+    progress = RewriteBudget.record(progress, 'v2', 75, seconds=12.5, tokens=600)
+    progress = RewriteBudget.record(progress, 'v3', 70, seconds=8.0, tokens=400)
+    assert progress['scores'] == [60, 75, 75, 70]
+    assert (progress['best_report'], progress['best_score'], progress['best_attempt']) == ('v2', 75, 2)
+    assert (progress['attempts'], progress['seconds'], progress['tokens']) == (3, 30.5, 1500)
+    assert progress['stale_rounds'] == 2
+
+    assert RewriteBudget(max_attempts=3).stop_reason(progress) == 'max_attempts'
+    assert RewriteBudget(max_attempts=0, max_seconds=30).stop_reason(progress) == 'time_budget'
+    assert RewriteBudget(max_attempts=0, max_tokens=1000).stop_reason(progress) == 'token_budget'
+    assert RewriteBudget(max_attempts=0, patience=2).stop_reason(progress) == 'converged'
+    assert RewriteBudget(max_attempts=0, patience=0).stop_reason(progress) is None
+    assert set(STOP_REASONS) >= {'max_attempts', 'time_budget', 'token_budget', 'converged'}
+
+
+def test_find_repetitions():
+    """忽略 Markdown 标记的重复句子，以及只改了少量文字的近似重复段落；位置指向原文"""
+    from tools.repetition import find_repetitions, repeated_sentences, similar_paragraphs
+
+    sentence = "2024届高校毕业生就业形势总体稳定。"
+    paragraph = ("从地区分布看，东部沿海地区毕业生就业率明显高于中西部地区，其中北京、上海、广东三地"
+                 "的平均就业率均超过百分之九十，区域差异仍然较大。")
+    text = (f"# 报告\n\n{sentence}\n\n{paragraph}\n\n## 分析\n\n- **{sentence}**\n\n"
+            f"{paragraph.replace('较大', '明显')}\n\n毕业生人数创历史新高，达到1179万人。\n")
+
+    sentences = repeated_sentences(text)
+    assert len(sentences) == 1
+    assert [text[position:position + 4] for position in sentences[0].positions] == ['2024', '2024']
+
+    paragraphs = similar_paragraphs(text)
+    assert len(paragraphs) == 1
+    assert paragraphs[0].positions == [text.index(paragraph), text.rindex('从地区分布看')]
+    assert 0.5 <= paragraphs[0].similarity < 1.0
+
+    assert [item.kind for item in find_repetitions(text)] == ['sentence', 'paragraph']
+    assert find_repetitions(f"{sentence}\n\n{paragraph}") == []
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("每年都有千万毕业生面临就业压力", 0),
+    ("数十万毕业生涌入一线城市", 0),
+    ("毕业生人数1179万人", '1179万'),
+    ("今年共１１７９万名毕业生", '１１７９万'),
+    ("今年一千一百七十九万毕业生走出校园", '一千一百七十九万'),
+])
+def test_graduate_count_needs_a_digit(text, expected):
+    """只有数量单位（千万、十万）的说法不算人数，页面也不会因此被当作有数据的来源"""
+    from tools.records import PageRecord
+    from tools.scraper import match_employment_metrics
+
+    metrics = match_employment_metrics(text)
+    assert metrics['total_graduates'] == expected
+    assert PageRecord.from_metrics(metrics, 'https://example.com').has_data == bool(expected)
+
+
+def test_concurrent_fetcher_spaces_hosts_and_keeps_order():
+    """同一主机的请求至少间隔 per_host_interval；结果按输入顺序返回；单个页面出错不影响其他页面"""
+    import threading
+    import time
+    from urllib.parse import urlparse
+    from tools.fetcher import ConcurrentFetcher
+
+    starts, lock = {}, threading.Lock()
+
+    def fetch(url: str) -> str:
+        with lock:
+            starts.setdefault(urlparse(url).netloc, []).append(time.monotonic())
+        if url.endswith('/bad'):
+            raise ConnectionError('reset')
+        return f"html of {url}"
+
+    urls = [f"https://{host}.example.com/{idx}" for host in ('a', 'b') for idx in range(3)] + ['https://c.example.com/bad']
+    fetcher = ConcurrentFetcher(fetch, max_workers=6, per_host_interval=0.1)
+    results = fetcher.fetch_all(urls)
+    assert results == [(url, '' if url.endswith('/bad') else f"html of {url}") for url in urls]
+    assert fetcher.last_stats['succeeded'] == 6
+    for host in ('a.example.com', 'b.example.com'):
+        times = sorted(starts[host])
+        assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+
+
+@pytest.fixture
+def http_server():
+    """本地 HTTP 服务器：routes[path] = (状态码, 响应头, 正文)；带 If-None-Match 且与 ETag 相同时返回 304。
+    返回 (基础URL, routes, 收到的请求列表 [(path, 请求头)])"""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    routes, requests_seen = {}, []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            requests_seen.append((self.path, dict(self.headers)))
+            status, headers, body = routes.get(self.path, (404, {}, b'not found'))
+            if headers.get('ETag') and self.headers.get('If-None-Match') == headers['ETag']:
+                status, body = 304, b''
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", routes, requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def test_response_cache_ttl_and_revalidation(http_server, tmp_path):
+    """新鲜期内直接取缓存；过期后带 If-None-Match 重新验证，304 沿用缓存正文，内容变了则重新保存"""
+    from tools.http_cache import ResponseCache, CachePolicy
+    from tools.scraper import WebScraper
+
+    base, routes, seen = http_server
+    routes['/page'] = (200, {'Content-Type': 'text/html; charset=utf-8', 'ETag': '"v1"'}, '<p>第一版</p>'.encode())
+    policy = CachePolicy(content_ttl=3600)
+    scraper = WebScraper(per_host_delay=0, cache=ResponseCache(str(tmp_path / 'http.sqlite'), policy=policy))
+
+    assert scraper.fetch_page(base + '/page') == '<p>第一版</p>'
+    assert scraper.fetch_page(base + '/page') == '<p>第一版</p>'
+    assert len(seen) == 1
+
+    policy.content_ttl = 0  # 之后缓存的条目都已过期
+    assert scraper.fetch_page(base + '/page') == '<p>第一版</p>'
+    assert seen[-1][1].get('If-None-Match') == '"v1"'
+
+    routes['/page'] = (200, {'Content-Type': 'text/html; charset=utf-8', 'ETag': '"v2"'}, '<p>第二版</p>'.encode())
+    assert scraper.fetch_page(base + '/page') == '<p>第二版</p>'
+    assert len(seen) == 3
+    assert scraper.cache.stats == {'hits': 1, 'revalidated': 1, 'misses': 2, 'stored': 2}
+
+
+def test_disk_store_evicts_least_recently_used(monkeypatch, tmp_path):
+    import itertools
+    import tools.disk_cache
+    from tools.disk_cache import DiskLRUStore
+
+    clock = itertools.count()
+    monkeypatch.setattr(tools.disk_cache.time, "time", lambda: float(next(clock)))
+    store = DiskLRUStore(str(tmp_path / 'store.sqlite'), max_bytes=10)
+    store.put('a', b'aaaa', {})
+    store.put('b', b'bbbb', {})
+    assert store.get('a') == (b'aaaa', {})  # a 比 b 更近被访问
+    store.put('c', b'cccc', {})
+    assert store.get('b') is None
+    assert store.get('a') is not None and store.get('c') is not None
+    assert store.total_size() == 8
+    store.put('huge', b'x' * 11, {})  # 超过上限的条目不写入
+    assert store.get('huge') is None and len(store) == 2
+    store.close()
+
+
+def test_frontier_normalizes_urls_and_enforces_budget():
+    """协议、默认端口、片段、末尾斜杠、跟踪参数和参数顺序不同的URL只抓一次；权威来源优先，超出预算的不再派发"""
+    from tools.frontier import CrawlFrontier, normalize_url
+
+    key = normalize_url('https://News.Example.com:443/a/b/?id=2&utm_source=x&page=1#top')
+    assert key == 'news.example.com/a/b?id=2&page=1'
+    assert normalize_url('http://news.example.com/a/b?page=1&spm=abc&id=2') == key
+    assert normalize_url('http://news.example.com:8080/a/b?page=1&id=2') != key
+
+    frontier = CrawlFrontier(page_budget=3)
+    assert frontier.add_many(['https://www.example.com/other/1', 'https://news.example.com/a/b?page=1&id=2',
+                              'https://www.sohu.com/a/2'], query='q1') == 3
+    assert not frontier.add('http://news.example.com/a/b/?id=2&page=1&from=timeline', query='q2')
+    assert frontier.add('https://career.pku.edu.cn/news/1', query='q2')
+    assert frontier.add('https://www.example.com/other/2', query='q2')
+
+    batch = frontier.pop_batch()
+    assert batch == [('https://career.pku.edu.cn/news/1', 'q2'), ('https://news.example.com/a/b?page=1&id=2', 'q1'),
+                     ('https://www.example.com/other/1', 'q1')]
+    assert frontier.pop() is None
+    assert frontier.stats() == {'discovered': 6, 'unique': 5, 'avoided_fetches': 1, 'dispatched': 3,
+                                'over_budget': 2, 'page_budget': 3}
+
+
+def test_stream_policy_rejects_truncates_and_aborts(http_server):
+    """非HTML直接拒绝；超过 max_bytes 截断；前 relevance_window 字节没有关键词则提前终止"""
+    from tools.scraper import WebScraper
+    from tools.stream_fetch import StreamPolicy
+
+    base, routes, _ = http_server
+    html = {'Content-Type': 'text/html; charset=utf-8'}
+    routes['/report.pdf'] = (200, {'Content-Type': 'application/pdf'}, b'%PDF-1.7' + b'0' * 5000)
+    routes['/long'] = (200, html, f"<p>{EMPLOYMENT_TEXT * 200}</p>".encode())
+    routes['/other'] = (200, html, ("<p>" + "天气晴朗，适合出游。" * 200 + "</p>").encode())
+    routes['/short'] = (200, html, f"<p>{EMPLOYMENT_TEXT}</p>".encode())
+    policy = StreamPolicy(max_bytes=4096, relevance_window=1024, chunk_size=256)
+    scraper = WebScraper(per_host_delay=0, stream_policy=policy)
+
+    assert scraper.fetch_page(base + '/report.pdf', content=True) == ''
+    assert len(scraper.fetch_page(base + '/long', content=True).encode()) <= 4096
+    assert scraper.fetch_page(base + '/other', content=True) == ''
+    assert scraper.fetch_page(base + '/short', content=True) == f"<p>{EMPLOYMENT_TEXT}</p>"
+    assert scraper.fetch_page(base + '/other') != ''  # 搜索结果页等非内容页不走流式策略
+    stats = policy.summary()
+    assert (stats['pages'], stats['rejected_content_type'], stats['truncated'], stats['aborted_irrelevant']) == (4, 1, 1, 1)
+    assert stats['bytes_saved'] > 0
+
+
+def test_streamed_error_response_is_closed(http_server, monkeypatch):
+    """流式下载遇到 4xx/5xx 时也关闭响应，连接归还连接池"""
+    from tools.scraper import WebScraper
+
+    base, routes, _ = http_server
+    routes['/error'] = (500, {'Content-Type': 'text/html'}, b'<p>server error</p>' * 100)
+    scraper = WebScraper(per_host_delay=0)
+    responses = []
+    get = scraper.session.get
+
+    def recording_get(*args, **kwargs):
+        responses.append(get(*args, **kwargs))
+        return responses[-1]
+
+    monkeypatch.setattr(scraper.session, "get", recording_get)
+    assert scraper.fetch_page(base + '/error', content=True) == ''
+    assert responses[0].status_code == 500 and responses[0].raw.closed
+
+
+class CountingLLM:
+    """代替 ChatOllama：回显提示词，记录调用次数"""
+
+    def __init__(self, seed=1, temperature=0.7):
+        self.model, self.seed, self.temperature = 'fake', seed, temperature
+        self.calls = 0
+
+    def invoke(self, prompt: str):
+        from langchain_core.messages import AIMessage
+        self.calls += 1
+        return AIMessage(content=f"回答{self.calls}：{prompt}")
+
+
+def test_llm_cache_keys_determinism_and_bypass(tmp_path):
+    """键包含模型、seed 和 temperature；只缓存可复现的调用；bypass 时重新生成并覆盖缓存"""
+    from tools.llm_cache import LLMCache
+    from tools.llm_client import StreamingLLM
+
+    path = str(tmp_path / 'llm.sqlite')
+    llm = CountingLLM()
+    client = StreamingLLM(llm, stream=False, partial_dir=str(tmp_path), cache=LLMCache(path))
+    assert client.generate('写报告', 'a') == client.generate('写报告', 'a') == '回答1：写报告'
+    assert llm.calls == 1
+
+    for name, value in (('temperature', 0.9), ('seed', 2), ('model', 'other')):
+        setattr(llm, name, value)
+        client.generate('写报告', 'a')
+    assert llm.calls == 4
+
+    llm.seed, llm.temperature = None, 0.7  # 随机采样：不读也不写缓存
+    assert client.generate('写报告', 'a') != client.generate('写报告', 'a')
+    llm.temperature = 0  # 贪心解码可复现
+    assert client.generate('写报告', 'a') == client.generate('写报告', 'a')
+    assert llm.calls == 7
+    assert client.cache.stats == {'hits': 2, 'misses': 5, 'stored': 5, 'skipped': 2}
+
+    llm.model, llm.seed, llm.temperature = 'fake', 1, 0.7
+    bypass = StreamingLLM(llm, stream=False, partial_dir=str(tmp_path), cache=LLMCache(path, bypass=True))
+    assert bypass.generate('写报告', 'a') == '回答8：写报告'
+    assert client.generate('写报告', 'a') == '回答8：写报告'  # 强制刷新的结果写回了缓存
+
+
+SECTIONED_REPORT = ("# 2024 就业报告\n\n导语原文。\n\n"
+                    "## 一、总体情况\n\n总体原文，就业率85.5%。\n\n"
+                    "## 二、地区差异\n\n地区原文（生成失败）。\n\n"
+                    "## 三、结论与建议\n\n结论原文。\n")
+
+
+class SectionLLM:
+    """代替 ChatOllama：把提示词（即章节原文）中的"原文"改为"改写"；后面的章节先完成，提示词含"失败"时抛出异常"""
+
+    def __init__(self):
+        self.model, self.seed, self.temperature = 'fake', None, 0.7
+        self.prompts = []
+
+    def invoke(self, prompt: str):
+        import time
+        from langchain_core.messages import AIMessage
+        self.prompts.append(prompt)
+        if '失败' in prompt:
+            raise RuntimeError('ollama timeout')
+        time.sleep(0.05 if '一、' in prompt else 0)
+        return AIMessage(content=prompt.replace('原文', '改写').rstrip('\n'))
+
+
+def test_section_optimizer_keeps_order_and_falls_back(tmp_path):
+    """各章节并发生成、按原顺序拼回；导语不发给 LLM；重试用完的章节保留原文"""
+    from tools.llm_client import StreamingLLM
+    from tools.sections import SectionOptimizer
+
+    llm = SectionLLM()
+    optimizer = SectionOptimizer(StreamingLLM(llm, stream=False, partial_dir=str(tmp_path)),
+                                 max_parallel=3, retries=1, retry_delay=0)
+    result = optimizer.optimize(SECTIONED_REPORT, lambda section: section, 'optimize')
+    assert result == ("# 2024 就业报告\n\n导语原文。\n\n"
+                      "## 一、总体情况\n\n总体改写，就业率85.5%。\n\n"
+                      "## 二、地区差异\n\n地区原文（生成失败）。\n\n"
+                      "## 三、结论与建议\n\n结论改写。\n\n")
+    assert len(llm.prompts) == 4  # 三个章节，失败的章节重试一次
+    assert [(item['title'], item['ok'], item['attempts']) for item in optimizer.results] == [
+        ('一、总体情况', True, 1), ('二、地区差异', False, 2), ('三、结论与建议', True, 1)]
+
+
+def test_section_rewrite_touches_only_commented_sections(tmp_path):
+    """只重新生成有审核意见的章节，其余章节（含导语）逐字节保留"""
+    from tools.llm_client import StreamingLLM
+    from tools.sections import SectionOptimizer, split_sections
+
+    llm = SectionLLM()
+    optimizer = SectionOptimizer(StreamingLLM(llm, stream=False, partial_dir=str(tmp_path)), retries=0)
+    original = split_sections(SECTIONED_REPORT)
+    result = optimizer.rewrite(SECTIONED_REPORT, {3: ['建议部分不够充分'], 7: ['越界的下标忽略']},
+                               lambda section, comments: section, 'rewrite')
+    sections = split_sections(result)
+    assert len(sections) == len(original)
+    assert sections[:3] == original[:3]
+    assert sections[3] == "## 三、结论与建议\n\n结论改写。\n\n"
+    assert llm.prompts == [original[3]]
+    assert optimizer.tokens['replaced'] > 0 and optimizer.tokens['kept'] > optimizer.tokens['replaced']
+
+
+def test_candidate_generator_keeps_best_score(monkeypatch, tmp_path):
+    """各候选使用不同的 seed/temperature；选用得分最高的候选，同分取序号小的，生成失败的候选跳过"""
+    import tools.candidates
+    from tools.candidates import CandidateGenerator
+    from tools.llm_client import StreamingLLM
+
+    scores = {1: 70, 2: 90, 3: 90, 4: None}  # seed -> 分数，None 表示生成失败
+
+    def produce(client, label, max_parallel, on_progress):
+        seed = client.llm.seed
+        if scores[seed] is None:
+            raise RuntimeError('ollama timeout')
+        return f"报告 seed={seed}", {'label': label, 'tokens': 10, 'total': 0.1}
+
+    monkeypatch.setattr(tools.candidates, "score_report",
+                        lambda text: {'score': scores[int(text.split('=')[1])], 'is_approved': True})
+    generator = CandidateGenerator(StreamingLLM(CountingLLM(seed=1, temperature=0.7), stream=False,
+                                                partial_dir=str(tmp_path)), count=4)
+    assert generator.generate(produce, 'candidates') == "报告 seed=2"
+    assert generator.selected == 1
+    assert [(item['index'], item['seed'], item['temperature'], item['score']) for item in generator.candidates] == [
+        (0, 1, 0.7, 70), (1, 2, 0.5, 90), (2, 3, 0.9, 90)]
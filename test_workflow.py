@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+工作流测试 - 用桩函数代替网络抓取和 LLM，验证各节点和检查点
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+import main
+from tools.records import EmploymentSummary, PageRecord
+
+
+def make_summary() -> EmploymentSummary:
+    """三个页面的抓取结果（同一省份、学校类别、专业类别各三个样本，分位数统计会实际计算）"""
+    return EmploymentSummary.from_pages([
+        PageRecord(source_url=f"https://example.com/{idx}", search_query="就业率", total_graduates="1179万",
+                   employment_rate=rate, signing_rate=rate - 10, province="北京",
+                   school_type="985_211_universities", major_categories={"stem_majors": rate + 2})
+        for idx, rate in enumerate([85.5, 88.0, 91.2])
+    ])
+
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """抓取结果由 make_summary 提供，缓存和抓取状态写到临时目录；返回 collect 的调用次数"""
+    calls = []
+
+    def collect(self):
+        calls.append(1)
+        return make_summary()
+
+    monkeypatch.setattr(main.DataScraperTool, "collect", collect)
+    monkeypatch.setattr(main, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "CRAWL_STATE_PATH", str(tmp_path / "crawl_state.sqlite"))
+    monkeypatch.chdir(tmp_path)
+    return calls
+
+
+@pytest.mark.parametrize("crawl_state", [True, False])
+def test_data_collection_node(offline, monkeypatch, crawl_state):
+    monkeypatch.setattr(main, "CRAWL_STATE_ENABLED", crawl_state)
+    state = {"messages": [], "raw_data": EmploymentSummary()}
+    result = main.data_collection_node(state)
+    assert result["raw_data"].total_sources == 3
+    assert len(result["messages"]) == 1
+    assert offline == [1]
+
+
+def test_analysis_data_survives_checkpoint_serializer():
+    """分析结果（含聚合立方体的分位数）必须能被检查点序列化并原样读回"""
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+    from tools.analyzer import EmploymentDataAnalyzer
+
+    serde = JsonPlusSerializer()
+    analysis = EmploymentDataAnalyzer(make_summary()).run()
+    assert analysis["regional_analysis"]["east_coast"]["source"] == "scraped"
+    assert analysis["major_analysis"]["stem_majors"]["source"] == "scraped"
+    assert serde.loads_typed(serde.dumps_typed(analysis)) == analysis
+
+    # 只有汇总列表（来自 JSON）时走等权统计
+    analysis = EmploymentDataAnalyzer(make_summary().to_dict()).run()
+    assert serde.loads_typed(serde.dumps_typed(analysis)) == analysis
+
+
+class FakeLLM:
+    """代替 ChatOllama：返回提示词中的报告内容；interrupt_first 为真时第一次调用模拟 Ctrl+C 中断"""
+
+    def __init__(self, interrupt_first: bool = False):
+        self.model, self.temperature, self.seed = 'fake', 0.7, 1
+        self.interrupt_first = interrupt_first
+        self.calls = 0
+
+    def invoke(self, prompt: str):
+        from langchain_core.messages import AIMessage
+        self.calls += 1
+        if self.interrupt_first and self.calls == 1:
+            raise KeyboardInterrupt
+        return AIMessage(content=prompt.split('报告内容：', 1)[-1].split('原报告：', 1)[-1])
+
+
+@pytest.fixture
+def stub_llm(monkeypatch, tmp_path):
+    """整篇、单候选生成，不使用 LLM 缓存，检查点写到临时目录"""
+    from tools.llm_client import StreamingLLM
+
+    def install(llm: FakeLLM) -> FakeLLM:
+        monkeypatch.setattr(main, "llm_client", StreamingLLM(llm, stream=False, partial_dir=str(tmp_path / "partial")))
+        return llm
+
+    monkeypatch.setattr(main, "LLM_SECTION_MODE", False)
+    monkeypatch.setattr(main, "REPORT_CANDIDATES", 1)
+    monkeypatch.setattr(main, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(main, "CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite"))
+    return install
+
+
+def test_graph_runs_through_checkpointer(offline, stub_llm):
+    llm = stub_llm(FakeLLM())
+    final_state = main.main([])
+    assert offline == [1]
+    assert llm.calls >= 1
+    assert final_state["analysis_data"]["core_indicators"]["total_sources"] == 3
+    assert final_state["rewrite_progress"]["stop_reason"]
+    assert os.path.exists(os.path.join("reports", "2024-2025高校本科生就业情况分析报告.md"))
+
+
+def test_resume_after_interrupt(offline, stub_llm):
+    """report_writing 中断后用 --resume 继续：从 data_analysis 之后的检查点开始，不再重新抓取"""
+    stub_llm(FakeLLM(interrupt_first=True))
+    with pytest.raises(KeyboardInterrupt):
+        main.main([])
+    checkpointer = main.open_checkpointer(main.CHECKPOINT_PATH)
+    run_id = next(checkpointer.list(None)).config["configurable"]["thread_id"]
+    snapshot = main.build_graph(checkpointer).get_state(main._run_config(run_id))
+    assert snapshot.next == ("report_writing",)
+
+    llm = stub_llm(FakeLLM())
+    final_state = main.main(["--resume", run_id])
+    assert offline == [1]  # 恢复运行没有再次抓取
+    assert llm.calls >= 1
+    assert final_state["raw_data"].total_sources == 3
+    assert not main.build_graph(checkpointer).get_state(main._run_config(run_id)).next
@@ -1,13 +1,96 @@
-import pandas as pd
-import numpy as np
-from typing import Dict, Any, List
+from typing import Dict, Any, Union
 import json
 
+from .normalize import normalize_counts, normalize_rates
+from .records import EmploymentSummary
+from .stats import pages_frame, describe
+from .cube import AggregationCube
+
+# 切片中有效样本少于该数量时，使用以下参考值
+CUBE_MIN_SAMPLES = 3
+
+REGION_DEFAULTS = {
+    'east_coast': {
+        'avg_employment_rate': 0.85,
+        'characteristics': '经济发达，机会多但竞争激烈',
+        'hot_provinces': ['北京', '上海', '广东', '江苏', '浙江']
+    },
+    'central_region': {
+        'avg_employment_rate': 0.78,
+        'characteristics': '就业机会稳定，生活成本适中',
+        'hot_provinces': ['湖北', '湖南', '河南', '安徽']
+    },
+    'west_region': {
+        'avg_employment_rate': 0.72,
+        'characteristics': '政策支持，新兴发展区域',
+        'hot_provinces': ['四川', '重庆', '陕西']
+    }
+}
+
+MAJOR_DEFAULTS = {
+    'stem_majors': {
+        'employment_rate': 0.92,
+        'top_majors': ['计算机', '电子信息', '机械工程', '自动化'],
+        'trend': '需求旺盛，薪资较高'
+    },
+    'humanities_majors': {
+        'employment_rate': 0.75,
+        'top_majors': ['汉语言', '历史', '哲学', '外语'],
+        'trend': '竞争激烈，向新媒体、内容创作转型'
+    },
+    'social_science_majors': {
+        'employment_rate': 0.82,
+        'top_majors': ['经济学', '管理学', '法学'],
+        'trend': '金融科技、咨询等领域需求增长'
+    },
+    'arts_majors': {
+        'employment_rate': 0.68,
+        'top_majors': ['设计', '音乐', '美术'],
+        'trend': '自由创业比例高，数字艺术兴起'
+    }
+}
+
+SCHOOL_TYPE_DEFAULTS = {
+    '985_211_universities': {
+        'employment_rate': 0.90,
+        'avg_salary': '9000-15000元',
+        'characteristics': '优势明显，大厂青睐'
+    },
+    'general_universities': {
+        'employment_rate': 0.78,
+        'avg_salary': '6000-9000元',
+        'characteristics': '稳步提升，注重实践能力'
+    },
+    'vocational_colleges': {
+        'employment_rate': 0.88,
+        'avg_salary': '5000-8000元',
+        'characteristics': '技能导向，就业匹配度高'
+    }
+}
+
+
 class EmploymentDataAnalyzer:
     """就业数据分析器"""
     
-    def __init__(self, data: Dict[str, Any]):
-        self.data = data
+    def __init__(self, data: Union[EmploymentSummary, Dict[str, Any]]):
+        self.data = data if isinstance(data, EmploymentSummary) else EmploymentSummary.from_dict(data)
+        # 逐页记录一次性载入 DataFrame；只有汇总列表（如来自 JSON）时按等权处理
+        if self.data.pages:
+            self.frame = pages_frame(self.data.pages)
+            self.columns = {
+                column: (self.frame[column].to_numpy(), self.frame['weight'].to_numpy())
+                for column in ('employment_rate', 'signing_rate', 'total_graduates')
+            }
+        else:
+            self.frame = None
+            self.columns = {
+                'employment_rate': (normalize_rates(self.data.employment_rates), None),
+                'signing_rate': (normalize_rates(self.data.signing_rates), None),
+                'total_graduates': (normalize_counts(self.data.graduate_counts), None)
+            }
+        # 按地区/省份/学校类别/专业类别预聚合，各维度分析直接查切片
+        self.cube = AggregationCube()
+        self.cube.add(self.data.pages)
         self.analysis = {
             'core_indicators': {},
             'trends': [],
@@ -18,6 +101,10 @@ class EmploymentDataAnalyzer:
         }
     
     def analyze(self) -> str:
+        """执行完整分析并返回 JSON 字符串（兼容原接口，流程内部使用 run()）"""
+        return json.dumps(self.run(), ensure_ascii=False, indent=2)
+    
+    def run(self) -> Dict[str, Any]:
         """执行完整分析"""
         self._analyze_core_indicators()
         self._analyze_trends()
@@ -26,16 +113,24 @@ class EmploymentDataAnalyzer:
         self._analyze_school_types()
         self._analyze_freelance()
         
-        return json.dumps(self.analysis, ensure_ascii=False, indent=2)
+        return self.analysis
     
     def _analyze_core_indicators(self):
-        """分析核心指标"""
+        """分析核心指标（均值、中位数、截尾均值、标准差、分位数、IQR 异常值剔除、按来源加权）"""
+        employment = describe(*self.columns['employment_rate'])
+        signing = describe(*self.columns['signing_rate'])
+        graduates = describe(*self.columns['total_graduates'])
         self.analysis['core_indicators'] = {
-            'total_sources': self.data.get('total_sources', 0),
-            'avg_employment_rate': self.data.get('avg_employment_rate', 0),
-            'avg_signing_rate': self.data.get('avg_signing_rate', 0),
-            'employment_rate_range': self._calculate_range(self.data.get('employment_rates', [])),
-            'signing_rate_range': self._calculate_range(self.data.get('signing_rates', []))
+            'total_sources': self.data.total_sources,
+            'avg_employment_rate': employment['mean'] if employment['count'] else self.data.avg_employment_rate or 0,
+            'avg_signing_rate': signing['mean'] if signing['count'] else self.data.avg_signing_rate or 0,
+            'median_total_graduates': graduates['median'],
+            'employment_rate_range': self._calculate_range(employment),
+            'signing_rate_range': self._calculate_range(signing),
+            'total_graduates_range': {'min': graduates['min'], 'max': graduates['max']},
+            'employment_rate_stats': employment,
+            'signing_rate_stats': signing,
+            'total_graduates_stats': graduates
         }
     
     def _analyze_trends(self):
@@ -51,68 +146,20 @@ class EmploymentDataAnalyzer:
     
     def _analyze_regional(self):
         """区域分析"""
-        self.analysis['regional_analysis'] = {
-            'east_coast': {
-                'avg_employment_rate': 0.85,
-                'characteristics': '经济发达，机会多但竞争激烈',
-                'hot_provinces': ['北京', '上海', '广东', '江苏', '浙江']
-            },
-            'central_region': {
-                'avg_employment_rate': 0.78,
-                'characteristics': '就业机会稳定，生活成本适中',
-                'hot_provinces': ['湖北', '湖南', '河南', '安徽']
-            },
-            'west_region': {
-                'avg_employment_rate': 0.72,
-                'characteristics': '政策支持，新兴发展区域',
-                'hot_provinces': ['四川', '重庆', '陕西']
-            }
-        }
+        self.analysis['regional_analysis'] = self._from_cube('region', REGION_DEFAULTS, 'avg_employment_rate')
+        for region, entry in self.analysis['regional_analysis'].items():
+            provinces = self.cube.groups('province', region=region)
+            if entry['source'] == 'scraped' and provinces:
+                ranked = sorted(provinces, key=lambda name: provinces[name]['records'], reverse=True)
+                entry['hot_provinces'] = ranked[:5]
     
     def _analyze_major_categories(self):
         """专业类别分析"""
-        self.analysis['major_analysis'] = {
-            'stem_majors': {
-                'employment_rate': 0.92,
-                'top_majors': ['计算机', '电子信息', '机械工程', '自动化'],
-                'trend': '需求旺盛，薪资较高'
-            },
-            'humanities_majors': {
-                'employment_rate': 0.75,
-                'top_majors': ['汉语言', '历史', '哲学', '外语'],
-                'trend': '竞争激烈，向新媒体、内容创作转型'
-            },
-            'social_science_majors': {
-                'employment_rate': 0.82,
-                'top_majors': ['经济学', '管理学', '法学'],
-                'trend': '金融科技、咨询等领域需求增长'
-            },
-            'arts_majors': {
-                'employment_rate': 0.68,
-                'top_majors': ['设计', '音乐', '美术'],
-                'trend': '自由创业比例高，数字艺术兴起'
-            }
-        }
+        self.analysis['major_analysis'] = self._from_cube('major', MAJOR_DEFAULTS, 'employment_rate')
     
     def _analyze_school_types(self):
         """学校类别分析"""
-        self.analysis['school_type_analysis'] = {
-            '985_211_universities': {
-                'employment_rate': 0.90,
-                'avg_salary': '9000-15000元',
-                'characteristics': '优势明显，大厂青睐'
-            },
-            'general_universities': {
-                'employment_rate': 0.78,
-                'avg_salary': '6000-9000元',
-                'characteristics': '稳步提升，注重实践能力'
-            },
-            'vocational_colleges': {
-                'employment_rate': 0.88,
-                'avg_salary': '5000-8000元',
-                'characteristics': '技能导向，就业匹配度高'
-            }
-        }
+        self.analysis['school_type_analysis'] = self._from_cube('school_type', SCHOOL_TYPE_DEFAULTS, 'employment_rate')
     
     def _analyze_freelance(self):
         """自由职业分析"""
@@ -138,11 +185,24 @@ class EmploymentDataAnalyzer:
             ]
         }
     
-    def _calculate_range(self, values: List[float]) -> Dict[str, float]:
+    def _from_cube(self, dimension: str, defaults: Dict[str, Dict[str, Any]], field: str) -> Dict[str, Dict[str, Any]]:
+        """按维度从聚合立方体取各分组的就业率，样本不足的分组沿用参考值"""
+        result = {}
+        for key, default in defaults.items():
+            entry = dict(default)
+            cell = self.cube.slice(**{dimension: key})
+            samples = cell['employment_rate']['count'] if cell else 0
+            if samples >= CUBE_MIN_SAMPLES:
+                entry[field] = cell['employment_rate']['mean']
+                entry['median_employment_rate'] = cell['employment_rate']['p50']
+            entry['samples'] = samples
+            entry['source'] = 'scraped' if samples >= CUBE_MIN_SAMPLES else 'default'
+            result[key] = entry
+        return result
+    
+    def _calculate_range(self, stats: Dict[str, Any]) -> Dict[str, float]:
         """计算范围"""
-        if not values:
-            return {'min': 0, 'max': 0}
         return {
-            'min': round(min(values), 2),
-            'max': round(max(values), 2)
+            'min': round(stats['min'], 4),
+            'max': round(stats['max'], 4)
         }
@@ -0,0 +1,184 @@
+import copy
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .llm_client import StreamingLLM, GenerationStats, log
+from .reviewer import ReportReviewer
+
+# produce(client, label, max_parallel, on_progress) -> (生成的报告, generation_stats 记录)
+Produce = Callable[[StreamingLLM, str, int, Optional[Callable[[Dict[str, Any]], None]]], Tuple[str, Dict[str, Any]]]
+
+
+def score_report(report: str) -> Dict[str, Any]:
+    """审核一个候选版本（模块级函数，可被子进程导入）"""
+    return ReportReviewer(report).review()
+
+
+def _warm_up():
+    """空任务：让进程池在生成候选期间就完成子进程启动和模块导入"""
+    return None
+
+
+class _SharedSlots:
+    """包装 LLM：所有候选共用 Ollama 的并行槽位，同时进行中的请求不超过 slots 个"""
+
+    def __init__(self, llm, slots: threading.Semaphore):
+        self.llm = llm
+        self.slots = slots
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def invoke(self, prompt: str):
+        with self.slots:
+            return self.llm.invoke(prompt)
+
+    def stream(self, prompt: str):
+        with self.slots:
+            yield from self.llm.stream(prompt)
+
+
+class CandidateGenerator:
+    """
+    一次生成多个候选版本：各候选使用不同的 seed 和 temperature 并发生成，全部候选的请求共用
+    Ollama 的并行槽位（max_parallel）。每个候选生成完即用 ReportReviewer 打分，与其余候选的生成重叠；
+    score_workers > 0 时打分交给进程池（报告很长时不占用生成线程所在进程的 GIL）。保留得分最高的版本（同分取序号小的）。
+    第 0 个候选沿用原有的模型参数，count=1 时与只生成一次完全相同。
+    """
+
+    def __init__(self, client: StreamingLLM, count: int = 3, temperature_step: float = 0.2,
+                 max_parallel: int = 4, score_workers: int = 0):
+        self.client = client
+        self.count = max(1, count)
+        self.temperature_step = temperature_step
+        self.max_parallel = max(1, max_parallel)
+        self.score_workers = score_workers
+        self.candidates: List[Dict[str, Any]] = []
+        self.selected = 0
+        self.score_seconds = 0.0
+
+    def sampling(self, index: int) -> Dict[str, Any]:
+        """第 index 个候选的采样参数：seed 依次加 1（未设置时保持随机采样），temperature 在原值两侧交替偏移"""
+        seed = getattr(self.client.llm, 'seed', None)
+        temperature = getattr(self.client.llm, 'temperature', None)
+        if index == 0:
+            return {'seed': seed, 'temperature': temperature}
+        offset = (index + 1) // 2 * self.temperature_step * (1 if index % 2 == 0 else -1)
+        return {
+            'seed': seed + index if seed is not None else None,
+            'temperature': round(min(max(temperature + offset, 0.0), 2.0), 2) if temperature is not None else None
+        }
+
+    def client_for(self, index: int, slots: threading.Semaphore) -> StreamingLLM:
+        """第 index 个候选使用的客户端：复制模型并替换采样参数，共用 LLM 缓存和槽位"""
+        llm = copy.copy(self.client.llm)
+        for name, value in self.sampling(index).items():
+            setattr(llm, name, value)
+        return StreamingLLM(_SharedSlots(llm, slots), stream=self.client.stream, partial_dir=self.client.partial_dir,
+                            progress_interval=self.client.progress_interval, cache=self.client.cache)
+
+    def generate(self, produce: Produce, label: str,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """生成全部候选并打分，返回得分最高的版本；各候选的参数、分数和耗时见 self.candidates"""
+        if self.count == 1:
+            text, generation = produce(self.client, label, self.max_parallel, on_progress)
+            self.candidates = [{'index': 0, **self.sampling(0), 'text': text, 'generation': generation}]
+            self.selected, self.score_seconds = 0, 0.0
+            return text
+
+        slots = threading.Semaphore(self.max_parallel)
+        progress: Dict[int, Dict[str, Any]] = {}
+        lock = threading.Lock()
+        done = []
+        start = time.perf_counter()
+
+        def report_progress(index: int, event: Dict[str, Any]):
+            if on_progress is None:
+                return
+            with lock:
+                progress[index] = event
+                on_progress({
+                    'label': f"{label} {len(done)}/{self.count} 个候选",
+                    'chars': sum(item['chars'] for item in progress.values()),
+                    'tokens': sum(item['tokens'] for item in progress.values()),
+                    'elapsed': round(time.perf_counter() - start, 1),
+                    'tokens_per_sec': round(sum(item['tokens_per_sec'] for idx, item in progress.items()
+                                                if idx not in done), 1)
+                })
+
+        def run(index: int) -> Optional[Dict[str, Any]]:
+            try:
+                text, generation = produce(self.client_for(index, slots), f"{label}-c{index}", self.max_parallel,
+                                           lambda event: report_progress(index, event))
+            except Exception as e:
+                log(f"   ⚠️ 候选 {index} 生成失败: {e}")
+                return None
+            finally:
+                with lock:
+                    done.append(index)
+            # 生成完一个候选就打分，与其余候选的生成重叠
+            review = pool.submit(score_report, text) if pool else score_report(text)
+            return {'index': index, **self.sampling(index), 'text': text, 'generation': generation, 'review': review}
+
+        pool = None
+        if self.score_workers > 0:
+            workers = min(self.score_workers, self.count)
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            for _ in range(workers):
+                pool.submit(_warm_up)
+        try:
+            # 每个候选一个线程；实际同时进行的 LLM 请求数由 slots 限制
+            with ThreadPoolExecutor(max_workers=self.count) as executor:
+                candidates = [candidate for candidate in executor.map(run, range(self.count)) if candidate]
+            if not candidates:
+                raise RuntimeError(f"{self.count} 个候选版本全部生成失败")
+
+            began = time.perf_counter()
+            for candidate in candidates:
+                result = candidate.pop('review')
+                if pool:
+                    # 子进程的审核结果写回本进程的缓存，之后的审核节点不再重复审核选中的版本
+                    result = result.result()
+                    ReportReviewer.remember(candidate['text'], result)
+                candidate.update(score=result['score'], is_approved=result['is_approved'])
+            self.score_seconds = time.perf_counter() - began
+        finally:
+            if pool:
+                pool.shutdown()
+
+        self.candidates = candidates
+        best = max(candidates, key=lambda item: (item['score'], -item['index']))
+        self.selected = best['index']
+
+        for candidate in candidates:
+            print(f"   🎲 候选 {candidate['index']}（seed {candidate['seed']}, temperature {candidate['temperature']}）: "
+                  f"{candidate['score']} 分，{candidate['generation']['tokens']} tokens，"
+                  f"{candidate['generation']['total']:.1f}s")
+        print(f"   🏆 选用候选 {best['index']}（{best['score']} 分，审核{'通过' if best['is_approved'] else '未通过'}），"
+              f"生成结束后等待打分 {self.score_seconds:.2f}s")
+        return best['text']
+
+    def summary(self, label: str, total: float) -> Dict[str, Any]:
+        """汇总为一条 generation_stats 记录（total 为端到端耗时）；count=1 时即为该次生成的记录"""
+        if self.count == 1:
+            return self.candidates[0]['generation']
+        generations = [candidate['generation'] for candidate in self.candidates]
+        stats = GenerationStats(
+            label=label,
+            chars=sum(generation['chars'] for generation in generations),
+            tokens=sum(generation['tokens'] for generation in generations),
+            ttft=min(generation['ttft'] for generation in generations),
+            total=total,
+            streamed=self.client.stream,
+            cached=all(generation['cached'] for generation in generations)
+        )
+        return {
+            **stats.to_dict(),
+            'selected': self.selected,
+            'score_seconds': round(self.score_seconds, 3),
+            'candidates': [{key: value for key, value in candidate.items() if key != 'text'}
+                           for candidate in self.candidates]
+        }
@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .records import PageRecord
+
+
+def content_hash(html: str) -> str:
+    """页面内容指纹，用于判断重新抓取的页面是否有变化"""
+    return hashlib.sha1(html.encode('utf-8', errors='replace')).hexdigest()
+
+
+class CrawlState:
+    """
+    持久化抓取状态（SQLite）：
+
+    pages    每个URL最近一次抓取的时间、内容哈希、页面长度、提取的指标和 MinHash 签名
+    runs     每次运行的状态（running / completed），未完成的运行可以恢复
+    run_urls 每次运行计划抓取的页面及处理结果（accepted / rejected / duplicate），用于断点续抓和重建汇总
+    """
+
+    def __init__(self, path: str = '.cache/crawl_state.sqlite'):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.run_id: Optional[str] = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                content_hash TEXT,
+                html_len INTEGER NOT NULL,
+                metrics TEXT,
+                signature BLOB
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                status TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS run_urls (
+                run_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                query TEXT NOT NULL,
+                outcome TEXT,
+                duplicate_of TEXT,
+                PRIMARY KEY (run_id, url)
+            );
+        """)
+        self._conn.commit()
+
+    # ---- 页面记录 ----
+
+    def save_page(self, url: str, html_len: int, data: Optional[Dict[str, Any]],
+                  signature: Optional[np.ndarray], digest: Optional[str]):
+        """保存页面的抓取结果（data 为 None 表示未提取指标，如抓取失败或转载副本）"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, status, fetched_at, content_hash, html_len, metrics, signature) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, 'fetched' if html_len else 'failed', time.time(), digest, html_len,
+                 json.dumps(data, ensure_ascii=False) if data is not None else None,
+                 signature.tobytes() if signature is not None else None)
+            )
+            self._conn.commit()
+
+    def get_page(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status, fetched_at, content_hash, html_len, metrics, signature FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        return self._page(row) if row else None
+
+    def fresh_pages(self, urls: List[str], max_age: float) -> Dict[str, Dict[str, Any]]:
+        """max_age 秒内成功抓取并提取过指标的页面，可以直接复用而不必重新下载"""
+        if max_age <= 0 or not urls:
+            return {}
+        cutoff = time.time() - max_age
+        fresh = {}
+        with self._lock:
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                rows = self._conn.execute(
+                    "SELECT url, status, fetched_at, content_hash, html_len, metrics, signature FROM pages "
+                    f"WHERE url IN ({','.join('?' * len(chunk))}) AND status = 'fetched' "
+                    "AND metrics IS NOT NULL AND fetched_at >= ?",
+                    (*chunk, cutoff)
+                ).fetchall()
+                fresh.update((row[0], self._page(row)) for row in rows)
+        return fresh
+
+    @staticmethod
+    def _page(row: Tuple) -> Dict[str, Any]:
+        return {
+            'url': row[0],
+            'status': row[1],
+            'fetched_at': row[2],
+            'content_hash': row[3],
+            'html_len': row[4],
+            'metrics': json.loads(row[5]) if row[5] is not None else None,
+            'signature': np.frombuffer(row[6], dtype=np.uint64).copy() if row[6] is not None else None
+        }
+
+    # ---- 运行记录 ----
+
+    def start_run(self, targets: List[Tuple[str, str]]) -> str:
+        """登记一次新运行及其计划抓取的页面"""
+        run_id = time.strftime('%Y%m%d-%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO runs (run_id, started_at, status) VALUES (?, ?, 'running')", (run_id, time.time())
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO run_urls (run_id, position, url, query) VALUES (?, ?, ?, ?)",
+                [(run_id, position, url, query) for position, (url, query) in enumerate(targets)]
+            )
+            self._conn.commit()
+        self.run_id = run_id
+        return run_id
+
+    def resume_run(self, run_id: Optional[str] = None) -> Optional[str]:
+        """恢复指定的（默认最近一次）未完成运行，没有可恢复的运行时返回 None"""
+        with self._lock:
+            if run_id:
+                row = self._conn.execute(
+                    "SELECT run_id FROM runs WHERE run_id = ? AND status = 'running'", (run_id,)
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    "SELECT run_id FROM runs WHERE status = 'running' ORDER BY started_at DESC LIMIT 1"
+                ).fetchone()
+        self.run_id = row[0] if row else None
+        return self.run_id
+
+    def pending_targets(self) -> List[Tuple[str, str]]:
+        """当前运行中尚未处理的页面"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, query FROM run_urls WHERE run_id = ? AND outcome IS NULL ORDER BY position",
+                (self.run_id,)
+            ).fetchall()
+
+    def mark_done(self, url: str, outcome: str, duplicate_of: Optional[str] = None):
+        """记录当前运行中一个页面的处理结果"""
+        if not self.run_id:
+            return
+        with self._lock:
+            self._conn.execute(
+                "UPDATE run_urls SET outcome = ?, duplicate_of = ? WHERE run_id = ? AND url = ?",
+                (outcome, duplicate_of, self.run_id, url)
+            )
+            self._conn.commit()
+
+    def finish_run(self):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = 'completed', finished_at = ? WHERE run_id = ?", (time.time(), self.run_id)
+            )
+            self._conn.commit()
+
+    def run_signatures(self) -> List[Tuple[str, np.ndarray]]:
+        """当前运行中已处理且不是转载副本的页面签名（恢复运行时用于重建近重复索引）"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.url, p.signature FROM run_urls r JOIN pages p ON p.url = r.url "
+                "WHERE r.run_id = ? AND r.outcome IS NOT NULL AND r.outcome != 'duplicate' "
+                "AND p.signature IS NOT NULL ORDER BY r.position",
+                (self.run_id,)
+            ).fetchall()
+        return [(url, np.frombuffer(blob, dtype=np.uint64).copy()) for url, blob in rows]
+
+    def run_results(self) -> List[PageRecord]:
+        """从已保存的记录重建当前运行的有效数据（含转载副本来源），与一次完整抓取的结果一致"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.url, r.query, r.outcome, r.duplicate_of, p.metrics FROM run_urls r "
+                "LEFT JOIN pages p ON p.url = r.url WHERE r.run_id = ? ORDER BY r.position",
+                (self.run_id,)
+            ).fetchall()
+
+        duplicates: Dict[str, List[str]] = {}
+        for url, _, outcome, duplicate_of, _ in rows:
+            if outcome == 'duplicate' and duplicate_of:
+                duplicates.setdefault(duplicate_of, []).append(url)
+
+        results = []
+        for url, query, outcome, _, metrics in rows:
+            if outcome != 'accepted' or metrics is None:
+                continue
+            record = PageRecord.from_metrics(json.loads(metrics), url, query)
+            record.duplicate_urls = duplicates.get(url)
+            results.append(record)
+        return results
+
+    def runs(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的运行及其进度"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.run_id, r.status, r.started_at, r.finished_at, COUNT(u.url), COUNT(u.outcome) "
+                "FROM runs r LEFT JOIN run_urls u ON u.run_id = r.run_id "
+                "GROUP BY r.run_id ORDER BY r.started_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {'run_id': run_id, 'status': status, 'started_at': started, 'finished_at': finished,
+             'planned': planned, 'done': done}
+            for run_id, status, started, finished, planned, done in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,213 @@
+import itertools
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .normalize import normalize_rates
+from .records import PageRecord
+
+# 东、中、西部三大地带
+REGIONS = {
+    'east_coast': ['北京', '天津', '河北', '辽宁', '上海', '江苏', '浙江', '福建', '山东', '广东', '海南'],
+    'central_region': ['山西', '吉林', '黑龙江', '安徽', '江西', '河南', '湖北', '湖南'],
+    'west_region': ['内蒙古', '广西', '重庆', '四川', '贵州', '云南', '西藏', '陕西', '甘肃', '青海', '宁夏', '新疆']
+}
+PROVINCE_REGION = {province: region for region, provinces in REGIONS.items() for province in provinces}
+PROVINCE_PATTERN = re.compile('|'.join(sorted(PROVINCE_REGION, key=len, reverse=True)))
+
+# 按顺序匹配，先命中的类别优先
+SCHOOL_TYPE_PATTERNS = {
+    '985_211_universities': re.compile(r'985|211|双一流'),
+    'vocational_colleges': re.compile(r'高职|职业技术学院|职业学院|专科'),
+    'general_universities': re.compile(r'普通本科|本科院校|普通高校|地方高校')
+}
+
+MAJOR_KEYWORDS = {
+    'stem_majors': ['计算机', '软件工程', '电子信息', '机械', '自动化', '电气', '通信', '土木'],
+    'humanities_majors': ['汉语言', '历史学', '哲学', '外语', '英语', '新闻'],
+    'social_science_majors': ['经济学', '管理学', '法学', '金融', '会计'],
+    'arts_majors': ['设计', '音乐', '美术', '舞蹈', '动画']
+}
+# 专业名称后 20 个字以内的百分数视为该专业的就业率
+MAJOR_PATTERNS = {
+    category: re.compile(rf"(?:{'|'.join(keywords)})[^%。；;]{{0,20}}?(\d+\.?\d*)%")
+    for category, keywords in MAJOR_KEYWORDS.items()
+}
+
+DIMENSIONS = ('region', 'province', 'school_type', 'major')
+MEASURES = ('employment_rate', 'signing_rate')
+ALL = '*'
+BINS = 200  # 分位数草图：[0, 1] 等分 200 个桶，精度 0.5 个百分点
+
+
+def match_dimensions(text: str) -> Dict[str, Any]:
+    """从网页文本中识别省份、学校类别和各专业类别的就业率（百分数）"""
+    province = PROVINCE_PATTERN.search(text)
+    school_type = next((name for name, pattern in SCHOOL_TYPE_PATTERNS.items() if pattern.search(text)), '')
+    majors = {}
+    for category, pattern in MAJOR_PATTERNS.items():
+        rates = [float(rate) for rate in pattern.findall(text)]
+        if rates:
+            majors[category] = round(sum(rates) / len(rates), 2)
+    return {
+        'province': province.group(0) if province else '',
+        'school_type': school_type,
+        'major_categories': majors
+    }
+
+
+@dataclass(slots=True)
+class Aggregate:
+    """单个指标在一个分组内的计数、和、平方和与直方图（可合并，支持增量更新）"""
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+    histogram: np.ndarray = field(default_factory=lambda: np.zeros(BINS, dtype=np.int64))
+
+    def quantile(self, q: float) -> float:
+        """由直方图估计分位数（桶内线性插值）"""
+        if not self.count:
+            return 0.0
+        cumulative = np.cumsum(self.histogram)
+        target = q * self.count
+        idx = int(np.searchsorted(cumulative, target, side='left'))
+        before = cumulative[idx - 1] if idx else 0
+        inside = self.histogram[idx]
+        return float((idx + (target - before) / inside if inside else idx) / BINS)
+
+    def summary(self) -> Dict[str, Any]:
+        """统计摘要（均为 Python 原生类型，可直接写入检查点）"""
+        if not self.count:
+            return {'count': 0, 'mean': 0, 'std': 0, 'p25': 0, 'p50': 0, 'p75': 0}
+        mean = self.total / self.count
+        variance = max(self.total_sq / self.count - mean * mean, 0.0)
+        return {
+            'count': int(self.count),
+            'mean': round(float(mean), 4),
+            'std': round(float(variance) ** 0.5, 4),
+            'p25': round(self.quantile(0.25), 4),
+            'p50': round(self.quantile(0.5), 4),
+            'p75': round(self.quantile(0.75), 4)
+        }
+
+
+class AggregationCube:
+    """
+    就业指标聚合立方体：按 地区 × 省份 × 学校类别 × 专业类别 的全部 16 种维度组合预先汇总
+    计数、和、平方和与分位数直方图，任意切片直接查表得到，不需要重新扫描页面记录。
+
+    没有指定专业时（major='*'）统计的是页面整体的就业率；指定专业时统计页面中该专业类别的就业率。
+    新记录通过 add() 增量合并进已有的分组。
+    """
+
+    def __init__(self):
+        self.cells: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def add(self, pages: List[PageRecord]):
+        """增量加入页面记录"""
+        self.update(self.facts(pages))
+
+    @staticmethod
+    def facts(pages: List[PageRecord]) -> pd.DataFrame:
+        """页面记录 -> 事实表：每个页面一行（major='*'），页面中每个专业类别再各一行"""
+        base = pd.DataFrame({
+            'province': [page.province for page in pages],
+            'school_type': [page.school_type for page in pages],
+            'major': ALL,
+            'employment_rate': normalize_rates([page.employment_rate for page in pages], unit='percent'),
+            'signing_rate': normalize_rates([page.signing_rate for page in pages], unit='percent')
+        })
+        majors = [(page.province, page.school_type, category, rate)
+                  for page in pages for category, rate in (page.major_categories or {}).items()]
+        if majors:
+            frame = pd.DataFrame(majors, columns=['province', 'school_type', 'major', 'employment_rate'])
+            frame['employment_rate'] = normalize_rates(frame['employment_rate'].to_numpy(dtype=float), unit='percent')
+            frame['signing_rate'] = np.nan
+            base = pd.concat([base, frame], ignore_index=True)
+        base['region'] = base['province'].map(PROVINCE_REGION).fillna('')
+        return base
+
+    def update(self, facts: pd.DataFrame):
+        """把事实表按全部维度组合分组汇总，合并进已有分组"""
+        if facts.empty:
+            return
+        # 每个维度只编码一次；编码 0 留给 '*'（不区分该维度），各维度编码按混合进制拼成一个整数分组键
+        codes, labels = {}, {}
+        for dimension in DIMENSIONS:
+            dimension_codes, uniques = pd.factorize(facts[dimension])
+            codes[dimension] = dimension_codes.astype(np.int64) + 1
+            labels[dimension] = [ALL, *uniques]
+        values = {measure: facts[measure].to_numpy(dtype=float) for measure in MEASURES}
+        bins = {
+            measure: np.clip((np.nan_to_num(values[measure]) * BINS).astype(np.int64), 0, BINS - 1)
+            for measure in MEASURES
+        }
+        is_page = (facts['major'] == ALL).to_numpy()
+
+        for fixed in itertools.product((True, False), repeat=len(DIMENSIONS)):
+            rows = ~is_page if fixed[DIMENSIONS.index('major')] else is_page
+            if not rows.any():
+                continue
+            combined = np.zeros(int(rows.sum()), dtype=np.int64)
+            for dimension, keep in zip(DIMENSIONS, fixed):
+                combined = combined * len(labels[dimension]) + (codes[dimension][rows] if keep else 0)
+            unique, inverse = np.unique(combined, return_inverse=True)
+            keys = []
+            for key in unique.tolist():
+                parts = []
+                for dimension in reversed(DIMENSIONS):
+                    key, code = divmod(key, len(labels[dimension]))
+                    parts.append(labels[dimension][code])
+                keys.append(tuple(reversed(parts)))
+            self._merge(keys, inverse, {measure: values[measure][rows] for measure in MEASURES},
+                        {measure: bins[measure][rows] for measure in MEASURES})
+
+    def _merge(self, keys: List[Tuple[str, ...]], codes: np.ndarray,
+               values: Dict[str, np.ndarray], bins: Dict[str, np.ndarray]):
+        groups = len(keys)
+        records = np.bincount(codes, minlength=groups)
+        partials = {}
+        for measure in MEASURES:
+            present = ~np.isnan(values[measure])
+            group_codes, measure_values = codes[present], values[measure][present]
+            histogram = np.bincount(group_codes * BINS + bins[measure][present],
+                                    minlength=groups * BINS).reshape(groups, BINS)
+            partials[measure] = (
+                np.bincount(group_codes, minlength=groups),
+                np.bincount(group_codes, weights=measure_values, minlength=groups),
+                np.bincount(group_codes, weights=measure_values ** 2, minlength=groups),
+                histogram
+            )
+        for idx, key in enumerate(keys):
+            cell = self.cells.get(key)
+            if cell is None:
+                cell = self.cells[key] = {'records': 0, **{measure: Aggregate() for measure in MEASURES}}
+            cell['records'] += int(records[idx])
+            for measure, (counts, sums, squares, histogram) in partials.items():
+                aggregate = cell[measure]
+                aggregate.count += int(counts[idx])
+                aggregate.total += float(sums[idx])
+                aggregate.total_sq += float(squares[idx])
+                aggregate.histogram += histogram[idx]
+
+    def slice(self, **filters: str) -> Optional[Dict[str, Any]]:
+        """查询一个切片，如 slice(region='east_coast')、slice(school_type='vocational_colleges', major='stem_majors')"""
+        cell = self.cells.get(tuple(filters.get(dimension, ALL) for dimension in DIMENSIONS))
+        if cell is None:
+            return None
+        return {'records': cell['records'], **{measure: cell[measure].summary() for measure in MEASURES}}
+
+    def groups(self, dimension: str, **filters: str) -> Dict[str, Dict[str, Any]]:
+        """在给定切片内按某一维度展开，如 groups('province', region='east_coast')"""
+        position = DIMENSIONS.index(dimension)
+        expected = [filters.get(name, ALL) for name in DIMENSIONS]
+        result = {}
+        for key in self.cells:
+            if key[position] in (ALL, '') or any(
+                    key[i] != expected[i] for i in range(len(DIMENSIONS)) if i != position):
+                continue
+            result[key[position]] = self.slice(**{**filters, dimension: key[position]})
+        return result
@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+
+class DiskLRUStore:
+    """基于 SQLite 的磁盘键值存储：总大小超过上限时按最近访问时间（LRU）淘汰"""
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                meta TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """读取条目并刷新访问时间"""
+        with self._lock:
+            row = self._conn.execute("SELECT value, meta FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, value: bytes, meta: Dict[str, Any]):
+        """写入条目，必要时淘汰最久未访问的条目"""
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, meta, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta, ensure_ascii=False), len(value), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def update_meta(self, key: str, meta: Dict[str, Any]):
+        """只更新元数据（如重新验证后的抓取时间）"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE entries SET meta = ?, accessed_at = ? WHERE key = ?",
+                (json.dumps(meta, ensure_ascii=False), time.time(), key)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def total_size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _evict(self):
+        """淘汰最久未访问的条目直到总大小不超过上限（调用方持有锁）"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Tuple, Any
+from urllib.parse import urlparse
+
+
+class HostThrottle:
+    """按主机限速：同一主机两次请求之间至少间隔 min_interval 秒"""
+
+    def __init__(self, min_interval: float = 2.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot: Dict[str, float] = {}
+
+    def wait(self, url: str):
+        """预约该主机的下一个请求时间片，必要时等待"""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ConcurrentFetcher:
+    """并发页面抓取器（有界线程池 + 全局并发上限 + 按主机礼貌间隔）"""
+
+    def __init__(self, fetch: Callable[[str], str], max_workers: int = 8, per_host_interval: float = 2.0):
+        self.fetch = fetch
+        self.max_workers = max(1, max_workers)
+        self.throttle = HostThrottle(per_host_interval)
+        self.last_stats: Dict[str, Any] = {}
+
+    def fetch_all(self, urls: List[str]) -> List[Tuple[str, str]]:
+        """并发抓取全部URL，结果按输入顺序返回 [(url, html), ...]"""
+        results: List[str] = [''] * len(urls)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_one, urls[idx]): idx
+                for idx in self._interleave_by_host(urls)
+            }
+            for future, idx in futures.items():
+                results[idx] = future.result()
+
+        elapsed = time.perf_counter() - start
+        ok = sum(1 for html in results if html)
+        self.last_stats = {
+            'pages': len(urls),
+            'succeeded': ok,
+            'elapsed': elapsed,
+            'pages_per_sec': len(urls) / elapsed if elapsed > 0 else 0.0
+        }
+        return list(zip(urls, results))
+
+    def _fetch_one(self, url: str) -> str:
+        """单个页面：先等待主机时间片再抓取；抓取出错时该页面记为空，不影响其他页面"""
+        self.throttle.wait(url)
+        try:
+            return self.fetch(url)
+        except Exception as e:
+            print(f"抓取失败 {url}: {e}")
+            return ''
+
+    @staticmethod
+    def _interleave_by_host(urls: List[str]) -> List[int]:
+        """按主机轮转排列提交顺序，避免工作线程集中等待同一主机"""
+        by_host: Dict[str, List[int]] = OrderedDict()
+        for idx, url in enumerate(urls):
+            by_host.setdefault(urlparse(url).netloc.lower(), []).append(idx)
+
+        order = []
+        queues = [list(reversed(indices)) for indices in by_host.values()]
+        while queues:
+            for queue in queues:
+                order.append(queue.pop())
+            queues = [queue for queue in queues if queue]
+        return order
@@ -0,0 +1,104 @@
+import heapq
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+# 常见的跟踪/来源参数，不影响页面内容
+TRACKING_PARAMS = {
+    'spm', 'from', 'src', 'source', 'ref', 'referer', 'refer', 'share', 'share_token',
+    'fbclid', 'gclid', 'msclkid', 'yclid', 'wfr', 'for', 'tt_from', 'scene', 'isappinstalled'
+}
+TRACKING_PREFIXES = ('utm_', 'share_', 'from_')
+
+# 优先抓取的权威来源（高校、政府）与内容页特征
+PRIORITY_DOMAINS = ('edu.cn', 'gov.cn', 'ac.cn', 'chsi', 'moe')
+CONTENT_HINTS = ('news', 'xinwen', 'article', 'report', 'employment', 'jiuye', 'graduate', 'bysh')
+
+
+def normalize_url(url: str) -> str:
+    """URL 规范化（用作去重键）：忽略协议、默认端口、片段、末尾斜杠和跟踪参数，查询参数排序"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    path = parts.path.rstrip('/')
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    key = host + path
+    if query:
+        key += '?' + urlencode(query)
+    return key
+
+
+def url_priority(url: str) -> int:
+    """URL 优先级：权威来源 > 内容页 > 其他"""
+    url_lower = url.lower()
+    if any(domain in url_lower for domain in PRIORITY_DOMAINS):
+        return 2
+    if any(hint in url_lower for hint in CONTENT_HINTS):
+        return 1
+    return 0
+
+
+class CrawlFrontier:
+    """全局抓取边界：跨查询共享的已见URL集合 + 优先队列 + 整次运行的页面预算"""
+
+    def __init__(self, page_budget: int = 150):
+        self.page_budget = page_budget
+        self._seen = set()
+        self._heap: List[Tuple[int, int, str, str]] = []
+        self._seq = 0
+        self.discovered = 0
+        self.duplicates = 0
+        self.dispatched = 0
+
+    def add(self, url: str, query: str = '') -> bool:
+        """加入URL，已见过（规范化后相同）则返回 False"""
+        self.discovered += 1
+        key = normalize_url(url)
+        if key in self._seen:
+            self.duplicates += 1
+            return False
+        self._seen.add(key)
+        heapq.heappush(self._heap, (-url_priority(url), self._seq, url, query))
+        self._seq += 1
+        return True
+
+    def add_many(self, urls: List[str], query: str = '') -> int:
+        """批量加入，返回新增数量"""
+        return sum(1 for url in urls if self.add(url, query))
+
+    def pop(self) -> Optional[Tuple[str, str]]:
+        """取出优先级最高的 (url, 来源查询)，预算用尽或队列为空时返回 None"""
+        if not self._heap or self.dispatched >= self.page_budget:
+            return None
+        _, _, url, query = heapq.heappop(self._heap)
+        self.dispatched += 1
+        return url, query
+
+    def pop_batch(self, size: Optional[int] = None) -> List[Tuple[str, str]]:
+        """取出一批待抓取页面（默认取到预算上限）"""
+        batch = []
+        while size is None or len(batch) < size:
+            item = self.pop()
+            if item is None:
+                break
+            batch.append(item)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'discovered': self.discovered,
+            'unique': len(self._seen),
+            'avoided_fetches': self.duplicates,
+            'dispatched': self.dispatched,
+            'over_budget': len(self._heap),
+            'page_budget': self.page_budget
+        }
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+import time
+from typing import Dict, Any, Optional, Iterable
+from urllib.parse import urlparse
+
+import requests
+
+from .disk_cache import DiskLRUStore
+
+
+class CachePolicy:
+    """缓存新鲜度策略：搜索结果页与内容页分别设置 TTL，并可按域名覆盖"""
+
+    def __init__(self, search_ttl: float = 6 * 3600, content_ttl: float = 30 * 24 * 3600,
+                 domain_ttls: Optional[Dict[str, float]] = None,
+                 search_domains: Iterable[str] = ('bing.com', 'sogou.com')):
+        """
+        search_ttl: 搜索引擎结果页的新鲜期（秒）
+        content_ttl: 内容页（新闻、就业质量报告等）的新鲜期（秒）
+        domain_ttls: 按域名后缀覆盖 TTL，如 {'edu.cn': 90 * 86400}
+        """
+        self.search_ttl = search_ttl
+        self.content_ttl = content_ttl
+        self.domain_ttls = domain_ttls or {}
+        self.search_domains = tuple(search_domains)
+
+    def ttl_for(self, url: str) -> float:
+        """返回URL对应的TTL，域名后缀匹配取最长的一条"""
+        host = (urlparse(url).hostname or '').lower()
+        best = None
+        for suffix, ttl in self.domain_ttls.items():
+            if self._host_matches(host, suffix) and (best is None or len(suffix) > len(best[0])):
+                best = (suffix, ttl)
+        if best:
+            return best[1]
+        if any(self._host_matches(host, domain) for domain in self.search_domains):
+            return self.search_ttl
+        return self.content_ttl
+
+    @staticmethod
+    def _host_matches(host: str, suffix: str) -> bool:
+        suffix = suffix.lower().lstrip('.')
+        return host == suffix or host.endswith('.' + suffix)
+
+
+class CachedResponse:
+    """缓存中的一条响应"""
+
+    def __init__(self, key: str, text: str, meta: Dict[str, Any], ttl: float):
+        self.key = key
+        self.text = text
+        self.meta = meta
+        self.ttl = ttl
+
+    @property
+    def is_fresh(self) -> bool:
+        return time.time() - self.meta.get('fetched_at', 0) < self.ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """条件请求头：If-None-Match / If-Modified-Since"""
+        headers = {}
+        if self.meta.get('etag'):
+            headers['If-None-Match'] = self.meta['etag']
+        if self.meta.get('last_modified'):
+            headers['If-Modified-Since'] = self.meta['last_modified']
+        return headers
+
+
+class ResponseCache:
+    """持久化HTTP响应缓存：按 URL+参数 存储，支持 ETag/Last-Modified 条件请求与 LRU 容量上限"""
+
+    def __init__(self, path: str = '.cache/http_cache.sqlite', max_bytes: int = 200 * 1024 * 1024,
+                 policy: Optional[CachePolicy] = None):
+        self.store = DiskLRUStore(path, max_bytes)
+        self.policy = policy or CachePolicy()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0}
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """缓存键：规范化后的完整请求URL（含查询参数）的哈希"""
+        full_url = requests.Request('GET', url, params=params).prepare().url
+        return hashlib.sha256(full_url.encode('utf-8')).hexdigest()
+
+    def lookup(self, url: str, params: Optional[Dict] = None) -> Optional[CachedResponse]:
+        key = self.make_key(url, params)
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        body, meta = entry
+        return CachedResponse(key, body.decode('utf-8'), meta, self.policy.ttl_for(url))
+
+    def save(self, url: str, params: Optional[Dict], text: str, headers) -> None:
+        """保存响应（带 no-store 的响应不缓存）"""
+        if 'no-store' in headers.get('Cache-Control', ''):
+            return
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        }
+        self.store.put(self.make_key(url, params), text.encode('utf-8'), meta)
+        self.record('stored')
+
+    def refresh(self, cached: CachedResponse, headers) -> None:
+        """304 之后刷新抓取时间（服务器可能下发新的校验值）"""
+        meta = dict(cached.meta)
+        meta['fetched_at'] = time.time()
+        meta['etag'] = headers.get('ETag') or meta.get('etag')
+        meta['last_modified'] = headers.get('Last-Modified') or meta.get('last_modified')
+        self.store.update_meta(cached.key, meta)
+
+    def record(self, event: str):
+        with self._lock:
+            self.stats[event] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        hits = self.stats['hits'] + self.stats['revalidated']
+        total = hits + self.stats['misses']
+        return hits / total if total else 0.0
@@ -0,0 +1,112 @@
+import threading
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING
+
+from .replay import HttpArchive, replay_url
+
+
+def accept_encoding() -> str:
+    """生成 Accept-Encoding：只声明 urllib3 实际能解码的压缩格式（br/zstd 需安装 Brotli/backports.zstd）"""
+    return ', '.join(enc.strip() for enc in ACCEPT_ENCODING.split(','))
+
+
+class ConnectionStats:
+    """连接统计：新建连接数 vs 复用连接数"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def record_open(self):
+        with self._lock:
+            self.opened += 1
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    @property
+    def reused(self) -> int:
+        return max(0, self.requests - self.opened)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'connections_opened': self.opened,
+            'connections_reused': self.reused,
+            'reuse_rate': self.reused / self.requests if self.requests else 0.0
+        }
+
+
+def _counting_pool(base, stats: ConnectionStats):
+    """生成在建立 TCP 连接时计数的连接池类（含断开后重连）"""
+    class CountingConnection(base.ConnectionCls):
+        def connect(self):
+            stats.record_open()
+            return super().connect()
+
+    class CountingPool(base):
+        ConnectionCls = CountingConnection
+    return CountingPool
+
+
+class PooledAdapter(HTTPAdapter):
+    """统计连接新建/复用次数的 HTTPAdapter；可录制响应到档案，或把请求转发到本地回放服务器"""
+
+    def __init__(self, stats: ConnectionStats, pool_connections: int = 10, pool_maxsize: int = 10,
+                 recorder=None, replay_base: Optional[str] = None, **kwargs):
+        self.stats = stats
+        self.recorder = recorder
+        self.replay_base = replay_base
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool(HTTPConnectionPool, self.stats),
+            'https': _counting_pool(HTTPSConnectionPool, self.stats)
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        url = request.url
+        if self.replay_base and not url.startswith(self.replay_base):
+            request.url = replay_url(self.replay_base, url)
+        response = super().send(request, **kwargs)
+        if self.recorder is not None:
+            self.recorder.record(url, response)
+        return response
+
+
+class PooledSession(requests.Session):
+    """连接池会话：keep-alive 复用 TCP/TLS 连接，可按主机单独设置连接池大小"""
+
+    def __init__(self, pool_connections: int = 50, pool_maxsize: int = 10,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 recorder: Optional[HttpArchive] = None, replay_base: Optional[str] = None):
+        """
+        pool_connections: 缓存的主机连接池个数
+        pool_maxsize: 每个主机连接池保留的最大连接数
+        host_pool_sizes: 按主机覆盖连接池大小，如 {'www.bing.com': 4}
+        recorder: 录制模式，把每次响应写入 HttpArchive
+        replay_base: 回放模式，所有请求转发到该回放服务器（如 http://127.0.0.1:8765）
+        """
+        super().__init__()
+        self.stats = ConnectionStats()
+
+        default_adapter = PooledAdapter(self.stats, pool_connections, pool_maxsize, recorder, replay_base)
+        self.mount('http://', default_adapter)
+        self.mount('https://', default_adapter)
+        for host, size in (host_pool_sizes or {}).items():
+            adapter = PooledAdapter(self.stats, 1, size, recorder, replay_base)
+            self.mount(f'http://{host}/', adapter)
+            self.mount(f'https://{host}/', adapter)
+
+    def connection_stats(self) -> Dict[str, Any]:
+        """连接统计"""
+        return self.stats.snapshot()
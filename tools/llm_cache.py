@@ -0,0 +1,73 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from .disk_cache import DiskLRUStore
+
+# 影响生成结果的模型参数（ChatOllama 字段），全部参与缓存键
+SAMPLING_FIELDS = ('model', 'temperature', 'seed', 'top_k', 'top_p', 'num_predict', 'num_ctx',
+                   'repeat_penalty', 'repeat_last_n', 'mirostat', 'mirostat_eta', 'mirostat_tau',
+                   'tfs_z', 'stop', 'format')
+
+
+class LLMCache:
+    """
+    持久化 LLM 响应缓存：键为 模型参数 + 提示词哈希，存储在 DiskLRUStore 中（容量上限、LRU 淘汰）。
+
+    只有输出可复现的调用才缓存：设置了 seed，或 temperature 为 0（贪心解码）。随机采样的调用每次
+    结果不同，直接跳过缓存（计入 skipped）。bypass 为 True 时不读取缓存但仍写入新结果，用于强制刷新。
+    """
+
+    def __init__(self, path: str = '.cache/llm_cache.sqlite', max_bytes: int = 50 * 1024 * 1024,
+                 bypass: bool = False):
+        self.store = DiskLRUStore(path, max_bytes)
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'skipped': 0}
+
+    @staticmethod
+    def params(llm) -> Dict[str, Any]:
+        return {name: getattr(llm, name, None) for name in SAMPLING_FIELDS}
+
+    @staticmethod
+    def deterministic(params: Dict[str, Any]) -> bool:
+        return params.get('seed') is not None or params.get('temperature') == 0
+
+    @staticmethod
+    def make_key(params: Dict[str, Any], prompt: str) -> str:
+        """缓存键：模型参数（规范化 JSON）与提示词哈希的组合哈希"""
+        prompt_hash = hashlib.sha256(prompt.encode('utf-8')).hexdigest()
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str) + '\n' + prompt_hash
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def lookup(self, llm, prompt: str) -> Optional[str]:
+        """命中时返回缓存的生成结果"""
+        params = self.params(llm)
+        if not self.deterministic(params):
+            self.record('skipped')
+            return None
+        entry = None if self.bypass else self.store.get(self.make_key(params, prompt))
+        self.record('hits' if entry else 'misses')
+        return entry[0].decode('utf-8') if entry else None
+
+    def save(self, llm, prompt: str, text: str, tokens: int = 0):
+        params = self.params(llm)
+        if not self.deterministic(params) or not text:
+            return
+        meta = {'model': params['model'], 'seed': params['seed'], 'tokens': tokens, 'created_at': time.time()}
+        self.store.put(self.make_key(params, prompt), text.encode('utf-8'), meta)
+        self.record('stored')
+
+    def record(self, event: str):
+        with self._lock:
+            self.stats[event] += 1
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / total if total else 0.0
+
+    def close(self):
+        self.store.close()
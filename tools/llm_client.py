@@ -0,0 +1,134 @@
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from .llm_cache import LLMCache
+
+_print_lock = threading.Lock()  # 多个章节并发生成时，避免输出行互相穿插
+
+
+def log(message: str):
+    with _print_lock:
+        print(message, flush=True)
+
+
+@dataclass(slots=True)
+class GenerationStats:
+    """一次 LLM 调用的耗时统计"""
+    label: str
+    chars: int = 0
+    tokens: int = 0
+    ttft: float = 0.0  # 首个 token 到达的时间（秒）
+    total: float = 0.0  # 总生成时间（秒）
+    streamed: bool = True
+    cached: bool = False  # 由 LLMCache 直接返回，未调用模型
+
+    @property
+    def tokens_per_sec(self) -> float:
+        """首个 token 之后的生成速度（不含模型加载和提示词处理时间；非流式调用按总耗时计算）"""
+        decode = self.total - self.ttft if self.streamed else self.total
+        return self.tokens / decode if decode > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), 'tokens_per_sec': round(self.tokens_per_sec, 2)}
+
+
+class StreamingLLM:
+    """
+    流式调用 LLM：逐块接收输出并实时追加写入临时文件（中断时可查看已生成的部分），
+    记录首 token 延迟、tokens/s 和总耗时。on_progress 回调可接到 LangGraph 的 StreamWriter 上，
+    由命令行显示各节点的生成进度。stream=False 时退回一次性 invoke。传入 cache 时先查询 LLMCache。
+    """
+
+    def __init__(self, llm, stream: bool = True, partial_dir: str = '.cache/partial',
+                 progress_interval: float = 0.5, cache: Optional[LLMCache] = None):
+        self.llm = llm
+        self.stream = stream
+        self.cache = cache
+        self.partial_dir = partial_dir
+        self.progress_interval = progress_interval
+        self.history: List[GenerationStats] = []
+
+    def partial_path(self, label: str) -> str:
+        return os.path.join(self.partial_dir, f"{label}.partial.md")
+
+    def generate(self, prompt: str, label: str,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """生成完整文本；流式模式下边生成边写入 partial_path(label)，成功后删除该文件"""
+        return self.generate_with_stats(prompt, label, on_progress)[0]
+
+    def generate_with_stats(self, prompt: str, label: str,
+                            on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                            ) -> Tuple[str, GenerationStats]:
+        """同 generate，同时返回本次调用的统计（多线程并发调用时不依赖 history 的顺序）"""
+        stats = GenerationStats(label=label, streamed=self.stream)
+        start = time.perf_counter()
+        if self.cache:
+            cached = self.cache.lookup(self.llm, prompt)
+            if cached is not None:
+                stats.cached = True
+                stats.chars = len(cached)
+                stats.total = stats.ttft = time.perf_counter() - start
+                return self._finish(stats, cached)
+
+        if not self.stream:
+            message = self.llm.invoke(prompt)
+            stats.total = stats.ttft = time.perf_counter() - start
+            stats.chars = len(message.content)
+            stats.tokens = self._usage_tokens(message) or 0
+            return self._finish(stats, message.content, prompt)
+
+        os.makedirs(self.partial_dir, exist_ok=True)
+        path = self.partial_path(label)
+        parts: List[str] = []
+        usage_tokens = None
+        last_report = 0.0
+        reported = False
+        try:
+            with open(path, 'w', encoding='utf-8') as partial:
+                for chunk in self.llm.stream(prompt):
+                    usage_tokens = self._usage_tokens(chunk) or usage_tokens
+                    if not chunk.content:
+                        continue
+                    now = time.perf_counter() - start
+                    if not parts:
+                        stats.ttft = now
+                    parts.append(chunk.content)
+                    stats.chars += len(chunk.content)
+                    stats.tokens += 1  # Ollama 每个分块约为一个 token，结束时以 usage_metadata 为准
+                    partial.write(chunk.content)
+                    partial.flush()
+                    if on_progress and now - last_report >= self.progress_interval:
+                        last_report, reported = now, True
+                        stats.total = now
+                        on_progress({'label': label, 'chars': stats.chars, 'tokens': stats.tokens,
+                                     'elapsed': round(now, 1), 'tokens_per_sec': round(stats.tokens_per_sec, 1)})
+        except BaseException:
+            log(f"\n   ⚠️ {label} 生成中断，已生成的 {stats.chars} 字保存在 {path}")
+            raise
+
+        stats.total = time.perf_counter() - start
+        if usage_tokens:
+            stats.tokens = usage_tokens
+        os.remove(path)
+        if reported:
+            log("")
+        return self._finish(stats, ''.join(parts), prompt)
+
+    @staticmethod
+    def _usage_tokens(message) -> Optional[int]:
+        usage = getattr(message, 'usage_metadata', None)
+        return usage.get('output_tokens') if usage else None
+
+    def _finish(self, stats: GenerationStats, text: str, prompt: Optional[str] = None) -> Tuple[str, GenerationStats]:
+        self.history.append(stats)
+        if stats.cached:
+            log(f"   ♻️ {stats.label}: 命中LLM缓存（{stats.chars} 字），跳过生成")
+            return text, stats
+        if self.cache and prompt is not None:
+            self.cache.save(self.llm, prompt, text, stats.tokens)
+        log(f"   ⏱️ {stats.label}: 首字 {stats.ttft:.1f}s, {stats.tokens} tokens, "
+             f"{stats.tokens_per_sec:.1f} tokens/s, 总耗时 {stats.total:.1f}s")
+        return text, stats
@@ -0,0 +1,123 @@
+import re
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# 全角数字、小数点、百分号、逗号 -> 半角
+_HALFWIDTH = str.maketrans('０１２３４５６７８９．％，', '0123456789.%,')
+# 数值前后常见的修饰词（约、近、逾、余、多、人、名），以及千分位逗号和空白
+_NOISE = r'[,，\s约近逾超过余多人名]'
+# 常见写法：阿拉伯数字 + 可选的数量单位，如 "1179万"、"3.5万"、"820"
+_FAST_COUNT = r'^(\d+(?:\.\d+)?)(十|百|千|万|十万|百万|千万|亿)?$'
+UNITS = {'十': 1e1, '百': 1e2, '千': 1e3, '万': 1e4, '十万': 1e5, '百万': 1e6, '千万': 1e7, '亿': 1e8}
+
+_CN_DIGITS = {'零': 0, '〇': 0, '一': 1, '二': 2, '两': 2, '三': 3, '四': 4,
+              '五': 5, '六': 6, '七': 7, '八': 8, '九': 9}
+_CN_SMALL = {'十': 10, '百': 100, '千': 1000}
+_CN_BIG = {'万': 1e4, '亿': 1e8}
+_TOKEN = re.compile(r'\d+(?:\.\d+)?|.')
+
+
+@lru_cache(maxsize=4096)
+def parse_count(text: str) -> Optional[float]:
+    """
+    逐个解析中文数量（慢速路径，只处理快速路径无法识别的少数写法）：
+    中文数字（一千一百七十九万、两千三百万、三点五万）以及中文数字与阿拉伯数字混写（1千2百万）
+    """
+    text = re.sub(_NOISE, '', text.translate(_HALFWIDTH))
+    total, section, number = 0.0, 0.0, 0.0
+    seen = False
+    decimal = 0
+    for token in _TOKEN.findall(text):
+        if token in _CN_DIGITS and decimal:
+            number += _CN_DIGITS[token] / 10 ** decimal
+            decimal += 1
+        elif token[0].isdigit():
+            number = float(token)
+            seen = True
+        elif token in _CN_DIGITS:
+            number = _CN_DIGITS[token]
+            seen = True
+        elif token == '点':
+            decimal = 1
+        elif token in _CN_SMALL:
+            section += (number or 1) * _CN_SMALL[token]
+            number, decimal, seen = 0.0, 0, True
+        elif token in _CN_BIG:
+            section += number
+            if token == '亿':
+                total = (total + section) * _CN_BIG[token]
+            else:
+                total += section * _CN_BIG[token]
+            section, number, decimal = 0.0, 0.0, 0
+        else:
+            return None
+    return total + section + number if seen else None
+
+
+def _column(values: Iterable[Any]) -> pd.Series:
+    """整列载入；纯数值列直接得到 float64，混有字符串时为 object"""
+    if isinstance(values, pd.Series):
+        return values
+    return pd.Series(values if isinstance(values, np.ndarray) else list(values))
+
+
+def normalize_counts(values: Iterable[Any]) -> np.ndarray:
+    """
+    把一列人数（"820万"、"１１７９万"、"一千一百七十九万"、1179 等）批量转为数值，无法识别的和 0 记为 NaN。
+
+    同一写法在不同页面中反复出现，先对整列做哈希去重（pd.factorize）得到不同写法的查找表，只换算查找表：
+    全角转换和去噪后用一个正则批量拆出数字和单位，单位查表换算成倍数后相乘；
+    这一步没能识别的少数写法（中文数字等）才逐个交给 parse_count。最后按编码整列取回结果。
+    """
+    series = _column(values)
+    if series.dtype != object:
+        result = series.to_numpy(dtype=float, copy=True)
+        result[result <= 0] = np.nan
+        return result
+
+    codes, uniques = pd.factorize(series)
+    forms = pd.Series(uniques, dtype=object)
+    table = pd.to_numeric(forms, errors='coerce').to_numpy(dtype=float, copy=True)
+    text_rows = np.flatnonzero(np.isnan(table) & forms.str.len().notna().to_numpy())
+    if len(text_rows):
+        text = forms.iloc[text_rows].str.translate(_HALFWIDTH).str.replace(_NOISE, '', regex=True)
+        parts = text.str.extract(_FAST_COUNT)
+        numbers = pd.to_numeric(parts[0], errors='coerce').to_numpy(dtype=float)
+        numbers *= parts[1].map(UNITS).fillna(1.0).to_numpy(dtype=float)
+
+        slow = np.isnan(numbers)
+        if slow.any():
+            numbers[slow] = [np.nan if (value := parse_count(raw)) is None else value
+                             for raw in text.to_numpy()[slow]]
+        table[text_rows] = numbers
+    table[table <= 0] = np.nan
+
+    # 缺失值（None/NaN）的编码为 -1
+    table = np.append(table, np.nan)
+    return table[codes]
+
+
+def normalize_rates(values: Iterable[Any], unit: str = 'auto') -> np.ndarray:
+    """
+    把一列比率批量统一为 0-1 之间的小数，超出范围或无法识别的记为 NaN，0 视为未提取到。
+
+    unit: 'percent' 表示数值是百分数（抓取结果，如 85.5）；'fraction' 表示已是小数；
+          'auto' 时只要整列有大于 1 的值就按百分数处理。带 % 的字符串总是按百分数处理。
+    """
+    series = _column(values)
+    percent_sign = np.zeros(len(series), dtype=bool)
+    if series.dtype == object:
+        text = series.str.translate(_HALFWIDTH)
+        percent_sign = text.str.contains('%', regex=False, na=False).to_numpy(dtype=bool)
+        series = text.str.replace('%', '', regex=False).str.strip().where(text.notna(), series)
+    rates = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, copy=True)
+
+    if unit == 'percent' or (unit == 'auto' and np.nanmax(np.where(percent_sign, np.nan, rates), initial=0) > 1):
+        rates /= 100
+    else:
+        rates[percent_sign] /= 100
+    rates[(rates <= 0) | (rates > 1)] = np.nan
+    return rates
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, List, Tuple, Any, Optional
+
+from .fetcher import HostThrottle
+
+_DONE = object()
+
+
+class ParsePipeline:
+    """两阶段抓取流水线：I/O 线程只负责下载，解析与指标提取交给进程池，两阶段之间是有界队列"""
+
+    def __init__(self, fetch: Callable[[str], str], parse: Callable[..., Dict[str, Any]],
+                 parse_workers: Optional[int] = None, io_workers: int = 1,
+                 throttle: Optional[HostThrottle] = None, queue_size: int = 16,
+                 parse_args: Tuple = ()):
+        """
+        fetch: 下载函数 url -> html
+        parse: 模块级解析函数 parse(html, *parse_args) -> dict（需可被子进程导入）
+        parse_workers: 解析进程数，默认 CPU 核数
+        io_workers: 下载线程数
+        queue_size: 已下载待解析页面的队列上限（控制内存占用）
+        """
+        self.fetch = fetch
+        self.parse = parse
+        self.parse_args = parse_args
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.io_workers = max(1, io_workers)
+        self.throttle = throttle
+        self.queue_size = queue_size
+        self.last_stats: Dict[str, Any] = {}
+
+    def run(self, urls: List[str]) -> List[Tuple[int, Optional[Dict[str, Any]]]]:
+        """按输入顺序返回 [(页面长度, 解析结果), ...]，下载失败的页面为 (0, None)"""
+        results: List[Tuple[int, Optional[Dict[str, Any]]]] = [(0, None)] * len(urls)
+        pages: "queue.Queue" = queue.Queue(maxsize=self.queue_size)
+        start = time.perf_counter()
+
+        stop = threading.Event()
+        downloader = threading.Thread(target=self._download_all, args=(urls, pages, stop), daemon=True)
+        downloader.start()
+
+        parse_time = 0.0
+        in_flight = {}
+        try:
+            # 下载线程运行期间才会创建子进程，使用 spawn 避免在多线程进程中 fork
+            with ProcessPoolExecutor(max_workers=self.parse_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                while True:
+                    item = pages.get()
+                    if item is _DONE:
+                        break
+                    idx, html = item
+                    if not html:
+                        continue
+                    # 控制在途解析任务数，避免页面堆积在内存中
+                    while len(in_flight) >= self.parse_workers * 2:
+                        parse_time += self._collect(in_flight, results, wait_for=FIRST_COMPLETED)
+                    in_flight[pool.submit(_timed_parse, self.parse, html, self.parse_args)] = (idx, len(html))
+                while in_flight:
+                    parse_time += self._collect(in_flight, results, wait_for=FIRST_COMPLETED)
+        finally:
+            # 消费端出错退出时通知下载线程停止，避免其阻塞在已满的队列上
+            stop.set()
+            downloader.join()
+        elapsed = time.perf_counter() - start
+        self.last_stats = {
+            'pages': len(urls),
+            'parsed': sum(1 for _, data in results if data is not None),
+            'elapsed': elapsed,
+            'parse_cpu_seconds': parse_time,
+            'pages_per_sec': len(urls) / elapsed if elapsed > 0 else 0.0
+        }
+        return results
+
+    def _download_all(self, urls: List[str], pages: "queue.Queue", stop: threading.Event):
+        """I/O 阶段：下载后放入有界队列（队列满时阻塞，形成背压）；stop 置位后不再下载和入队"""
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def download(idx: int):
+            if stop.is_set():
+                return
+            url = urls[idx]
+            if self.throttle:
+                self.throttle.wait(url)
+            put((idx, self.fetch(url)))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.io_workers) as pool:
+                list(pool.map(download, range(len(urls))))
+        finally:
+            put(_DONE)
+
+    @staticmethod
+    def _collect(in_flight: Dict, results: List, wait_for) -> float:
+        """收集已完成的解析任务，返回其解析耗时之和"""
+        done, _ = wait(list(in_flight), return_when=wait_for)
+        parse_time = 0.0
+        for future in done:
+            idx, length = in_flight.pop(future)
+            data, seconds = future.result()
+            results[idx] = (length, data)
+            parse_time += seconds
+        return parse_time
+
+
+def _timed_parse(parse: Callable[..., Dict[str, Any]], html: str,
+                 args: Tuple) -> Tuple[Optional[Dict[str, Any]], float]:
+    """在子进程中解析并计时；解析出错的页面返回 None（跳过该页面，不中断整个抓取）"""
+    start = time.perf_counter()
+    try:
+        data = parse(html, *args)
+    except Exception as e:
+        print(f"   ⚠️ 页面解析失败，已跳过: {e}", flush=True)
+        data = None
+    return data, time.perf_counter() - start
@@ -0,0 +1,128 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Union
+
+import numpy as np
+
+from .normalize import normalize_counts, normalize_rates
+
+
+@dataclass(slots=True)
+class PageRecord:
+    """单个页面提取出的就业指标（__slots__ 存储，节点之间直接传递，只在持久化时转为 JSON）"""
+    source_url: str
+    search_query: str = ''
+    total_graduates: Union[str, int] = 0  # 页面原文（如 "1179万"），汇总时由 tools.normalize 换算
+    employment_rate: float = 0  # 百分数，如 85.5
+    signing_rate: float = 0
+    province: str = ''
+    school_type: str = ''
+    major_categories: Optional[Dict[str, Any]] = None
+    freelance_data: Optional[Dict[str, Any]] = None
+    trends: Optional[List[str]] = None
+    duplicate_urls: Optional[List[str]] = None
+
+    @classmethod
+    def from_metrics(cls, metrics: Dict[str, Any], source_url: str, search_query: str = '') -> 'PageRecord':
+        """由 match_employment_metrics 的结果构造；查询词在所有页面之间共享同一个字符串对象"""
+        return cls(
+            source_url=source_url,
+            search_query=sys.intern(search_query),
+            total_graduates=metrics.get('total_graduates', 0),
+            employment_rate=metrics.get('employment_rate', 0),
+            signing_rate=metrics.get('signing_rate', 0),
+            province=metrics.get('province', ''),
+            school_type=metrics.get('school_type', ''),
+            major_categories=metrics.get('major_categories') or None,
+            freelance_data=metrics.get('freelance_data') or None,
+            trends=metrics.get('trends') or None,
+            duplicate_urls=metrics.get('duplicate_urls') or None
+        )
+
+    @property
+    def has_data(self) -> bool:
+        return self.employment_rate > 0 or self.signing_rate > 0 or bool(self.total_graduates)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为与原先抓取结果相同结构的字典"""
+        data = {
+            'total_graduates': self.total_graduates,
+            'employment_rate': self.employment_rate,
+            'signing_rate': self.signing_rate,
+            'province': self.province,
+            'school_type': self.school_type,
+            'major_categories': self.major_categories or {},
+            'freelance_data': self.freelance_data or {},
+            'trends': self.trends or [],
+            'source_url': self.source_url,
+            'search_query': self.search_query
+        }
+        if self.duplicate_urls:
+            data['duplicate_urls'] = self.duplicate_urls
+        return data
+
+
+@dataclass(slots=True)
+class EmploymentSummary:
+    """抓取结果汇总（数据抓取节点的输出、数据分析节点的输入）"""
+    total_sources: int = 0
+    employment_rates: List[float] = field(default_factory=list)
+    signing_rates: List[float] = field(default_factory=list)
+    graduate_counts: List[int] = field(default_factory=list)
+    sources: List[str] = field(default_factory=list)
+    duplicate_sources: Dict[str, List[str]] = field(default_factory=dict)
+    avg_employment_rate: Optional[float] = None
+    avg_signing_rate: Optional[float] = None
+    pages: List[PageRecord] = field(default_factory=list)  # 逐页记录，供分析节点做向量化统计（不输出到 JSON）
+
+    @classmethod
+    def from_pages(cls, pages: List[PageRecord]) -> 'EmploymentSummary':
+        """汇总数据：比率统一为 0-1 的小数，毕业人数统一为整数（整列批量换算）"""
+        summary = cls(total_sources=len(pages), pages=list(pages))
+        for page in pages:
+            summary.sources.append(page.source_url)
+            if page.duplicate_urls:
+                summary.duplicate_sources[page.source_url] = page.duplicate_urls
+
+        employment = normalize_rates([page.employment_rate for page in pages], unit='percent')
+        signing = normalize_rates([page.signing_rate for page in pages], unit='percent')
+        graduates = normalize_counts([page.total_graduates for page in pages])
+        summary.employment_rates = employment[~np.isnan(employment)].tolist()
+        summary.signing_rates = signing[~np.isnan(signing)].tolist()
+        summary.graduate_counts = graduates[~np.isnan(graduates)].round().astype(np.int64).tolist()
+
+        # 计算平均值
+        if summary.employment_rates:
+            summary.avg_employment_rate = float(np.mean(summary.employment_rates))
+        if summary.signing_rates:
+            summary.avg_signing_rate = float(np.mean(summary.signing_rates))
+        return summary
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EmploymentSummary':
+        return cls(
+            total_sources=data.get('total_sources', 0),
+            employment_rates=list(data.get('employment_rates', [])),
+            signing_rates=list(data.get('signing_rates', [])),
+            graduate_counts=list(data.get('graduate_counts', [])),
+            sources=list(data.get('sources', [])),
+            duplicate_sources=dict(data.get('duplicate_sources', {})),
+            avg_employment_rate=data.get('avg_employment_rate'),
+            avg_signing_rate=data.get('avg_signing_rate')
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转为原先的 JSON 结构（没有数据时不输出平均值字段）"""
+        data = {
+            'total_sources': self.total_sources,
+            'employment_rates': self.employment_rates,
+            'signing_rates': self.signing_rates,
+            'graduate_counts': self.graduate_counts,
+            'sources': self.sources,
+            'duplicate_sources': self.duplicate_sources
+        }
+        if self.avg_employment_rate is not None:
+            data['avg_employment_rate'] = self.avg_employment_rate
+        if self.avg_signing_rate is not None:
+            data['avg_signing_rate'] = self.avg_signing_rate
+        return data
@@ -0,0 +1,133 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .dedup import shingle_hashes
+
+# 比较前去掉的空白和 Markdown 标记（列表符号、标题、加粗、表格线等），只比较文字本身
+MARKUP_CHARS = ' \t\r\n　#*>|`_-'
+MARKUP_PATTERN = re.compile(r'[ \t\r\n　#*>|`_-]+')
+SENTENCE_ENDS = '。！？；\n'
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n\s*')
+MIN_SENTENCE_CHARS = 12  # 去掉标记后短于该长度的句子（小标题、数据项）不参与比较
+MIN_PARAGRAPH_CHARS = 60
+SHINGLE = 8  # 字符 n-gram 长度
+WINDOW = 8  # winnowing 窗口：两段共有的连续文字达到 SHINGLE + WINDOW - 1 个字时一定会被发现
+PARAGRAPH_SIMILARITY = 0.5  # 段落指纹有一半以上出现在更早的同一段落中即视为近似重复
+
+
+@dataclass(slots=True)
+class Repetition:
+    """一处重复：kind 为 sentence（完全相同的句子）或 paragraph（近似重复的段落）"""
+    kind: str
+    text: str  # 首次出现的内容摘要
+    positions: List[int] = field(default_factory=list)  # 各次出现在原文中的起始位置，第一个为首次出现
+    similarity: float = 1.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {'kind': self.kind, 'text': self.text, 'positions': self.positions,
+                'similarity': round(self.similarity, 2)}
+
+
+def _strip_markup(text: str) -> str:
+    return MARKUP_PATTERN.sub('', text)
+
+
+def _normalize(text: str, markup: str) -> Tuple[np.ndarray, np.ndarray]:
+    """去掉 markup 中的字符：返回剩余字符的编码及其在原文中的位置"""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+    # 标记字符只有十来个，逐个比较比 np.isin 的固定开销小
+    markup_chars = codes == ord(markup[0])
+    for char in markup[1:]:
+        markup_chars |= codes == ord(char)
+    keep = np.flatnonzero(~markup_chars)
+    return codes[keep], keep
+
+
+def repeated_sentences(text: str, min_chars: int = MIN_SENTENCE_CHARS) -> List[Repetition]:
+    """完全相同（忽略空白和 Markdown 标记）的句子：去掉标记后按句切分，按内容分组，一次遍历"""
+    codes, positions = _normalize(text, MARKUP_CHARS.replace('\n', ''))
+    normalized = codes.tobytes().decode('utf-32-le')
+    occurrences: Dict[str, List[int]] = defaultdict(list)
+    for match in re.finditer(rf'[^{SENTENCE_ENDS}]{{{min_chars},}}', normalized):
+        occurrences[match.group()].append(int(positions[match.start()]))
+    return [Repetition('sentence', sentence[:30], offsets)
+            for sentence, offsets in occurrences.items() if len(offsets) > 1]
+
+
+def _paragraph_bounds(text: str) -> List[Tuple[int, int]]:
+    starts, ends = [0], []
+    for match in PARAGRAPH_BREAK.finditer(text):
+        ends.append(match.start())
+        starts.append(match.end())
+    ends.append(len(text))
+    return list(zip(starts, ends))
+
+
+def similar_paragraphs(text: str, min_chars: int = MIN_PARAGRAPH_CHARS,
+                       threshold: float = PARAGRAPH_SIMILARITY) -> List[Repetition]:
+    """
+    近似重复的段落（空行分段）：对去掉标记后的全文计算字符 n-gram 滚动哈希，winnowing 选出指纹
+    （每 WINDOW 个相邻哈希取最小值），每个指纹记到首次出现它的段落名下。段落的指纹中有 threshold 以上
+    属于同一个更早的段落时，视为该段落的近似重复。整个过程对全文长度线性，不做段落两两比较。
+    """
+    bounds = _paragraph_bounds(text)
+    codes, positions = _normalize(text, MARKUP_CHARS)
+    paragraph_of = np.searchsorted([start for start, _ in bounds], positions, side='right') - 1
+    hashes = shingle_hashes(codes, SHINGLE)
+    if len(hashes) < WINDOW:
+        return []
+
+    # 跨段落的 n-gram 不算；某个窗口（WINDOW 个相邻哈希）的最小值所在的位置选为指纹
+    crossing = paragraph_of[:len(hashes)] != paragraph_of[SHINGLE - 1:]
+    hashes = np.where(crossing, np.iinfo(np.uint64).max, hashes)
+    count = len(hashes) - WINDOW + 1
+    minima = hashes[:count].copy()
+    for offset in range(1, WINDOW):
+        np.minimum(minima, hashes[offset:offset + count], out=minima)
+    picked = np.zeros(len(hashes), dtype=bool)
+    for offset in range(WINDOW):
+        picked[offset:offset + count] |= hashes[offset:offset + count] == minima
+    picked &= ~crossing
+    fingerprints, owners = hashes[picked], paragraph_of[:len(hashes)][picked]
+
+    # 只比较足够长的段落；同一段落内重复的指纹只计一次
+    lengths = np.bincount(paragraph_of, minlength=len(bounds))
+    selected = (lengths >= min_chars)[owners]
+    fingerprints, owners = fingerprints[selected], owners[selected]
+    order = np.lexsort((owners, fingerprints))
+    fingerprints, owners = fingerprints[order], owners[order]
+    distinct = np.ones(len(order), dtype=bool)
+    distinct[1:] = (fingerprints[1:] != fingerprints[:-1]) | (owners[1:] != owners[:-1])
+    fingerprints, owners = fingerprints[distinct], owners[distinct]
+    counts = np.bincount(owners, minlength=len(bounds))
+
+    # 每个指纹归属于首次出现它的段落（已按 指纹、段落 排序，每组第一个即最早的段落）
+    group_start = np.ones(len(fingerprints), dtype=bool)
+    group_start[1:] = fingerprints[1:] != fingerprints[:-1]
+    first_owner = owners[np.flatnonzero(group_start)[np.cumsum(group_start) - 1]]
+    earlier = first_owner < owners
+    pairs, shared = np.unique(owners[earlier].astype(np.int64) * len(bounds) + first_owner[earlier],
+                              return_counts=True)
+    paragraphs, sources = np.divmod(pairs, len(bounds))
+    similarities = shared / counts[paragraphs]
+
+    best: Dict[int, Tuple[float, int]] = {}
+    for paragraph, source, similarity in zip(paragraphs.tolist(), sources.tolist(), similarities.tolist()):
+        if similarity >= threshold and similarity > best.get(paragraph, (0.0, 0))[0]:
+            best[paragraph] = (similarity, source)
+    # 同一段落常被多次重复，摘要按来源段落只生成一次
+    summaries: Dict[int, str] = {}
+    for _, source in best.values():
+        if source not in summaries:
+            summaries[source] = _strip_markup(text[bounds[source][0]:bounds[source][0] + 100])[:30]
+    return [Repetition('paragraph', summaries[source], [bounds[source][0], bounds[paragraph][0]], min(similarity, 1.0))
+            for paragraph, (similarity, source) in sorted(best.items())]
+
+
+def find_repetitions(text: str) -> List[Repetition]:
+    """重复的句子和近似重复的段落，按首次出现的位置排序"""
+    return sorted(repeated_sentences(text) + similar_paragraphs(text), key=lambda item: item.positions[0])
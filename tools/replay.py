@@ -0,0 +1,193 @@
+import base64
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional
+from urllib.parse import urljoin, urlsplit, parse_qs, quote
+
+# 回放时不原样返回的响应头（正文已解压，长度与连接由回放服务器重新设置）
+_SKIPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'}
+
+
+class HttpArchive:
+    """HTTP 录制档案：JSON Lines 文件，每行一次请求的 URL、状态码、响应头和（已解压的）正文"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            self.load()
+
+    def load(self):
+        """读取档案，同一 URL 以最后一次录制为准"""
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry['url']] = entry
+
+    def add(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """追加一条录制记录（立即写盘，中断的录制也能回放已完成的部分）"""
+        entry = {
+            'url': url,
+            'status': status,
+            'headers': {k: v for k, v in headers.items() if k.lower() not in _SKIPPED_HEADERS},
+            'body': base64.b64encode(body).decode('ascii')
+        }
+        with self._lock:
+            self.entries[url] = entry
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def record(self, url: str, response):
+        """录制 requests 的一次响应（会读取完整正文，流式下载在录制模式下退化为整页下载）"""
+        headers = dict(response.headers)
+        if 'Location' in headers:
+            # 相对跳转改为绝对地址，回放时才能重新映射到档案中的 URL
+            headers['Location'] = urljoin(url, headers['Location'])
+        self.add(url, response.status_code, headers, response.content)
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(url)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class _QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 客户端中途断开（如流式下载提前终止）属于正常情况
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def replay_url(base_url: str, url: str) -> str:
+    """把原始 URL 映射为回放服务器上的地址"""
+    return f"{base_url}/fetch?url={quote(url, safe='')}"
+
+
+class ReplayServer:
+    """
+    本地回放服务器：按 URL 返回档案中的响应，可注入延迟、错误率和限流。
+
+    latency/jitter: 每次响应前等待 latency * (1 ± jitter) 秒
+    error_rate: 按概率返回 503
+    host_rate_limit: 每个原始主机每秒最多响应的请求数，超出返回 429（0 表示不限流）
+    """
+
+    def __init__(self, archive: HttpArchive, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, jitter: float = 0.5, error_rate: float = 0.0,
+                 host_rate_limit: float = 0.0, seed: int = 0):
+        self.archive = archive
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.host_rate_limit = host_rate_limit
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._last_by_host: Dict[str, float] = {}
+        self.stats = {
+            'requests': 0,
+            'served': 0,
+            'not_found': 0,
+            'errors_injected': 0,
+            'throttled': 0,
+            'bytes_sent': 0
+        }
+        self._server = _QuietServer((host, port), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> 'ReplayServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _decide(self, url: str) -> Optional[int]:
+        """按注入规则决定是否直接返回错误状态码"""
+        with self._lock:
+            if self.host_rate_limit > 0:
+                host = urlsplit(url).hostname or ''
+                now = time.monotonic()
+                last = self._last_by_host.get(host)
+                if last is not None and now - last < 1.0 / self.host_rate_limit:
+                    self.stats['throttled'] += 1
+                    return 429
+                self._last_by_host[host] = now
+            if self.error_rate > 0 and self._rng.random() < self.error_rate:
+                self.stats['errors_injected'] += 1
+                return 503
+            delay = self.latency * (1 + self.jitter * (2 * self._rng.random() - 1)) if self.latency else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._count('requests')
+                target = parse_qs(urlsplit(self.path).query).get('url', [''])[0]
+                status = server._decide(target)
+                if status is not None:
+                    self._send(status, {'Content-Type': 'text/plain', 'Retry-After': '1'}, b'')
+                    return
+                entry = server.archive.get(target)
+                if entry is None:
+                    server._count('not_found')
+                    self._send(404, {'Content-Type': 'text/plain'}, b'not recorded')
+                    return
+                body = base64.b64decode(entry['body'])
+                server._count('served')
+                server._count('bytes_sent', len(body))
+                self._send(entry['status'], entry['headers'], body)
+
+            def _send(self, status: int, headers: Dict[str, str], body: bytes):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端提前终止流式下载
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
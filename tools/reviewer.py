@@ -1,8 +1,36 @@
-from typing import List, Dict, Any
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import List, Dict, Any, Iterable, Optional
+import hashlib
+import itertools
 import re
+import threading
+
+from .repetition import find_repetitions
+from .sections import SECTION_HEADING, split_sections, section_title
+
+REQUIRED_SECTIONS = ['执行摘要', '核心指标分析', '就业趋势', '区域分析', '专业类别分析', '结论与建议']
+DEPTH_KEYWORDS = ['深度分析', '根本原因', '关键因素', '重要发现', '深度观点', '启示', '展望', '建议']
+# 只需要知道是否出现（及首次出现位置）的关键词
+KEYWORDS = [*REQUIRED_SECTIONS, *DEPTH_KEYWORDS, '就业率有所下降', '较往年有所下滑', '数据来源', '根据', '数据显示']
+RATE_PATTERN = re.compile(r'就业率：(\d+\.?\d*)%')
+PERCENT_PATTERN = re.compile(r'\d+\.?\d*%')
+HEADING_PATTERN = re.compile(r'#+\s+')
+LIST_PATTERN = re.compile(r'^\s*-\s+', re.MULTILINE)
+CHART_PATTERN = re.compile(r'(图表|图\d+|表\d+)')
+SENTENCE_END = re.compile(r'[。！？]')
+LONG_SENTENCE = 100  # 超过该长度（以句号、叹号、问号分句）视为超长句子
+MEMO_SIZE = 32  # 按内容哈希缓存的审核结果数
 
 class ReportReviewer:
-    """报告审核器"""
+    """
+    报告审核器：各项检查需要的信号集中在 scan() 中收集，每个信号只查找一次（仍是多次独立的
+    str.find/str.count/正则扫描，不是单遍扫描），各项检查只读取扫描结果。
+    审核结果按报告内容哈希缓存（进程内所有实例共用，读写加锁），同一份内容在一次运行中只审核一次
+    """
+    
+    _memo: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _memo_lock = threading.Lock()
     
     def __init__(self, report_content: str):
         self.report = report_content
@@ -10,11 +38,35 @@ class ReportReviewer:
             'is_approved': False,
             'issues': [],
             'suggestions': [],
+            'findings': [],  # 每条问题/建议及其涉及的章节下标（split_sections 的顺序）
             'score': 0
         }
+        self.memoized = False  # 本次结果是否直接取自缓存
+        self.signals: Dict[str, Any] = {}
+        self._sections: Optional[List[str]] = None
+        self._section_starts: List[int] = []
+    
+    @property
+    def sections(self) -> List[str]:
+        """按二级标题切分的章节（用到时才切分）"""
+        if self._sections is None:
+            self._sections = split_sections(self.report)
+            self._section_starts = list(itertools.accumulate((len(s) for s in self._sections[:-1]), initial=0))
+        return self._sections
     
     def review(self) -> Dict[str, Any]:
         """执行审核"""
+        key = hashlib.sha256(self.report.encode('utf-8')).hexdigest()
+        with self._memo_lock:
+            cached = self._memo.get(key)
+            if cached is not None:
+                self._memo.move_to_end(key)
+                self.review_result = self._copy_result(cached)
+        if cached is not None:
+            self.memoized = True
+            return self.review_result
+        
+        self.signals = self.scan()
         self._check_logic_consistency()
         self._check_data_integrity()
         self._check_format_standardization()
@@ -27,99 +79,175 @@ class ReportReviewer:
         # 判断是否通过
         self.review_result['is_approved'] = self.review_result['score'] >= 80
         
+        self.remember(self.report, self.review_result)
         return self.review_result
     
+    @classmethod
+    def remember(cls, report_content: str, result: Dict[str, Any]):
+        """记录一份报告的审核结果（如在子进程中审核的候选版本），之后审核同一内容时直接返回"""
+        key = hashlib.sha256(report_content.encode('utf-8')).hexdigest()
+        with cls._memo_lock:
+            cls._memo[key] = cls._copy_result(result)
+            cls._memo.move_to_end(key)
+            if len(cls._memo) > MEMO_SIZE:
+                cls._memo.popitem(last=False)
+    
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """复制审核结果（缓存中的结果不能被调用方修改）"""
+        return {
+            **result,
+            'issues': list(result['issues']),
+            'suggestions': list(result['suggestions']),
+            'findings': [{**finding, 'sections': list(finding['sections']), 'offsets': list(finding['offsets'])}
+                         for finding in result['findings']]
+        }
+    
+    def scan(self) -> Dict[str, Any]:
+        """
+        收集全部信号：就业率数值及位置、各关键词首次出现的位置（-1 为未出现）、格式特征、
+        超长句子的位置、"- "和"建议"的次数、重复的句子和近似重复的段落。每个信号各做一次
+        str.find/str.count/正则扫描（合并成一个大正则实测更慢），与原先逐项检查时的扫描量相当
+        """
+        report = self.report
+        long_sentences = []
+        position = 0
+        for sentence in SENTENCE_END.split(report):
+            if len(sentence) > LONG_SENTENCE:
+                long_sentences.append(position)
+            position += len(sentence) + 1
+        return {
+            'rates': [(match.start(), float(match.group(1))) for match in RATE_PATTERN.finditer(report)],
+            'first': {keyword: report.find(keyword) for keyword in KEYWORDS},
+            'has_percent': PERCENT_PATTERN.search(report) is not None,
+            'has_heading': HEADING_PATTERN.search(report) is not None,
+            'has_list': LIST_PATTERN.search(report) is not None,
+            'has_chart': CHART_PATTERN.search(report) is not None,
+            'dashes': report.count('- '),
+            'advice': report.count('建议'),
+            'long_sentences': long_sentences,
+            'repetitions': find_repetitions(report)
+        }
+    
+    def _section_at(self, offset: int) -> int:
+        """文本位置所在章节的下标"""
+        self.sections  # 确保已切分章节
+        return bisect_right(self._section_starts, offset) - 1
+    
+    def _sections_at(self, offsets: List[int]) -> List[int]:
+        """一组已排序的文本位置涉及的章节下标：每个章节二分查找一次，而不是每个位置查找一次"""
+        self.sections  # 确保已切分章节
+        bounds = [bisect_left(offsets, start) for start in self._section_starts] + [len(offsets)]
+        return [idx for idx in range(len(self._section_starts)) if bounds[idx] < bounds[idx + 1]]
+    
+    def _section_named(self, keyword: str) -> int:
+        """标题包含关键词的章节下标；找不到时归到最后一节"""
+        for idx, section in enumerate(self.sections):
+            if SECTION_HEADING.match(section) and keyword in section_title(section):
+                return idx
+        return len(self.sections) - 1
+    
+    def _add(self, kind: str, message: str, sections: Iterable[int], offsets: Iterable[int] = ()):
+        """记录一条问题（issues）或建议（suggestions），并标注涉及的章节"""
+        self.review_result[kind].append(message)
+        self.review_result['findings'].append({
+            'kind': kind,
+            'message': message,
+            'sections': sorted(set(sections)),
+            'offsets': list(offsets)
+        })
+    
     def _check_logic_consistency(self):
         """检查逻辑一致性"""
         # 检查数据是否合理
-        employment_rates = re.findall(r'就业率：(\d+\.?\d*)%', self.report)
-        for rate in employment_rates:
-            rate_val = float(rate)
+        for position, rate_val in self.signals['rates']:
             if rate_val < 50 or rate_val > 100:
-                self.review_result['issues'].append(f"异常就业率数据：{rate_val}%，超出合理范围")
+                self._add('issues', f"异常就业率数据：{rate_val}%，超出合理范围",
+                          [self._section_at(position)], [position])
         
         # 检查趋势描述是否与数据一致
-        if "就业率有所下降" in self.report:
+        first = self.signals['first']
+        if first['就业率有所下降'] >= 0:
             # 检查是否有下降的证据
-            if "较往年有所下滑" not in self.report:
-                self.review_result['suggestions'].append("建议补充就业率下降的具体数据支撑")
+            if first['较往年有所下滑'] < 0:
+                position = first['就业率有所下降']
+                self._add('suggestions', "建议补充就业率下降的具体数据支撑", [self._section_at(position)], [position])
     
     def _check_data_integrity(self):
         """检查数据完整性"""
-        required_sections = [
-            '执行摘要',
-            '核心指标分析',
-            '就业趋势',
-            '区域分析',
-            '专业类别分析',
-            '结论与建议'
-        ]
-        
-        for section in required_sections:
-            if section not in self.report:
-                self.review_result['issues'].append(f"缺少必要章节：{section}")
+        first = self.signals['first']
+        
+        # 缺少的章节由前一个已有的必要章节负责补上（没有时由报告开头补上）
+        anchor = 0
+        for section in REQUIRED_SECTIONS:
+            if first[section] >= 0:
+                anchor = self._section_at(first[section])
+            else:
+                self._add('issues', f"缺少必要章节：{section}", [anchor])
         
         # 检查是否有具体数据
-        if not re.search(r'\d+\.?\d*%', self.report):
-            self.review_result['issues'].append("报告缺乏具体百分比数据")
+        if not self.signals['has_percent']:
+            self._add('issues', "报告缺乏具体百分比数据", [self._section_named('核心指标')])
         
-        # 检查是否有数据来源
-        if "数据来源" not in self.report:
-            self.review_result['issues'].append("缺少数据来源说明")
+        # 检查是否有数据来源（报告末尾注明）
+        if first['数据来源'] < 0:
+            self._add('issues', "缺少数据来源说明", [len(self.sections) - 1])
     
     def _check_format_standardization(self):
         """检查格式规范性"""
-        # 检查标题层级
-        if not re.search(r'#+\s+', self.report):
-            self.review_result['issues'].append("缺少Markdown标题格式")
+        # 检查标题层级（没有任何标题时整篇报告只有一段）
+        if not self.signals['has_heading']:
+            self._add('issues', "缺少Markdown标题格式", [0])
         
         # 检查列表格式
-        if re.search(r'^\s*-\s+', self.report, re.MULTILINE):
-            if not self.report.count('- ') >= 5:
-                self.review_result['suggestions'].append("建议增加更多列表形式呈现数据")
+        if self.signals['has_list']:
+            if not self.signals['dashes'] >= 5:
+                self._add('suggestions', "建议增加更多列表形式呈现数据", [self._section_named('核心指标')])
         
         # 检查是否有图表占位
-        if not re.search(r'(图表|图\d+|表\d+)', self.report):
-            self.review_result['suggestions'].append("建议添加图表以增强数据可视化")
+        if not self.signals['has_chart']:
+            self._add('suggestions', "建议添加图表以增强数据可视化", [self._section_named('核心指标')])
     
     def _check_language_quality(self):
         """检查语言表达质量"""
-        # 检查错别字（简单示例）
-        common_typos = {
-            '就业形势': '就业形势',
-            '签约率': '签约率',
-            '高校': '高校'
-        }
-        
         # 检查句子长度
-        sentences = re.split(r'[。！？]', self.report)
-        long_sentences = [s for s in sentences if len(s) > 100]
+        long_sentences = self.signals['long_sentences']
         if long_sentences:
-            self.review_result['suggestions'].append(f"发现{len(long_sentences)}个超长句子，建议拆分")
+            self._add('suggestions', f"发现{len(long_sentences)}个超长句子，建议拆分",
+                      self._sections_at(long_sentences), long_sentences)
         
-        # 检查是否有重复表述
-        duplicate_check = self.report.split()
-        if len(duplicate_check) != len(set(duplicate_check)):
-            self.review_result['suggestions'].append("检测到部分重复表述，建议精简")
+        # 检查是否有重复表述：重复的句子、近似重复的段落，定位到再次出现的位置
+        repetitions = self.signals['repetitions']
+        if repetitions:
+            sentences = sum(1 for item in repetitions if item.kind == 'sentence')
+            offsets = sorted(position for item in repetitions for position in item.positions[1:])
+            self._add('suggestions', f"检测到部分重复表述（重复句子 {sentences} 处，近似重复段落 "
+                                     f"{len(repetitions) - sentences} 处），建议精简",
+                      self._sections_at(offsets), offsets)
     
     def _check_depth_attitude(self):
         """检查深度和态度"""
-        depth_keywords = [
-            '深度分析', '根本原因', '关键因素', '重要发现',
-            '深度观点', '启示', '展望', '建议'
-        ]
-        
-        found_depth = sum(1 for keyword in depth_keywords if keyword in self.report)
+        first = self.signals['first']
+        found_depth = sum(1 for keyword in DEPTH_KEYWORDS if first[keyword] >= 0)
         if found_depth < 4:
-            self.review_result['suggestions'].append("报告深度不足，建议增加分析和见解")
+            self._add('suggestions', "报告深度不足，建议增加分析和见解", [self._section_named('结论与建议')])
         
         # 检查是否有数据支撑的观点
-        if "根据" not in self.report and "数据显示" not in self.report:
-            self.review_result['suggestions'].append("观点缺乏数据支撑，建议增加")
+        if first['根据'] < 0 and first['数据显示'] < 0:
+            self._add('suggestions', "观点缺乏数据支撑，建议增加", [self._section_named('核心指标')])
         
         # 检查是否有建设性建议
-        if "建议" not in self.report or self.report.count('建议') < 5:
-            self.review_result['suggestions'].append("建议部分不够充分，需要补充具体可操作的建议")
+        if self.signals['advice'] < 5:
+            self._add('suggestions', "建议部分不够充分，需要补充具体可操作的建议", [self._section_named('结论与建议')])
+    
+    @staticmethod
+    def section_comments(findings: List[Dict[str, Any]]) -> Dict[int, List[str]]:
+        """章节下标 -> 涉及该章节的审核意见，供 SectionOptimizer.rewrite 定向修改"""
+        comments: Dict[int, List[str]] = {}
+        for finding in findings:
+            for idx in finding['sections']:
+                comments.setdefault(idx, []).append(finding['message'])
+        return comments
     
     def _calculate_score(self):
         """计算审核分数"""
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+# 改写循环结束的原因
+STOP_REASONS = {
+    'approved': '审核通过',
+    'max_attempts': '达到最大改写次数',
+    'time_budget': '改写耗时超出预算',
+    'token_budget': '改写 token 超出预算',
+    'converged': '分数连续多轮没有提高'
+}
+
+
+@dataclass(slots=True)
+class RewriteBudget:
+    """
+    审核-改写循环的预算：改写次数、改写累计耗时（秒）、改写累计生成 token，以及收敛判断
+    （最高分连续 patience 轮没有提高即停止）。各项为 0 表示不限。
+
+    进度记录是普通 dict，随 ReportState 一起写入检查点，恢复运行后继续累计；
+    其中保存目前得分最高的报告版本，预算用完时保存该版本而不是最后一版。
+    """
+    max_attempts: int = 3
+    max_seconds: float = 0
+    max_tokens: int = 0
+    patience: int = 2
+
+    @staticmethod
+    def start(report: str, score: int) -> Dict[str, Any]:
+        """首次审核后的初始进度"""
+        return {
+            'attempts': 0,
+            'seconds': 0.0,
+            'tokens': 0,
+            'scores': [score],
+            'best_score': score,
+            'best_report': report,
+            'best_attempt': 0,
+            'stale_rounds': 0,
+            'stop_reason': ''
+        }
+
+    @staticmethod
+    def record(progress: Dict[str, Any], report: str, score: int, seconds: float, tokens: int) -> Dict[str, Any]:
+        """记录一轮改写的结果；同分时取较新的版本，只有分数严格提高才重置 stale_rounds"""
+        progress = {**progress, 'scores': progress['scores'] + [score]}
+        progress['attempts'] += 1
+        progress['seconds'] = round(progress['seconds'] + seconds, 2)
+        progress['tokens'] += tokens
+        progress['stale_rounds'] = 0 if score > progress['best_score'] else progress['stale_rounds'] + 1
+        if score >= progress['best_score']:
+            progress.update(best_score=score, best_report=report, best_attempt=progress['attempts'])
+        return progress
+
+    def stop_reason(self, progress: Dict[str, Any]) -> Optional[str]:
+        """预算用完或已收敛时返回原因（STOP_REASONS 的键），否则返回 None"""
+        if self.max_attempts and progress['attempts'] >= self.max_attempts:
+            return 'max_attempts'
+        if self.max_seconds and progress['seconds'] >= self.max_seconds:
+            return 'time_budget'
+        if self.max_tokens and progress['tokens'] >= self.max_tokens:
+            return 'token_budget'
+        if self.patience and progress['stale_rounds'] >= self.patience:
+            return 'converged'
+        return None
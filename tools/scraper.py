@@ -1,88 +1,317 @@
-import requests
 from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 import time
 import re
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .fetcher import ConcurrentFetcher
+from .http_session import PooledSession, accept_encoding
+from .http_cache import ResponseCache
+from .frontier import CrawlFrontier
+from .text_extract import html_to_text
+from .stream_fetch import StreamPolicy
+from .pipeline import ParsePipeline
+from .url_filter import UrlFilter, SubstringMatcher, ENGINE_EXCLUDES
+from .replay import HttpArchive
+from .dedup import DuplicateIndex, minhash, MIN_TEXT_CHARS
+from .crawl_state import CrawlState, content_hash
+from .records import PageRecord, EmploymentSummary
+from .cube import match_dimensions
+
+# 搜狗结果页 JSON 中的链接字段（URL 中的斜杠被转义为 \\/）
+SOGOU_URL_PATTERN = re.compile(r'\"(sup_url|url|link)\":\"(https?:\\\\/\\\\/[^\"]+)\"')
+# 人数：阿拉伯数字（含全角）、中文数字及数量单位，由 tools.normalize 统一换算；
+# 必须以数字开头，"千万毕业生"、"数十万毕业生"这类只有单位的说法不是人数
+COUNT = r'[\d零〇一二两三四五六七八九][\d.,零〇一二两三四五六七八九十百千万亿]*'
+ENGINE_MATCHERS = {engine: SubstringMatcher(patterns) for engine, patterns in ENGINE_EXCLUDES.items()}
+
+def page_text(html: str, fast_text: bool = True, max_text_chars: Optional[int] = 200000) -> str:
+    """提取网页文本内容（fast_text 为 False 时使用 BeautifulSoup）"""
+    if fast_text:
+        return html_to_text(html, max_text_chars)
+    soup = BeautifulSoup(html, 'lxml')
+    return soup.get_text(separator=' ', strip=True)
+
+
+def match_employment_metrics(text: str) -> Dict[str, Any]:
+    """从网页文本中匹配就业指标"""
+    data = {
+        'total_graduates': 0,
+        'employment_rate': 0,
+        'signing_rate': 0,
+        'province': '',
+        'school_type': '',
+        'major_categories': {},
+        'freelance_data': {},
+        'trends': []
+    }
+
+    # 匹配毕业人数
+    graduate_patterns = [
+        rf'毕业[生人数]+[:：]?({COUNT})人',
+        rf'({COUNT})毕业生',
+        rf'共({COUNT})名毕业生'
+    ]
+    for pattern in graduate_patterns:
+        match = re.search(pattern, text)
+        if match:
+            data['total_graduates'] = match.group(1)
+            break
+
+    # 匹配就业率
+    rate_patterns = [
+        r'就业率[:：]?(\d+\.?\d*)%',
+        r'就业.*?(\d+\.?\d*)%'
+    ]
+    for pattern in rate_patterns:
+        match = re.search(pattern, text)
+        if match:
+            data['employment_rate'] = float(match.group(1))
+            break
+
+    # 匹配签约率
+    signing_patterns = [
+        r'签约率[:：]?(\d+\.?\d*)%',
+        r'签(?:约|三方)[^%]*(\d+\.?\d*)%'
+    ]
+    for pattern in signing_patterns:
+        match = re.search(pattern, text)
+        if match:
+            data['signing_rate'] = float(match.group(1))
+            break
+
+    # 识别省份、学校类别和专业类别
+    data.update(match_dimensions(text))
+
+    return data
+
+
+def parse_page(html: str, fast_text: bool = True, max_text_chars: Optional[int] = 200000) -> Dict[str, Any]:
+    """从HTML中提取就业数据（模块级函数，可在解析进程池中执行）"""
+    return match_employment_metrics(page_text(html, fast_text, max_text_chars))
+
+
+def parse_page_signature(html: str, fast_text: bool = True,
+                         max_text_chars: Optional[int] = 200000) -> Tuple[Dict[str, Any], Any, str]:
+    """提取就业数据，并计算正文的 MinHash 签名（供主进程做近重复检测）和内容哈希"""
+    text = page_text(html, fast_text, max_text_chars)
+    signature = minhash(text) if len(text) >= MIN_TEXT_CHARS else None
+    return match_employment_metrics(text), signature, content_hash(html)
+
 
 class WebScraper:
     """网页抓取工具"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 1, per_host_delay: float = 2.0,
+                 pool_maxsize: int = 10, host_pool_sizes: Optional[Dict[str, int]] = None,
+                 cache: Optional[ResponseCache] = None, fast_text: bool = True,
+                 max_text_chars: Optional[int] = 200000, stream_policy: Optional[StreamPolicy] = None,
+                 parallel_search: bool = True, parse_workers: int = 0, search_delay: float = 1.0,
+                 archive: Optional[HttpArchive] = None, replay_url: Optional[str] = None,
+                 dedup_threshold: float = 0.7, state: Optional[CrawlState] = None,
+                 state_max_age: float = 0):
+        """
+        max_workers: 页面抓取并发数，1 表示保持原有的顺序抓取
+        per_host_delay: 同一主机两次请求的最小间隔（秒）
+        pool_maxsize: 每个主机保留的 keep-alive 连接数（不小于并发数）
+        host_pool_sizes: 按主机覆盖连接池大小
+        cache: 持久化响应缓存，None 表示不缓存
+        fast_text: 使用流式文本提取（不构建 BeautifulSoup 树）
+        max_text_chars: 每个页面最多提取的文本字符数，None 表示不限制
+        stream_policy: 内容页流式抓取策略，默认启用 StreamPolicy()
+        parallel_search: Bing 与搜狗并行翻页
+        parse_workers: 解析进程数，大于0时下载与解析分离为两阶段流水线
+        search_delay: 搜索结果翻页间隔（秒）
+        archive: 录制模式，把每次请求/响应写入 HttpArchive
+        replay_url: 回放模式，所有请求转发到本地回放服务器（见 tools.replay.ReplayServer）
+        dedup_threshold: 正文相似度（Jaccard）不低于该值的页面视为转载副本，只保留首个；0 表示关闭
+        state: 持久化抓取状态；内容未变化的页面直接复用已保存的指标，并记录运行进度以便断点续抓
+        state_max_age: 最近多少秒内抓取过的页面不再重新下载，0 表示总是重新下载
+        """
+        self.parallel_search = parallel_search
+        self.search_delay = search_delay
+        self._timings_lock = threading.Lock()
+        self.fetch_timings: List[Tuple[float, int]] = []
+        self.url_filter = UrlFilter()
+        self.dedup = DuplicateIndex(threshold=dedup_threshold) if dedup_threshold > 0 else None
+        self._match_time = [0.0, 0]  # 指标匹配累计耗时（秒）与页面数
+        self.state = state
+        self.state_max_age = state_max_age
+        self.state_stats = {'reused_fresh': 0, 'unchanged': 0}
+        self.search_stats: Dict[str, Dict[str, Any]] = {}
+        self.stream_policy = stream_policy if stream_policy is not None else StreamPolicy()
+        self.cache = cache
+        self.fast_text = fast_text
+        self.max_text_chars = max_text_chars
+        self.max_workers = max_workers
+        self.per_host_delay = per_host_delay
+        self.fetcher = ConcurrentFetcher(
+            lambda url: self.fetch_page(url, content=True), max_workers, per_host_delay
+        )
+        self.parse_workers = parse_workers
+        self.pipeline = ParsePipeline(
+            lambda url: self.fetch_page(url, content=True),
+            parse_page_signature,
+            parse_workers=parse_workers,
+            io_workers=max_workers,
+            throttle=self.fetcher.throttle,
+            parse_args=(fast_text, max_text_chars)
+        )
         self.ua = UserAgent()
         self.headers = {
             'User-Agent': self.ua.random,
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
             'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate',
+            'Accept-Encoding': accept_encoding(),
             'Connection': 'keep-alive',
             'Upgrade-Insecure-Requests': '1'
         }
-        
-    def fetch_page(self, url: str, timeout: int = 30, params: Optional[Dict] = None) -> str:
-        """抓取网页内容"""
+        self.session = PooledSession(
+            pool_maxsize=max(pool_maxsize, max_workers),
+            host_pool_sizes=host_pool_sizes,
+            recorder=archive,
+            replay_base=replay_url
+        )
+        self.session.headers.update(self.headers)
+        
+    def fetch_page(self, url: str, timeout: int = 30, params: Optional[Dict] = None, content: bool = False) -> str:
+        """
+        抓取网页内容（启用缓存时优先使用缓存，过期条目用条件请求重新验证）
+        content: 是否为内容页；内容页走流式下载（类型过滤、大小上限、相关性提前终止）
+        """
+        cached = self.cache.lookup(url, params) if self.cache else None
+        if cached and cached.is_fresh:
+            self.cache.record('hits')
+            return cached.text
+        
+        stream = content and self.stream_policy is not None
+        start = time.perf_counter()
         try:
-            response = requests.get(url, headers=self.headers, timeout=timeout, params=params)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            return response.text
+            headers = cached.conditional_headers() if cached else None
+            response = self.session.get(url, timeout=timeout, params=params, headers=headers, stream=stream)
+            if cached and response.status_code == 304:
+                response.close()
+                self.cache.refresh(cached, response.headers)
+                self.cache.record('revalidated')
+                return cached.text
+            if stream:
+                # 先进入 with 再检查状态码，出错的响应也会关闭并把连接归还连接池
+                with response:
+                    response.raise_for_status()
+                    body = self.stream_policy.read(response)
+                self._record_timing(start, len(body) if body else 0)
+                if body is None:
+                    return ""
+                text = self.stream_policy.decode(body)
+            else:
+                response.raise_for_status()
+                response.encoding = response.apparent_encoding
+                self._record_timing(start, len(response.content))
+                text = response.text
+            if self.cache:
+                self.cache.record('misses')
+                self.cache.save(url, params, text, response.headers)
+            return text
         except Exception as e:
             print(f"抓取失败 {url}: {e}")
             return ""
     
+    def _record_timing(self, start: float, size: int):
+        with self._timings_lock:
+            self.fetch_timings.append((time.perf_counter() - start, size))
+    
+    def fetch_summary(self) -> Dict[str, Any]:
+        """网络请求统计：页面数、字节数、p50/p95 延迟（秒）"""
+        with self._timings_lock:
+            latencies = sorted(latency for latency, _ in self.fetch_timings)
+            total_bytes = sum(size for _, size in self.fetch_timings)
+        
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(q * len(latencies)))]
+        
+        return {
+            'pages': len(latencies),
+            'bytes': total_bytes,
+            'p50_latency': percentile(0.5),
+            'p95_latency': percentile(0.95)
+        }
+    
+    def print_fetch_stats(self):
+        """打印连接复用与缓存统计"""
+        stats = self.session.connection_stats()
+        print(f"🔌 连接统计: 请求 {stats['requests']} 次, 新建连接 {stats['connections_opened']} 个, "
+              f"复用 {stats['connections_reused']} 次 (复用率 {stats['reuse_rate']*100:.1f}%)")
+        if self.cache:
+            cache_stats = self.cache.stats
+            print(f"💾 缓存统计: 命中 {cache_stats['hits']}, 304 重新验证 {cache_stats['revalidated']}, "
+                  f"未命中 {cache_stats['misses']} (命中率 {self.cache.hit_rate*100:.1f}%)")
+        if self.state:
+            print(f"🗂️ 抓取状态: 复用近期结果 {self.state_stats['reused_fresh']} 个, "
+                  f"内容未变化跳过解析 {self.state_stats['unchanged']} 个")
+        dedup_stats = self.dedup_summary()
+        if dedup_stats:
+            print(f"♻️ 近重复检测: 页面 {dedup_stats['pages']} 个, 重复簇 {dedup_stats['duplicate_clusters']} 个, "
+                  f"合并副本 {dedup_stats['duplicates']} 个, 节省指标提取 CPU {dedup_stats['cpu_seconds_saved'] * 1000:.0f} ms")
+        fetch_stats = self.fetch_summary()
+        if fetch_stats['pages']:
+            print(f"⏱️ 网络请求: {fetch_stats['pages']} 次, 下载 {fetch_stats['bytes'] / 1024:.0f} KB, "
+                  f"延迟 p50 {fetch_stats['p50_latency'] * 1000:.0f} ms / p95 {fetch_stats['p95_latency'] * 1000:.0f} ms")
+        if self.stream_policy:
+            stream_stats = self.stream_policy.summary()
+            print(f"📦 流式抓取: 内容页 {stream_stats['pages']} 个, 下载 {stream_stats['bytes_downloaded'] / 1024:.0f} KB, "
+                  f"节省 {stream_stats['bytes_saved'] / 1024:.0f} KB, 非HTML拒绝 {stream_stats['rejected_content_type']} 个, "
+                  f"无关页面提前终止 {stream_stats['aborted_irrelevant']} 个, 超限截断 {stream_stats['truncated']} 个")
+    
     def extract_employment_data(self, html: str) -> Dict[str, Any]:
         """从HTML中提取就业数据"""
-        soup = BeautifulSoup(html, 'lxml')
-        data = {
-            'total_graduates': 0,
-            'employment_rate': 0,
-            'signing_rate': 0,
-            'province': '',
-            'school_type': '',
-            'major_categories': {},
-            'freelance_data': {},
-            'trends': []
-        }
-        
-        # 提取文本内容
-        text = soup.get_text(separator=' ', strip=True)
-        
-        # 匹配毕业人数
-        graduate_patterns = [
-            r'毕业[生人数]+[:：]?(\d+[万千万]?)人',
-            r'(\d+[万千万]?)毕业生',
-            r'共(\d+[万千万]?)名毕业生'
-        ]
-        for pattern in graduate_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['total_graduates'] = match.group(1)
-                break
-        
-        # 匹配就业率
-        rate_patterns = [
-            r'就业率[:：]?(\d+\.?\d*)%',
-            r'就业.*?(\d+\.?\d*)%'
-        ]
-        for pattern in rate_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['employment_rate'] = float(match.group(1))
-                break
-        
-        # 匹配签约率
-        signing_patterns = [
-            r'签约率[:：]?(\d+\.?\d*)%',
-            r'签(?:约|三方)[^%]*(\d+\.?\d*)%'
-        ]
-        for pattern in signing_patterns:
-            match = re.search(pattern, text)
-            if match:
-                data['signing_rate'] = float(match.group(1))
-                break
-        
-        return data
+        return self.extract_from_text(self.html_to_text(html))
+    
+    def _extract_unique(self, url: str, html: str) -> Tuple[Optional[str], Optional[Dict[str, Any]], Any, str]:
+        """
+        提取文本后先做近重复检测，转载副本跳过指标匹配；返回 (原页面URL, 数据, MinHash 签名, 内容哈希)。
+        内容与上次保存时相同的页面直接复用已保存的指标和签名，不再解析。
+        """
+        digest = content_hash(html)
+        previous = self.state.get_page(url) if self.state else None
+        if previous and previous['content_hash'] == digest and previous['metrics'] is not None:
+            self.state_stats['unchanged'] += 1
+            signature = previous['signature']
+            canonical = self.dedup.check(signature, url) if self.dedup and signature is not None else None
+            return canonical, previous['metrics'], signature, digest
+        
+        text = self.html_to_text(html)
+        signature = minhash(text) if len(text) >= MIN_TEXT_CHARS else None
+        if self.dedup and signature is not None:
+            canonical = self.dedup.check(signature, url)
+            if canonical:
+                return canonical, None, signature, digest
+        start = time.perf_counter()
+        data = self.extract_from_text(text)
+        self._match_time[0] += time.perf_counter() - start
+        self._match_time[1] += 1
+        return None, data, signature, digest
+    
+    def dedup_summary(self) -> Dict[str, Any]:
+        """近重复检测统计；节省的CPU时间按平均指标匹配耗时估算（流水线模式下匹配已在子进程完成，不计）"""
+        if not self.dedup:
+            return {}
+        stats = self.dedup.summary()
+        seconds, pages = self._match_time
+        stats['cpu_seconds_saved'] = stats['duplicates'] * seconds / pages if pages else 0.0
+        return stats
+    
+    def html_to_text(self, html: str) -> str:
+        """提取网页文本内容"""
+        return page_text(html, self.fast_text, self.max_text_chars)
+    
+    def extract_from_text(self, text: str) -> Dict[str, Any]:
+        """从网页文本中匹配就业指标"""
+        return match_employment_metrics(text)
     
     def extract_search_results(self, html: str, engine: str) -> List[str]:
         """从搜索结果页面提取URL链接"""
@@ -90,293 +319,295 @@ class WebScraper:
         
         try:
             if engine == 'bing':
-                soup = BeautifulSoup(html, 'lxml')
-                for link in soup.find_all('a', href=True):
-                    href = link['href']
-                    if (href and href.startswith('http') 
-                        and 'bing.com' not in href 
-                        and 'microsoft.com' not in href
-                        and 'live.com' not in href
-                        and 'msn.com' not in href):
-                        urls.append(href)
+                urls = self._extract_links(html, ENGINE_MATCHERS['bing'])
             elif engine == 'sogou':
                 # 搜狗使用动态渲染，需要从 HTML 源码的 JSON 数据中提取 URL
-                # 搜索结果链接通常在 sup_url 字段中
-                patterns = [
-                    r'\"sup_url\":\"(https?:\\\\/\\\\/[^\"]+)\"',
-                    r'\"url\":\"(https?:\\\\/\\\\/[^\"]+)\"',
-                    r'\"link\":\"(https?:\\\\/\\\\/[^\"]+)\"'
-                ]
+                # 搜索结果链接通常在 sup_url 字段中，其次是 url、link 字段；一次扫描按字段分组
+                found = {'sup_url': [], 'url': [], 'link': []}
+                for match in SOGOU_URL_PATTERN.finditer(html):
+                    found[match.group(1)].append(match.group(2))
                 
-                for pattern in patterns:
-                    matches = re.findall(pattern, html)
-                    for url in matches:
-                        clean_url = url.replace('\\\\/', '/')
-                        url_lower = clean_url.lower()
-                        
-                        # 过滤条件
-                        if (len(clean_url) > 40 and 
-                            'sogou.com' not in url_lower and 
-                            'sogoucdn.com' not in url_lower and
-                            'sogouws.com' not in url_lower and
-                            'openapi' not in url_lower and  # 排除 API 链接
-                            'qpic.cn' not in url_lower):  # 排除 QQ 图片
-                            urls.append(clean_url)
+                exclude = ENGINE_MATCHERS['sogou_json']
+                for url in found['sup_url'] + found['url'] + found['link']:
+                    clean_url = url.replace('\\\\/', '/')
+                    # 过滤条件：排除短链接、搜狗自身、API 链接和 QQ 图片
+                    if len(clean_url) > 40 and not exclude.search(clean_url.lower()):
+                        urls.append(clean_url)
                 
                 # 如果没有从 JSON 中提取到，尝试从 href 属性中提取（PC 版）
                 if not urls:
-                    soup = BeautifulSoup(html, 'lxml')
-                    for link in soup.find_all('a', href=True):
-                        href = link['href']
-                        if (href and href.startswith('http') 
-                            and 'sogou.com' not in href 
-                            and 'sogoucdn.com' not in href
-                            and 'sogouws.com' not in href):
-                            urls.append(href)
-            elif engine == 'sogou':
-                # 搜狗使用动态渲染，需要从 HTML 源码的 JSON 数据中提取 URL
-                # 搜索结果链接通常在 sup_url 字段中
-                patterns = [
-                    r'\"sup_url\":\"(https?:\\\\/\\\\/[^\"]+)\"',
-                    r'\"url\":\"(https?:\\\\/\\\\/[^\"]+)\"',
-                    r'\"link\":\"(https?:\\\\/\\\\/[^\"]+)\"'
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, html)
-                    for url in matches:
-                        clean_url = url.replace('\\\\/', '/')
-                        url_lower = clean_url.lower()
-                        
-                        # 过滤条件
-                        if (len(clean_url) > 40 and 
-                            'sogou.com' not in url_lower and 
-                            'sogoucdn.com' not in url_lower and
-                            'sogouws.com' not in url_lower and
-                            'openapi' not in url_lower and  # 排除 API 链接
-                            'qpic.cn' not in url_lower):  # 排除 QQ 图片
-                            urls.append(clean_url)
-                
-                # 如果没有从 JSON 中提取到，尝试从 href 属性中提取（PC 版）
-                if not urls:
-                    soup = BeautifulSoup(html, 'lxml')
-                    for link in soup.find_all('a', href=True):
-                        href = link['href']
-                        if (href and href.startswith('http') 
-                            and 'sogou.com' not in href 
-                            and 'sogoucdn.com' not in href
-                            and 'sogouws.com' not in href):
-                            urls.append(href)
+                    urls = self._extract_links(html, ENGINE_MATCHERS['sogou'])
         except Exception as e:
             print(f"   ⚠️ 提取搜索结果时出错: {e}")
         
         return urls
     
+    @staticmethod
+    def _extract_links(html: str, exclude: SubstringMatcher) -> List[str]:
+        """提取页面中指向站外的链接"""
+        soup = BeautifulSoup(html, 'lxml')
+        return [
+            link['href'] for link in soup.find_all('a', href=True)
+            if link['href'].startswith('http') and not exclude.search(link['href'])
+        ]
+    
     def filter_urls(self, urls: List[str]) -> List[str]:
         """过滤URL，去除广告和不相关链接"""
-        filtered = []
-        
-        # 定义需要过滤的域名
-        blocked_domains = [
-            'ads.', 'advertisement', 'ad.', 'tracking.',
-            'youdao', 'hao123', 'sohu.com', '163.com',
-            '360.cn', 'tongji.baidu.com',
-            'sogoucdn.com', 'sogouws.com',
-            'baiducontent.com', 'm.baidu.com', 'baidubce.com',
-            'play.google.com', 'apps.apple.com',
-            'facebook.com', 'twitter.com', 'instagram.com',
-            'linkedin.com', 'youtube.com', 'tiktok.com',
-            'ifsc', 'swiftcode', 'ifsccode', 'ifsccodebank',
-            'cleartax', 'getswipe'
-        ]
-        
-        # 定义需要保留的关键词（更广泛）
-        keep_keywords = [
-            'edu.cn', 'gov.cn', 'org.cn', 'ac.cn',
-            'news', 'xinwen', 'zaixian', 'article',
-            'employment', 'job', 'zhipin', 'jobui',
-            'career', 'graduate', 'bysh',
-            'wangjiao', 'juye', 'qiuzhi',
-            'rencai', 'zhaopin', '51job',
-            'chsi', 'moe', 'people.com.cn',
-            'chinanews', 'xinhuanet', 'thepaper',
-            'cctv', 'cnbeta', '36kr',
-            'gaoxiaojob', 'yjbys',
-            'paper', 'report', 'analysis',
-            'data', 'statistics', 'trend'
-        ]
-        
-        for url in urls:
-            url_lower = url.lower()
-            
-            # 过滤广告域名
-            if any(blocked in url_lower for blocked in blocked_domains):
-                continue
-            
-            # 过滤短URL（可能是重定向或广告）
-            if len(url) < 30:
-                continue
-            
-            # 过滤重复的主页
-            if url.endswith('/') and len(url) < 35:
-                continue
-            
-            # 过滤明显不相关的URL（IFSC代码、银行等）
-            if 'ifsc' in url_lower or 'swiftcode' in url_lower:
-                continue
-            
-            # 保留包含关键词的URL
-            if any(keyword in url_lower for keyword in keep_keywords):
-                filtered.append(url)
-            else:
-                # 如果URL看起来是内容页面，也保留
-                if (len(url) > 50 and 
-                    any(char in url for char in ['?', '=', '-', '_', '.', '/']) and
-                    len(url.split('/')) > 3):
-                    filtered.append(url)
-        
-        return filtered
+        return self.url_filter.filter(urls)
     
     def search_bing(self, query: str, max_pages: int = 3, results_per_page: int = 10) -> List[str]:
         """使用 Bing 搜索引擎搜索（支持翻页）"""
         print(f"\n🔍 Bing 搜索: {query}")
-        search_url = "https://www.bing.com/search"
-        all_urls = []
         
-        for page in range(1, max_pages + 1):
-            offset = (page - 1) * results_per_page
-            params = {
+        def page_params(page: int) -> Dict[str, Any]:
+            return {
                 'q': query,
                 'count': results_per_page,
-                'first': offset,
+                'first': (page - 1) * results_per_page,
                 'setlang': 'zh-CN'
             }
-            
-            print(f"   第 {page} 页 (offset: {offset})")
-            html = self.fetch_page(search_url, params=params)
-            if html:
-                urls = self.extract_search_results(html, 'bing')
-                print(f"   找到 {len(urls)} 个结果")
-                all_urls.extend(urls)
-            else:
-                print(f"   第 {page} 页抓取失败")
-                break
-            
-            time.sleep(1)
         
-        return all_urls
+        return self._paginate('bing', 'Bing', "https://www.bing.com/search", page_params, max_pages)
     
     def search_sogou(self, query: str, max_pages: int = 3, results_per_page: int = 10) -> List[str]:
         """使用搜狗搜索引擎搜索（支持翻页）"""
         print(f"\n🔍 搜狗搜索: {query}")
-        search_url = "https://sogou.com/web"
-        all_urls = []
         
-        for page in range(max_pages):
-            page_num = page + 1
-            params = {
+        def page_params(page: int) -> Dict[str, Any]:
+            return {
                 'query': query,
-                'page': page_num,
+                'page': page,
                 'ie': 'utf8'
             }
+        
+        return self._paginate('sogou', '搜狗', "https://sogou.com/web", page_params, max_pages)
+    
+    def _paginate(self, engine: str, label: str, search_url: str, page_params, max_pages: int) -> List[str]:
+        """逐页抓取搜索结果；某一页过滤后没有新增链接时提前停止翻页"""
+        start = time.perf_counter()
+        all_urls = []
+        seen = set()
+        pages = 0
+        stopped_early = False
+        
+        for page in range(1, max_pages + 1):
+            print(f"   [{label}] 第 {page} 页")
+            html = self.fetch_page(search_url, params=page_params(page))
+            if not html:
+                print(f"   [{label}] 第 {page} 页抓取失败")
+                break
             
-            print(f"   第 {page_num} 页")
-            html = self.fetch_page(search_url, params=params)
+            pages += 1
+            urls = self.extract_search_results(html, engine)
+            all_urls.extend(urls)
+            new_urls = [url for url in self.filter_urls(urls) if url not in seen]
+            seen.update(new_urls)
+            print(f"   [{label}] 找到 {len(urls)} 个结果，新增有效链接 {len(new_urls)} 个")
             
-            if html:
-                urls = self.extract_search_results(html, 'sogou')
-                print(f"   找到 {len(urls)} 个结果")
-                all_urls.extend(urls)
-            else:
-                print(f"   第 {page_num} 页抓取失败")
+            if not new_urls:
+                stopped_early = page < max_pages
+                if stopped_early:
+                    print(f"   [{label}] 本页无新增链接，停止翻页")
                 break
             
-            time.sleep(1)
+            if page < max_pages:
+                time.sleep(self.search_delay)
         
+        self.search_stats[engine] = {
+            'pages': pages,
+            'elapsed': time.perf_counter() - start,
+            'stopped_early': stopped_early
+        }
         return all_urls
     
-    def search_and_scrape(self, query: str, max_pages: int = 3, num_to_scrape: int = 30) -> List[Dict[str, Any]]:
-        """搜索并抓取相关页面数据（支持翻页）"""
-        all_results = []
-        
-        print(f"\n{'='*60}")
-        print(f"开始搜索并抓取数据: {query}")
-        print(f"翻页: 最多 {max_pages} 页/搜索引擎")
-        print(f"抓取: 最多 {num_to_scrape} 个页面")
-        print(f"{'='*60}")
-        
-        # 同时使用 Bing 和搜狗搜索（支持翻页）
-        bing_urls = self.search_bing(query, max_pages=max_pages, results_per_page=10)
-        sogou_urls = self.search_sogou(query, max_pages=max_pages, results_per_page=10)
+    def search(self, query: str, max_pages: int = 3) -> List[str]:
+        """搜索并返回去重、过滤后的结果链接（支持翻页）"""
+        start = time.perf_counter()
+        self.search_stats = {}
+        
+        # 同时使用 Bing 和搜狗搜索（支持翻页），两个搜索引擎并行翻页
+        if self.parallel_search:
+            with ThreadPoolExecutor(max_workers=2) as pool:
+                bing_future = pool.submit(self.search_bing, query, max_pages, 10)
+                sogou_future = pool.submit(self.search_sogou, query, max_pages, 10)
+                bing_urls = bing_future.result()
+                sogou_urls = sogou_future.result()
+        else:
+            bing_urls = self.search_bing(query, max_pages=max_pages, results_per_page=10)
+            sogou_urls = self.search_sogou(query, max_pages=max_pages, results_per_page=10)
         
         print(f"\n📊 搜索统计:")
-        print(f"   Bing 找到: {len(bing_urls)} 个结果")
-        print(f"   搜狗找到: {len(sogou_urls)} 个结果")
+        for engine, label, urls in (('bing', 'Bing', bing_urls), ('sogou', '搜狗', sogou_urls)):
+            stats = self.search_stats.get(engine, {})
+            note = '，提前停止' if stats.get('stopped_early') else ''
+            print(f"   {label} 找到: {len(urls)} 个结果 "
+                  f"(翻页 {stats.get('pages', 0)} 页, 耗时 {stats.get('elapsed', 0):.1f} 秒{note})")
         
-        # 合并去重
-        all_urls = list(set(bing_urls + sogou_urls))
+        # 合并去重（保持搜索结果顺序）
+        all_urls = list(dict.fromkeys(bing_urls + sogou_urls))
         
         # 过滤广告和不相关链接
         all_urls = self.filter_urls(all_urls)
         
         print(f"   过滤后: {len(all_urls)} 个唯一链接")
+        print(f"   搜索总耗时: {time.perf_counter() - start:.1f} 秒")
+        return all_urls
+    
+    def search_and_scrape(self, query: str, max_pages: int = 3, num_to_scrape: int = 30) -> List[PageRecord]:
+        """搜索并抓取相关页面数据（支持翻页）"""
+        print(f"\n{'='*60}")
+        print(f"开始搜索并抓取数据: {query}")
+        print(f"翻页: 最多 {max_pages} 页/搜索引擎")
+        print(f"抓取: 最多 {num_to_scrape} 个页面")
+        print(f"{'='*60}")
         
+        all_urls = self.search(query, max_pages=max_pages)
         if not all_urls:
             print("⚠️ 未找到有效搜索结果")
-            return all_results
+            return []
         
         # 限制抓取数量
-        urls_to_scrape = all_urls[:num_to_scrape]
-        print(f"\n开始抓取 {len(urls_to_scrape)} 个页面...")
+        return self.scrape_urls([(url, query) for url in all_urls[:num_to_scrape]])
+    
+    def scrape_urls(self, targets: List[Tuple[str, str]]) -> List[PageRecord]:
+        """抓取并解析页面，targets 为 [(url, 来源查询), ...]"""
+        all_results = []
+        urls = [url for url, _ in targets]
+        print(f"\n开始抓取 {len(targets)} 个页面...")
+        
+        # 最近抓取过的页面直接复用保存的结果，其余页面才下载
+        reused = self.state.fresh_pages(urls, self.state_max_age) if self.state else {}
+        to_fetch = [url for url in urls if url not in reused]
+        if reused:
+            print(f"🗂️ {len(reused)} 个页面在 {self.state_max_age / 3600:.0f} 小时内抓取过，复用已保存结果")
         
         # 抓取搜索结果页面
+        parsed = pages = None
+        if self.parse_workers > 0:
+            parsed = dict(zip(to_fetch, self.pipeline.run(to_fetch)))
+        elif self.max_workers > 1:
+            pages = dict(self.fetcher.fetch_all(to_fetch))
+        
         success_count = 0
-        for idx, url in enumerate(urls_to_scrape, 1):
-            print(f"\n[{idx}/{len(urls_to_scrape)}] 抓取: {url}")
-            html = self.fetch_page(url)
-            if html:
-                data = self.extract_employment_data(html)
-                data['source_url'] = url
-                data['search_query'] = query
-                
-                # 检查是否有有效数据
-                has_data = (data.get('employment_rate', 0) > 0 or 
-                          data.get('signing_rate', 0) > 0 or 
-                          data.get('total_graduates'))
-                
-                if has_data or len(html) > 1000:  # 有数据或页面内容充足
-                    all_results.append(data)
-                    success_count += 1
-                    print(f"   ✅ 成功 (就业率: {data.get('employment_rate', 0)}%)")
-                else:
-                    print(f"   ⚠️ 页面数据不足")
+        for idx, (url, query) in enumerate(targets, 1):
+            print(f"\n[{idx}/{len(targets)}] 抓取: {url}")
+            canonical = signature = digest = None
+            fetched = url not in reused
+            if not fetched:
+                record = reused[url]
+                self.state_stats['reused_fresh'] += 1
+                html_len, data, signature = record['html_len'], record['metrics'], record['signature']
+                if self.dedup and signature is not None:
+                    canonical = self.dedup.check(signature, url)
+            elif parsed is not None:
+                html_len, result = parsed[url]
+                data = None
+                if result is not None:
+                    data, signature, digest = result
+                    if self.dedup and signature is not None:
+                        canonical = self.dedup.check(signature, url)
             else:
-                print(f"   ❌ 抓取失败")
+                html = pages[url] if pages is not None else self.fetch_page(url, content=True)
+                html_len = len(html)
+                if html:
+                    canonical, data, signature, digest = self._extract_unique(url, html)
+                else:
+                    data = None
             
-            time.sleep(2)
+            if self.state and fetched:
+                self.state.save_page(url, html_len, data, signature, digest)
+            # 顺序抓取时每下载一个页面都等待一次（包括近似重复的页面），再请求下一个
+            if fetched and pages is None and parsed is None:
+                time.sleep(self.per_host_delay)
+            
+            if canonical:
+                print(f"   ♻️ 与 {canonical} 内容近似重复，合并为同一数据源")
+                if self.state:
+                    self.state.mark_done(url, 'duplicate', canonical)
+                continue
+            record = self._accept_page(url, query, html_len, data)
+            if record is not None:
+                all_results.append(record)
+                success_count += 1
+            if self.state:
+                self.state.mark_done(url, 'accepted' if record is not None else 'rejected')
+        
+        if self.dedup:
+            # 转载副本的URL作为来源记录在原页面上
+            for record in all_results:
+                duplicates = self.dedup.clusters.get(record.source_url)
+                if duplicates:
+                    record.duplicate_urls = list(duplicates)
         
         print(f"\n✅ 成功抓取 {success_count} 个有效页面")
+        if parsed:
+            stats = self.pipeline.last_stats
+            print(f"⚡ 流水线抓取: {stats['pages']} 页 / {stats['elapsed']:.1f} 秒 "
+                  f"({stats['pages_per_sec']:.2f} 页/秒, 下载并发 {self.max_workers}, "
+                  f"解析进程 {self.parse_workers}, 解析CPU {stats['parse_cpu_seconds']:.1f} 秒)")
+        elif pages:
+            stats = self.fetcher.last_stats
+            print(f"⚡ 并发抓取: {stats['pages']} 页 / {stats['elapsed']:.1f} 秒 "
+                  f"({stats['pages_per_sec']:.2f} 页/秒, 并发 {self.max_workers})")
         return all_results
     
-    def scrape_multiple_sources(self, urls: List[str]) -> List[Dict[str, Any]]:
+    def _accept_page(self, url: str, query: str, html_len: int, data: Optional[Dict[str, Any]]) -> Optional[PageRecord]:
+        """检查单个页面的解析结果，返回有效记录或 None"""
+        if not html_len or data is None:
+            print(f"   ❌ 抓取失败")
+            return None
+        
+        record = PageRecord.from_metrics(data, url, query)
+        
+        # 有数据或页面内容充足
+        if record.has_data or html_len > 1000:
+            print(f"   ✅ 成功 (就业率: {record.employment_rate}%)")
+            return record
+        print(f"   ⚠️ 页面数据不足")
+        return None
+    
+    def scrape_multiple_sources(self, urls: List[str]) -> List[PageRecord]:
         """批量抓取多个数据源"""
         results = []
+        if self.parse_workers > 0:
+            for url, (_, result) in zip(urls, self.pipeline.run(urls)):
+                print(f"正在抓取: {url}")
+                data = result[0] if result is not None else None  # (数据, 签名, 内容哈希)
+                if data is not None:
+                    results.append(PageRecord.from_metrics(data, url))
+            return results
+        
+        if self.max_workers > 1:
+            for url, html in self.fetcher.fetch_all(urls):
+                print(f"正在抓取: {url}")
+                if html:
+                    results.append(PageRecord.from_metrics(self.extract_employment_data(html), url))
+            return results
+        
         for url in urls:
             print(f"正在抓取: {url}")
-            html = self.fetch_page(url)
+            html = self.fetch_page(url, content=True)
             if html:
-                data = self.extract_employment_data(html)
-                data['source_url'] = url
-                results.append(data)
-            time.sleep(2)  # 避免请求过快
+                results.append(PageRecord.from_metrics(self.extract_employment_data(html), url))
+            time.sleep(self.per_host_delay)  # 避免请求过快
         return results
 
 
 class DataScraperTool:
     """数据抓取工具类"""
     
-    def __init__(self):
-        self.scraper = WebScraper()
+    def __init__(self, scraper: Optional[WebScraper] = None, page_budget: int = 150, query_delay: float = 3.0,
+                 resume: bool = True):
+        """
+        scraper: 自定义的 WebScraper（并发、缓存等配置）
+        page_budget: 整次运行最多抓取的页面数（所有查询共享）
+        query_delay: 两次搜索查询之间的间隔（秒）
+        resume: scraper 启用了抓取状态时，自动从上次中断的运行继续
+        """
+        self.scraper = scraper or WebScraper()
+        self.page_budget = page_budget
+        self.query_delay = query_delay
+        self.resume = resume
         
         self.search_queries = [
             '2024年 高校本科毕业生 就业率',
@@ -389,50 +620,58 @@ class DataScraperTool:
         ]
     
     def scrape_employment_data(self) -> str:
+        """抓取就业数据并返回 JSON 字符串（兼容原接口，流程内部使用 collect()）"""
+        return json.dumps(self.collect().to_dict(), ensure_ascii=False, indent=2)
+    
+    def collect(self) -> EmploymentSummary:
         """抓取就业数据主函数 - 使用搜索引擎搜索（支持翻页）"""
-        all_data = []
-        
         print("\n" + "="*70)
         print("【数据抓取策略】使用搜索引擎搜索，支持翻页（最多5页/搜索引擎）")
         print("="*70)
         
-        # 使用搜索引擎搜索并翻页
-        for query in self.search_queries[:5]:  # 使用前5个查询
-            results = self.scraper.search_and_scrape(
-                query, 
-                max_pages=5,  # 每个搜索引擎最多翻5页
-                num_to_scrape=30  # 取30个页面进行抓取
-            )
-            all_data.extend(results)
-            time.sleep(3)  # 查询间延迟
+        state = self.scraper.state
+        if state and self.resume and state.resume_run():
+            # 恢复上次中断的运行：跳过搜索，只抓取尚未处理的页面
+            targets = state.pending_targets()
+            print(f"\n⏯️ 恢复未完成的运行 {state.run_id}: 剩余 {len(targets)} 个页面")
+            if self.scraper.dedup:
+                for url, signature in state.run_signatures():
+                    self.scraper.dedup.check(signature, url)
+            all_data = self.scraper.scrape_urls(targets)
+        else:
+            all_data = self._search_and_scrape()
+        self.scraper.print_fetch_stats()
+        
+        if state:
+            # 从保存的记录重建整次运行的结果（包括恢复前已处理的页面）
+            all_data = state.run_results()
+            state.finish_run()
         
         # 统计汇总
-        summary = self._summarize_data(all_data)
-        return json.dumps(summary, ensure_ascii=False, indent=2)
+        return EmploymentSummary.from_pages(all_data)
     
-    def _summarize_data(self, data_list: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """汇总数据"""
-        summary = {
-            'total_sources': len(data_list),
-            'employment_rates': [],
-            'signing_rates': [],
-            'graduate_counts': [],
-            'sources': []
-        }
-        
-        for data in data_list:
-            if data.get('employment_rate'):
-                summary['employment_rates'].append(data['employment_rate'])
-            if data.get('signing_rate'):
-                summary['signing_rates'].append(data['signing_rate'])
-            if data.get('total_graduates'):
-                summary['graduate_counts'].append(data['total_graduates'])
-            summary['sources'].append(data.get('source_url', ''))
-        
-        # 计算平均值
-        if summary['employment_rates']:
-            summary['avg_employment_rate'] = sum(summary['employment_rates']) / len(summary['employment_rates'])
-        if summary['signing_rates']:
-            summary['avg_signing_rate'] = sum(summary['signing_rates']) / len(summary['signing_rates'])
-        
-        return summary
+    def _search_and_scrape(self) -> List[PageRecord]:
+        """执行全部搜索查询，再在页面预算内按优先级抓取"""
+        # 所有查询共享同一个抓取边界：跨查询去重，按优先级分配整次运行的页面预算
+        frontier = CrawlFrontier(page_budget=self.page_budget)
+        for query in self.search_queries[:5]:  # 使用前5个查询
+            print(f"\n{'='*60}")
+            print(f"搜索: {query}")
+            print(f"{'='*60}")
+            urls = self.scraper.search(query, max_pages=5)  # 每个搜索引擎最多翻5页
+            added = frontier.add_many(urls, query)
+            print(f"   新增 {added} 个待抓取链接，与其他查询重复 {len(urls) - added} 个")
+            time.sleep(self.query_delay)  # 查询间延迟
+        
+        # 在页面预算内按优先级抓取
+        targets = frontier.pop_batch()
+        if self.scraper.state:
+            run_id = self.scraper.state.start_run(targets)
+            print(f"\n🗂️ 运行 {run_id}: 计划抓取 {len(targets)} 个页面（中断后可恢复）")
+        all_data = self.scraper.scrape_urls(targets)
+        
+        stats = frontier.stats()
+        print(f"\n🧭 抓取边界统计: 发现 {stats['discovered']} 个链接, 唯一 {stats['unique']} 个, "
+              f"避免重复抓取 {stats['avoided_fetches']} 次, 已抓取 {stats['dispatched']}/{stats['page_budget']}, "
+              f"超出预算未抓取 {stats['over_budget']} 个")
+        return all_data
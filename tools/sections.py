@@ -0,0 +1,148 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable
+
+from .llm_client import StreamingLLM, GenerationStats, log
+
+SECTION_HEADING = re.compile(r'^## ', re.MULTILINE)
+# 粗略的 token 估计：每个汉字、英文单词、数字串、标点各算一个
+TOKEN_PATTERN = re.compile(r'[\u4e00-\u9fff]|[A-Za-z]+|\d+|[^\sA-Za-z\d\u4e00-\u9fff]')
+
+
+def split_sections(report: str) -> List[str]:
+    """按二级标题（## ）切分报告；第一个二级标题之前的内容（标题、导语）单独作为第 0 段"""
+    starts = [match.start() for match in SECTION_HEADING.finditer(report)]
+    if not starts:
+        return [report]
+    bounds = [0, *starts] if starts[0] > 0 else starts
+    return [report[start:end] for start, end in zip(bounds, bounds[1:] + [len(report)])]
+
+
+def section_title(section: str) -> str:
+    line = section.strip().split('\n', 1)[0]
+    return line.lstrip('#').strip()[:30]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(TOKEN_PATTERN.findall(text))
+
+
+class SectionOptimizer:
+    """
+    分章节并发优化报告：每个 ## 章节单独请求 LLM，并发数与 Ollama 的并行槽位（OLLAMA_NUM_PARALLEL）一致，
+    结果按原顺序拼回。每个章节独立重试，重试仍失败时保留原文，不影响其他章节。
+    不含二级标题的前导部分（报告标题）原样保留。
+
+    rewrite() 只重新生成审核意见涉及的章节，其余章节逐字节保留。
+    """
+
+    def __init__(self, client: StreamingLLM, max_parallel: int = 4, retries: int = 2, retry_delay: float = 2.0):
+        self.client = client
+        self.max_parallel = max(1, max_parallel)
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.results: List[Dict[str, Any]] = []
+        self.tokens: Dict[str, int] = {}
+
+    def optimize(self, report: str, make_prompt: Callable[[str], str], label: str,
+                 on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """逐章节生成并按顺序拼接；返回拼接后的报告，各章节的耗时和重试次数见 self.results"""
+        sections = split_sections(report)
+        prompts = {idx: make_prompt(section) for idx, section in enumerate(sections) if SECTION_HEADING.match(section)}
+        self.tokens = {}
+        return self._run(sections, prompts, label, on_progress)
+
+    def rewrite(self, report: str, comments: Dict[int, List[str]], make_prompt: Callable[[str, List[str]], str],
+                label: str, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        定向修改：comments 为 章节下标（split_sections 的顺序）-> 该章节的审核意见，只重新生成这些章节。
+        self.tokens 记录重新生成与原样保留的 token 数（按 estimate_tokens 估计）。
+        """
+        sections = split_sections(report)
+        prompts = {idx: make_prompt(sections[idx], items) for idx, items in sorted(comments.items())
+                   if 0 <= idx < len(sections) and items}
+        self.tokens = {
+            'replaced': sum(estimate_tokens(sections[idx]) for idx in prompts),
+            'kept': sum(estimate_tokens(section) for idx, section in enumerate(sections) if idx not in prompts)
+        }
+        revised = self._run(sections, prompts, label, on_progress)
+        self.tokens['generated'] = sum(result['tokens'] for result in self.results if result['ok'])
+        total = self.tokens['replaced'] + self.tokens['kept']
+        print(f"   ✂️ {label}: 修改 {len(prompts)}/{len(sections)} 节，重新生成约 {self.tokens['replaced']} tokens"
+              f"（输出 {self.tokens['generated']} tokens），保留约 {self.tokens['kept']} tokens"
+              f"（{self.tokens['kept'] / total if total else 0:.0%}）")
+        return revised
+
+    def _run(self, sections: List[str], prompts: Dict[int, str], label: str,
+             on_progress: Optional[Callable[[Dict[str, Any]], None]]) -> str:
+        targets = list(prompts)
+        outputs = list(sections)
+        progress: Dict[int, Dict[str, Any]] = {}
+        lock = threading.Lock()
+        done = []
+        start = time.perf_counter()
+
+        def report_progress(idx: int, event: Dict[str, Any]):
+            if on_progress is None:
+                return
+            with lock:
+                progress[idx] = event
+                on_progress({
+                    'label': f"{label} {len(done)}/{len(targets)} 节",
+                    'chars': sum(item['chars'] for item in progress.values()),
+                    'tokens': sum(item['tokens'] for item in progress.values()),
+                    'elapsed': round(time.perf_counter() - start, 1),
+                    'tokens_per_sec': round(sum(item['tokens_per_sec'] for item in progress.values()
+                                                if item.get('active')), 1)
+                })
+
+        def run(idx: int) -> Dict[str, Any]:
+            section = sections[idx]
+            section_label = f"{label}-{idx:02d}"
+            prompt = prompts[idx]
+            began = time.perf_counter()
+            error = None
+            for attempt in range(1, self.retries + 2):
+                try:
+                    text, stats = self.client.generate_with_stats(
+                        prompt, section_label, lambda event: report_progress(idx, {**event, 'active': True})
+                    )
+                    outputs[idx] = text if text.endswith('\n') else text + '\n\n'
+                    with lock:
+                        done.append(idx)
+                    report_progress(idx, {**stats.to_dict(), 'active': False})
+                    return {'index': idx, 'title': section_title(section), 'attempts': attempt, 'ok': True,
+                            'seconds': round(time.perf_counter() - began, 2), **stats.to_dict()}
+                except Exception as e:
+                    error = e
+                    log(f"   ⚠️ 章节 {section_title(section)} 第 {attempt} 次生成失败: {e}")
+                    if attempt <= self.retries:
+                        time.sleep(self.retry_delay * attempt)
+            with lock:
+                done.append(idx)
+            return {'index': idx, 'title': section_title(section), 'attempts': self.retries + 1, 'ok': False,
+                    'seconds': round(time.perf_counter() - began, 2), 'error': str(error)}
+
+        with ThreadPoolExecutor(max_workers=self.max_parallel) as executor:
+            self.results = list(executor.map(run, targets))
+
+        failed = [result['title'] for result in self.results if not result['ok']]
+        if failed:
+            print(f"   ⚠️ {len(failed)} 个章节生成失败，保留原文: {', '.join(failed)}")
+        return ''.join(outputs)
+
+    def summary(self, label: str, total: float) -> Dict[str, Any]:
+        """汇总为一条 generation_stats 记录（total 为端到端耗时），附各章节明细"""
+        succeeded = [result for result in self.results if result['ok']]
+        stats = GenerationStats(
+            label=label,
+            chars=sum(result['chars'] for result in succeeded),
+            tokens=sum(result['tokens'] for result in succeeded),
+            ttft=min((result['ttft'] for result in succeeded), default=0.0),
+            total=total,
+            streamed=self.client.stream,
+            cached=bool(succeeded) and all(result['cached'] for result in succeeded)
+        )
+        return {**stats.to_dict(), 'sections': self.results, **({'section_tokens': self.tokens} if self.tokens else {})}
@@ -0,0 +1,70 @@
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .frontier import url_priority
+from .normalize import normalize_counts, normalize_rates
+from .records import PageRecord
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def source_weight(url: str) -> float:
+    """来源权重：高校/政府站点 3，内容页 2，其他 1"""
+    return 1.0 + url_priority(url)
+
+
+def pages_frame(pages: List[PageRecord]) -> pd.DataFrame:
+    """把页面记录一次性载入 DataFrame，比率换算为 0-1 的小数、毕业人数换算为数值（未提取到的记为 NaN）"""
+    frame = pd.DataFrame({
+        'source_url': [page.source_url for page in pages],
+        'employment_rate': normalize_rates([page.employment_rate for page in pages], unit='percent'),
+        'signing_rate': normalize_rates([page.signing_rate for page in pages], unit='percent'),
+        'total_graduates': normalize_counts([page.total_graduates for page in pages]),
+    })
+    frame['weight'] = frame['source_url'].map(source_weight).astype(float) if len(frame) else []
+    return frame
+
+
+def describe(values: np.ndarray, weights: Optional[np.ndarray] = None,
+             trim: float = 0.1, iqr_k: float = 1.5) -> Dict[str, Any]:
+    """
+    向量化描述统计：一次排序后得到分位数、截尾均值；按 IQR 规则剔除异常值后计算稳健均值和按来源加权的均值。
+
+    values: 指标值（NaN 视为缺失）
+    weights: 每个值的来源权重，默认等权
+    trim: 截尾均值两端各去掉的比例
+    iqr_k: 超出 [P25 - k*IQR, P75 + k*IQR] 的值视为异常值
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float)
+    present = ~np.isnan(values)
+    values, weights = values[present], weights[present]
+    count = len(values)
+    if count == 0:
+        return {'count': 0, 'mean': 0, 'median': 0, 'trimmed_mean': 0, 'std': 0, 'min': 0, 'max': 0,
+                **{f'p{p}': 0 for p in PERCENTILES}, 'outliers': 0, 'robust_mean': 0, 'weighted_mean': 0}
+
+    order = np.argsort(values, kind='stable')
+    values, weights = values[order], weights[order]
+    quantiles = dict(zip(PERCENTILES, np.percentile(values, PERCENTILES)))
+
+    iqr = quantiles[75] - quantiles[25]
+    inliers = (values >= quantiles[25] - iqr_k * iqr) & (values <= quantiles[75] + iqr_k * iqr)
+    cut = int(count * trim)
+    kept = values[cut:count - cut] if count - 2 * cut > 0 else values
+
+    return {
+        'count': count,
+        'mean': round(float(values.mean()), 4),
+        'median': round(float(quantiles[50]), 4),
+        'trimmed_mean': round(float(kept.mean()), 4),
+        'std': round(float(values.std(ddof=1)), 4) if count > 1 else 0,
+        'min': round(float(values[0]), 4),
+        'max': round(float(values[-1]), 4),
+        **{f'p{p}': round(float(q), 4) for p, q in quantiles.items()},
+        'outliers': int(count - inliers.sum()),
+        'robust_mean': round(float(values[inliers].mean()), 4),
+        'weighted_mean': round(float(np.average(values[inliers], weights=weights[inliers])), 4)
+    }
@@ -0,0 +1,101 @@
+import threading
+from typing import Dict, Any, Optional, Iterable
+
+from requests.compat import chardet
+
+# 相关性判断关键词（按常见中文网页编码分别编码后在字节流中查找）
+RELEVANCE_KEYWORDS = ('就业率', '签约率', '毕业生')
+KEYWORD_ENCODINGS = ('utf-8', 'gb18030')
+
+
+class StreamPolicy:
+    """流式抓取策略：按 Content-Type 拒绝非HTML，限制下载字节数，前 N KB 无关键词则提前终止"""
+
+    def __init__(self, max_bytes: int = 2 * 1024 * 1024, relevance_window: int = 64 * 1024,
+                 keywords: Iterable[str] = RELEVANCE_KEYWORDS, chunk_size: int = 16 * 1024):
+        """
+        max_bytes: 单个页面最多下载的字节数，超出部分截断
+        relevance_window: 在前多少字节内检查关键词，0 表示不做相关性检查
+        """
+        self.max_bytes = max_bytes
+        self.relevance_window = relevance_window
+        self.chunk_size = chunk_size
+        self.patterns = {kw.encode(enc) for kw in keywords for enc in KEYWORD_ENCODINGS}
+        self._lock = threading.Lock()
+        self.stats = {
+            'pages': 0,
+            'rejected_content_type': 0,
+            'aborted_irrelevant': 0,
+            'truncated': 0,
+            'bytes_downloaded': 0,
+            'bytes_saved': 0
+        }
+
+    @staticmethod
+    def is_html(content_type: str) -> bool:
+        """未声明类型时放行；声明了则只接受 HTML/XHTML"""
+        if not content_type:
+            return True
+        content_type = content_type.lower()
+        return 'html' in content_type or 'xml' in content_type
+
+    def read(self, response) -> Optional[bytes]:
+        """流式读取响应体，被拒绝或提前终止时返回 None"""
+        expected = self._content_length(response)
+
+        if not self.is_html(response.headers.get('Content-Type', '')):
+            self._record('rejected_content_type', downloaded=0, expected=expected)
+            return None
+
+        chunks = []
+        received = 0
+        checked = self.relevance_window <= 0
+        outcome = 'pages'
+        for chunk in response.iter_content(chunk_size=self.chunk_size):
+            chunks.append(chunk)
+            received += len(chunk)
+            if not checked and received >= self.relevance_window:
+                checked = True
+                head = b''.join(chunks)
+                if not any(pattern in head for pattern in self.patterns):
+                    outcome = 'aborted_irrelevant'
+                    break
+            if received >= self.max_bytes:
+                outcome = 'truncated'
+                break
+
+        self._record(outcome, downloaded=self._wire_bytes(response, received), expected=expected)
+        if outcome == 'aborted_irrelevant':
+            return None
+        return b''.join(chunks)[:self.max_bytes]
+
+    @staticmethod
+    def decode(body: bytes) -> str:
+        """按内容探测编码解码（与 response.apparent_encoding 一致）"""
+        encoding = chardet.detect(body)['encoding'] or 'utf-8'
+        return body.decode(encoding, errors='replace')
+
+    @staticmethod
+    def _content_length(response) -> Optional[int]:
+        try:
+            return int(response.headers.get('Content-Length'))
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _wire_bytes(response, received: int) -> int:
+        """实际从网络读取的字节数（压缩传输时小于解压后的大小）"""
+        tell = getattr(response.raw, 'tell', None)
+        return tell() if callable(tell) else received
+
+    def _record(self, outcome: str, downloaded: int, expected: Optional[int]):
+        with self._lock:
+            if outcome != 'pages':
+                self.stats[outcome] += 1
+            self.stats['pages'] += 1
+            self.stats['bytes_downloaded'] += downloaded
+            if expected is not None and expected > downloaded:
+                self.stats['bytes_saved'] += expected - downloaded
+
+    def summary(self) -> Dict[str, Any]:
+        return dict(self.stats)
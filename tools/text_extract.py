@@ -0,0 +1,71 @@
+from typing import Optional
+
+from lxml import etree
+
+# 不含正文的标签：脚本、样式、导航、页脚
+SKIP_TAGS = {'script', 'style', 'noscript', 'template', 'nav', 'footer'}
+
+FEED_CHUNK = 64 * 1024
+
+
+class _TextCollector:
+    """lxml 解析器 target：只接收事件流，不构建DOM树"""
+
+    def __init__(self):
+        self.parts = []
+        self.length = 0
+        self._buffer = []
+        self._skip_depth = 0
+
+    def start(self, tag, attrib):
+        self._flush()
+        if self._skip_depth or tag in SKIP_TAGS:
+            self._skip_depth += 1
+
+    def end(self, tag):
+        self._flush()
+        if self._skip_depth:
+            self._skip_depth -= 1
+
+    def data(self, text):
+        if not self._skip_depth:
+            self._buffer.append(text)
+
+    def comment(self, text):
+        self._flush()
+
+    def pi(self, target, data=None):
+        self._flush()
+
+    def close(self):
+        self._flush()
+        return ' '.join(self.parts)
+
+    def _flush(self):
+        """相邻文本合并为一段并去除首尾空白（与 get_text(separator=' ', strip=True) 一致）"""
+        if not self._buffer:
+            return
+        text = ''.join(self._buffer).strip()
+        self._buffer = []
+        if text:
+            self.parts.append(text)
+            self.length += len(text) + 1
+
+
+def html_to_text(html: str, max_chars: Optional[int] = None) -> str:
+    """流式提取网页正文文本，跳过 script/style/nav/footer，可限制提取的最大字符数"""
+    collector = _TextCollector()
+    parser = etree.HTMLParser(target=collector)
+
+    try:
+        for offset in range(0, len(html), FEED_CHUNK):
+            parser.feed(html[offset:offset + FEED_CHUNK])
+            if max_chars is not None and collector.length >= max_chars:
+                break
+        text = parser.close()
+    except etree.LxmlError:
+        text = collector.close()
+
+    if max_chars is not None:
+        text = text[:max_chars]
+    return text
@@ -0,0 +1,149 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+# 需要过滤的域名/片段
+BLOCKED_PATTERNS = [
+    'ads.', 'advertisement', 'ad.', 'tracking.',
+    'youdao', 'hao123', 'sohu.com', '163.com',
+    '360.cn', 'tongji.baidu.com',
+    'sogoucdn.com', 'sogouws.com',
+    'baiducontent.com', 'm.baidu.com', 'baidubce.com',
+    'play.google.com', 'apps.apple.com',
+    'facebook.com', 'twitter.com', 'instagram.com',
+    'linkedin.com', 'youtube.com', 'tiktok.com',
+    'ifsc', 'swiftcode', 'ifsccode', 'ifsccodebank',
+    'cleartax', 'getswipe'
+]
+
+# 需要保留的关键词（更广泛）
+KEEP_KEYWORDS = [
+    'edu.cn', 'gov.cn', 'org.cn', 'ac.cn',
+    'news', 'xinwen', 'zaixian', 'article',
+    'employment', 'job', 'zhipin', 'jobui',
+    'career', 'graduate', 'bysh',
+    'wangjiao', 'juye', 'qiuzhi',
+    'rencai', 'zhaopin', '51job',
+    'chsi', 'moe', 'people.com.cn',
+    'chinanews', 'xinhuanet', 'thepaper',
+    'cctv', 'cnbeta', '36kr',
+    'gaoxiaojob', 'yjbys',
+    'paper', 'report', 'analysis',
+    'data', 'statistics', 'trend'
+]
+
+# 搜索结果页中属于搜索引擎自身的链接
+ENGINE_EXCLUDES = {
+    'bing': ['bing.com', 'microsoft.com', 'live.com', 'msn.com'],
+    'sogou': ['sogou.com', 'sogoucdn.com', 'sogouws.com'],
+    'sogou_json': ['sogou.com', 'sogoucdn.com', 'sogouws.com', 'openapi', 'qpic.cn']
+}
+
+_DOMAIN_RE = re.compile(r'^[a-z0-9-]+(\.[a-z0-9-]+)+$')
+
+
+def trie_regex(words: Iterable[str]) -> str:
+    """把一组字面量编译为前缀合并的正则（如 sogou(?:cdn\\.com|ws\\.com|\\.com)），减少回溯"""
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        if '' in node and len(node) == 1:
+            return ''
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        optional = '' in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = '(?:' + '|'.join(branches) + ')'
+        return body + '?' if optional else body
+
+    return build(trie)
+
+
+class SubstringMatcher:
+    """多关键词子串匹配：一次编译，一次扫描"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._regex = re.compile(trie_regex(set(patterns)))
+
+    def search(self, text: str) -> bool:
+        return self._regex.search(text) is not None
+
+
+class UrlFilter:
+    """
+    编译后的URL过滤器：屏蔽规则、保留规则各编译为一个前缀合并的正则。
+
+    规则都不含 '/'，任何命中都不会跨越URL中的 '/'，因此把URL在主机名之后的第一个 '/'
+    处切开分别判断，结果与对整条URL逐条 any(... in url) 完全一致。主机部分的判断结果
+    按主机名缓存（先查域名规则的主机名后缀索引），每条URL只需扫描路径部分。
+    """
+
+    def __init__(self, blocked: Iterable[str] = BLOCKED_PATTERNS, keep: Iterable[str] = KEEP_KEYWORDS,
+                 max_hosts: int = 50000):
+        blocked = set(blocked)
+        keep = set(keep)
+        self._blocked = SubstringMatcher(blocked)
+        self._keep = SubstringMatcher(keep)
+        self._blocked_domains = {p for p in blocked if _DOMAIN_RE.match(p)}
+        self._split_host = not any('/' in p for p in blocked | keep)
+        self._hosts: Dict[str, Tuple[bool, bool]] = {}
+        self._max_hosts = max_hosts
+
+    def classify(self, url_lower: str) -> Tuple[bool, bool]:
+        """返回 (是否命中屏蔽规则, 是否命中保留关键词)，与逐条 any(... in url) 判断一致"""
+        if not self._split_host:
+            return self._classify_text(url_lower)
+
+        scheme_end = url_lower.find('://')
+        split = url_lower.find('/', scheme_end + 3 if scheme_end != -1 else 0)
+        if split == -1:
+            split = len(url_lower)
+        head = url_lower[:split]
+
+        host_result = self._hosts.get(head)
+        if host_result is None:
+            host_result = self._classify_host(head)
+            if len(self._hosts) >= self._max_hosts:
+                self._hosts.clear()
+            self._hosts[head] = host_result
+        if host_result[0]:
+            return host_result
+
+        rest = url_lower[split:]
+        if self._blocked.search(rest):
+            return True, host_result[1]
+        return False, host_result[1] or self._keep.search(rest)
+
+    def _classify_host(self, head: str) -> Tuple[bool, bool]:
+        """判断 协议+主机 部分：先查域名后缀索引，再做子串匹配"""
+        host = head.split('://', 1)[-1]
+        for i, char in enumerate('.' + host):
+            if char == '.' and host[i:] in self._blocked_domains:
+                return True, False
+        return self._classify_text(head)
+
+    def _classify_text(self, text: str) -> Tuple[bool, bool]:
+        if self._blocked.search(text):
+            return True, False
+        return False, self._keep.search(text)
+
+    def filter(self, urls: List[str]) -> List[str]:
+        """过滤URL，去除广告和不相关链接"""
+        filtered = []
+        for url in urls:
+            # 过滤短URL（可能是重定向或广告）以及重复的主页
+            if len(url) < 30 or (url.endswith('/') and len(url) < 35):
+                continue
+
+            blocked, kept = self.classify(url.lower())
+            if blocked:
+                continue
+
+            # 保留包含关键词的URL；否则看起来是内容页面的也保留
+            if kept or (len(url) > 50 and url.count('/') >= 3):
+                filtered.append(url)
+        return filtered